@@ -91,7 +91,7 @@ print(response)
 
 # response = requests.post(
 #     THINK_URL,
-#     json={"messages": [prompt]},
+#     json={"messages": [prompt], "priority": "batch"},
 # )
 
 # data = response.json()
@@ -1,17 +1,28 @@
 from dataclasses import dataclass
 from .thinking_server import ThinkingToolServer
-from .self_awareness import SelfAwareness, CodeFile, LogFile
+from .self_awareness import SelfAwareness, CodeChange, CodeFile, LogFile
+
+from .log_queue import attach_queue_handler
 
 import os
 import logging
 from rich.logging import RichHandler
 
-logging.basicConfig(
-    filename="thinking.log",
-    format="%(asctime)s - %(pathname)s - %(levelname)s - %(message)s",
-    level=os.getenv("LOG_LEVEL", "INFO"),
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
-
 logger = logging.getLogger(__name__)
-logger.addHandler(RichHandler())
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO"))
+
+# Like `logging.basicConfig`, an application which configured logging itself
+# is left alone.  Otherwise log records are only enqueued by the code that
+# emits them, the file and console are written from a background thread.
+if not logging.root.handlers:
+    file_handler = logging.FileHandler("thinking.log")
+    file_handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s - %(pathname)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+    )
+    # Only the package's own records go to the console.
+    console_handler = RichHandler()
+    console_handler.addFilter(logging.Filter(__name__))
+    attach_queue_handler(logging.root, file_handler, console_handler)
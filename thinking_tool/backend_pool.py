@@ -0,0 +1,141 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import monotonic
+import logging
+
+import httpx
+import ollama
+
+from thinking_tool.models.config import OllamaConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+# Errors which mean a backend couldn't serve a request.
+BACKEND_ERRORS = (ollama.ResponseError, ConnectionError, httpx.HTTPError)
+
+
+def is_host_failure(error: Exception) -> bool:
+    """
+    Model errors (e.g. a model missing on one host) shouldn't count against
+    the host's health; connection errors and server errors should.
+    """
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code < 0 or error.status_code >= 500
+    return True
+
+
+@dataclass
+class OllamaBackend:
+    host: str
+    client: ollama.AsyncClient
+    outstanding: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+    loaded_models: set[str] = field(default_factory=set)
+    available_models: set[str] = field(default_factory=set)
+
+    @property
+    def healthy(self) -> bool:
+        return monotonic() >= self.ejected_until
+
+    def status(self) -> dict:
+        return {
+            "host": self.host,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "failures": self.failures,
+            "loaded_models": sorted(self.loaded_models),
+        }
+
+
+class OllamaBackendPool:
+    """
+    A set of Ollama hosts, each with its own `AsyncClient`.
+
+    `candidates()` orders hosts for a request: healthy hosts first, preferring
+    hosts with the model already loaded, then hosts which have it downloaded,
+    then the fewest outstanding requests.  Hosts failing `max_failures` times
+    in a row are ejected for `eject_seconds`.
+    """
+
+    def __init__(self, config: OllamaConfig) -> None:
+        self.config = config
+        self.backends = [
+            OllamaBackend(
+                host=host,
+                client=ollama.AsyncClient(host=host, timeout=config.timeout),
+            )
+            for host in config.host_uris()
+        ]
+        self._refreshed_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def primary(self) -> OllamaBackend:
+        return self.backends[0]
+
+    def candidates(self, model: str) -> list[OllamaBackend]:
+        def rank(backend: OllamaBackend) -> tuple:
+            return (
+                not backend.healthy,
+                model not in backend.loaded_models,
+                model not in backend.available_models,
+                backend.outstanding,
+                backend.ejected_until,
+            )
+
+        return sorted(self.backends, key=rank)
+
+    def mark_success(self, backend: OllamaBackend, model: str | None = None) -> None:
+        backend.failures = 0
+        backend.ejected_until = 0.0
+        if model:
+            backend.loaded_models.add(model)
+            backend.available_models.add(model)
+
+    def mark_failure(self, backend: OllamaBackend, error: Exception) -> None:
+        if not is_host_failure(error):
+            return
+
+        backend.failures += 1
+        if backend.failures >= self.config.max_failures:
+            logger.warning(f"Ejecting Ollama host '{backend.host}': {error}")
+            backend.ejected_until = monotonic() + self.config.eject_seconds
+
+    async def refresh(self) -> None:
+        """
+        Updates each host's loaded and downloaded models, which doubles as a
+        health check.
+        """
+        self._refreshed_at = monotonic()
+        await asyncio.gather(*(self._refresh(b) for b in self.backends))
+
+    def status(self) -> list[dict]:
+        return [backend.status() for backend in self.backends]
+
+    async def _refresh(self, backend: OllamaBackend) -> None:
+        try:
+            running = await backend.client.ps()
+            available = await backend.client.list()
+        except BACKEND_ERRORS as e:
+            self.mark_failure(backend, e)
+            return
+
+        backend.loaded_models = {model.model for model in running.models}
+        backend.available_models = {model.model for model in available.models}
+        self.mark_success(backend)
+
+    def refresh_in_background(self) -> None:
+        """
+        Starts a refresh without waiting for it, at most once per
+        `refresh_interval`.  Must be called from the event loop.
+        """
+        if len(self.backends) == 1:
+            return
+        if monotonic() - self._refreshed_at < self.config.refresh_interval:
+            return
+        if self._refresh_task and not self._refresh_task.done():
+            return
+
+        self._refreshed_at = monotonic()
+        self._refresh_task = asyncio.create_task(self.refresh())
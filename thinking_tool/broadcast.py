@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator, Callable
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class StreamCancelled(Exception):
+    pass
+
+
+class Broadcast:
+    """
+    Drives a single async chunk stream in a background task and lets any
+    number of subscribers read it.
+
+    Every chunk is kept with its index, so a subscriber can start at any
+    index: chunks produced so far are replayed, then the live tail follows.
+    The index doubles as the event ID for resumable transports.
+
+    With `idle_timeout` set, the source is cancelled once it has had no
+    subscribers for that many seconds, so nobody pays for a stream nobody
+    reads.
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[Any],
+        on_done: Callable[["Broadcast"], None] | None = None,
+        idle_timeout: float | None = None,
+    ) -> None:
+        self.chunks: list[Any] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+
+        self._source = source
+        self._on_done = on_done
+        self._idle_timeout = idle_timeout
+        self._idle_handle: asyncio.TimerHandle | None = None
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return isinstance(self.error, StreamCancelled)
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> "Broadcast":
+        if self._task is None and not self.done:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    def cancel(self) -> bool:
+        """
+        Stops the source.  Subscribers see the stream end with a
+        `StreamCancelled` error.  Returns False if it had already ended.
+        """
+        if self.done:
+            return False
+        if self._task is None:
+            self._finish(StreamCancelled("Stream cancelled"))
+            return True
+        self._task.cancel()
+        return True
+
+    async def subscribe(
+        self, start: int = 0, heartbeat: float | None = None
+    ) -> AsyncGenerator[tuple[int, Any], None]:
+        """
+        Yields `(index, chunk)` pairs from `start` until the source is
+        exhausted, then raises the source's error if it failed.  If
+        `heartbeat` is set and no chunk arrives within that many seconds,
+        `(index, None)` is yielded so transports can send a ping.
+        """
+        self.start()
+        self.subscribers += 1
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        index = max(start, 0)
+        try:
+            while True:
+                if index < len(self.chunks):
+                    yield index, self.chunks[index]
+                    index += 1
+                    continue
+
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+
+                if not await self._wait(heartbeat):
+                    yield index, None
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers and self._idle_timeout is not None:
+                self._idle_handle = asyncio.get_running_loop().call_later(
+                    self._idle_timeout, self._cancel_if_idle
+                )
+
+    def _cancel_if_idle(self) -> None:
+        self._idle_handle = None
+        if not self.subscribers and self.cancel():
+            logger.info("Stream cancelled, it has no subscribers left")
+
+    async def _wait(self, timeout: float | None) -> bool:
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _run(self) -> None:
+        error = None
+        try:
+            async for chunk in self._source:
+                self.chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            # Cancelling the task closes the source, and whatever it streams
+            # from, at the point it was waiting.
+            error = StreamCancelled("Stream cancelled")
+        except Exception as e:
+            logger.error(e)
+            error = e
+        finally:
+            self._finish(error)
+
+    def _finish(self, error: BaseException | None) -> None:
+        self.error = error
+        self.done = True
+        self._notify()
+        if self._on_done:
+            self._on_done(self)
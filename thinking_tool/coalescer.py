@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator, Callable
+
+from thinking_tool.models.config import StreamCoalescingConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def _as_bytes(data: str | bytes) -> bytes:
+    return data.encode() if isinstance(data, str) else data
+
+
+async def coalesce(
+    chunks: AsyncIterator[Any],
+    encode: Callable[[Any], str | bytes],
+    config: StreamCoalescingConfig,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Joins encoded chunks into fewer, larger writes.  A write is flushed
+    `flush_interval` seconds after its first chunk arrived or once it holds
+    `flush_bytes`, whichever comes first, and straight away on `done`.
+    """
+    iterator = chunks.__aiter__()
+    loop = asyncio.get_running_loop()
+    buffer: list[bytes] = []
+    size = 0
+    deadline = 0.0
+    # Reading ahead runs in a task, so a flush never interrupts the source.
+    pending: asyncio.Future | None = None
+
+    try:
+        while True:
+            if not buffer:
+                # Nothing to flush, so wait for the next chunk without a timeout.
+                try:
+                    chunk = await (pending or anext(iterator))
+                except StopAsyncIteration:
+                    return
+                pending = None
+                deadline = loop.time() + config.flush_interval
+            else:
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(iterator))
+                done, _ = await asyncio.wait(
+                    {pending}, timeout=max(deadline - loop.time(), 0)
+                )
+                if not done:
+                    yield b"".join(buffer)
+                    buffer, size = [], 0
+                    continue
+
+                future, pending = pending, None
+                try:
+                    chunk = future.result()
+                except StopAsyncIteration:
+                    break
+
+            data = _as_bytes(encode(chunk))
+            buffer.append(data)
+            size += len(data)
+            if size >= config.flush_bytes or getattr(chunk, "done", False):
+                yield b"".join(buffer)
+                buffer, size = [], 0
+
+        if buffer:
+            yield b"".join(buffer)
+    finally:
+        if pending is not None:
+            # The source can't be closed while the read ahead is running.
+            pending.cancel()
+            await asyncio.wait({pending})
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
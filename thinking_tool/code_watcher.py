@@ -0,0 +1,218 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+# inotify(7) event masks.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+# Seconds a blocked read waits before checking whether to stop.
+STOP_CHECK_INTERVAL = 0.5
+
+
+def _visible(name: str) -> bool:
+    # `glob` skips hidden files and directories, so the watchers do too.
+    return not name.startswith(".")
+
+
+class CodeWatcher:
+    """
+    Watches a directory tree in a background thread and calls `on_change`
+    with the path of every file or directory which may have changed.
+    Callers check the path themselves, so spurious calls are harmless.
+    """
+
+    def __init__(
+        self, directory: str, on_change: Callable[[str], None], suffix: str = ".py"
+    ) -> None:
+        self.directory = directory
+        self.on_change = on_change
+        self.suffix = suffix
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "CodeWatcher":
+        # Changes made once `start` returns are never missed.
+        self._prepare()
+        self._thread = threading.Thread(
+            target=self._run, name=type(self).__name__, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _prepare(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        raise NotImplementedError
+
+    def _notify(self, path: str) -> None:
+        try:
+            self.on_change(path)
+        except Exception as e:
+            logger.exception(e)
+
+    def _walk(self, directory: str):
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [d for d in dirnames if _visible(d)]
+            yield dirpath, [
+                f for f in filenames if _visible(f) and f.endswith(self.suffix)
+            ]
+
+
+class PollingWatcher(CodeWatcher):
+    """Compares mtimes and sizes of the tree every `interval` seconds."""
+
+    def __init__(
+        self,
+        directory: str,
+        on_change: Callable[[str], None],
+        suffix: str = ".py",
+        interval: float = 1.0,
+    ) -> None:
+        super().__init__(directory, on_change, suffix)
+        self.interval = interval
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        signatures = {}
+        for dirpath, filenames in self._walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _prepare(self) -> None:
+        self._previous = self._scan()
+
+    def _run(self) -> None:
+        previous = self._previous
+        while not self._stopped.wait(self.interval):
+            current = self._scan()
+            for path in previous.keys() | current.keys():
+                if previous.get(path) != current.get(path):
+                    self._notify(path)
+            previous = current
+
+
+class InotifyWatcher(CodeWatcher):
+    """Follows inotify events, watching new directories as they appear."""
+
+    _libc = None
+
+    @classmethod
+    def available(cls) -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        if cls._libc is None:
+            name = ctypes.util.find_library("c")
+            if name is None:
+                return False
+            cls._libc = ctypes.CDLL(name, use_errno=True)
+        return hasattr(cls._libc, "inotify_init1")
+
+    def _prepare(self) -> None:
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: dict[int, str] = {}
+        self._add_tree(self.directory, notify=False)
+
+    def _add_tree(self, directory: str, notify: bool) -> None:
+        for dirpath, filenames in self._walk(directory):
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dirpath), WATCH_MASK
+            )
+            if wd < 0:
+                errno = ctypes.get_errno()
+                logger.warning(f"Can't watch '{dirpath}': {os.strerror(errno)}")
+                continue
+            self._watches[wd] = dirpath
+            # Files created before the watch was added.
+            if notify:
+                for filename in filenames:
+                    self._notify(os.path.join(dirpath, filename))
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                ready, _, _ = select.select([self._fd], [], [], STOP_CHECK_INTERVAL)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self._fd, READ_SIZE)
+                except BlockingIOError:
+                    continue
+                self._handle(data)
+        finally:
+            os.close(self._fd)
+
+    def _handle(self, data: bytes) -> None:
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].split(b"\0", 1)[0])
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, let the caller recheck everything.
+                logger.warning("inotify queue overflowed")
+                self._notify(self.directory)
+                continue
+
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not _visible(name):
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path, notify=True)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._notify(path)
+            elif name.endswith(self.suffix):
+                self._notify(path)
+
+
+def create_watcher(
+    directory: str,
+    on_change: Callable[[str], None],
+    poll_interval: float = 1.0,
+    polling: bool = False,
+) -> CodeWatcher:
+    """Uses inotify where it is available, polling everywhere else."""
+    if not polling and InotifyWatcher.available():
+        return InotifyWatcher(directory, on_change)
+
+    return PollingWatcher(directory, on_change, interval=poll_interval)
@@ -0,0 +1,125 @@
+import logging
+import math
+
+from pydantic import BaseModel
+
+from thinking_tool.llm_manager import Message
+from thinking_tool.models.config import ContextBudgetConfig
+from thinking_tool.models.response import BudgetReport
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+# Tokens of chat-template framing added around every message.
+MESSAGE_OVERHEAD_TOKENS = 4
+TRUNCATION_MARKER = "\n...[truncated]...\n"
+
+
+def context_length(details: dict | None, default: int) -> int:
+    """
+    Reads the context window Ollama will use from `show()` details.  An
+    explicit `num_ctx` parameter wins, otherwise the model's trained context
+    length caps the default.
+    """
+    if not details:
+        return default
+
+    for line in (details.get("parameters") or "").splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[0] == "num_ctx" and parts[1].isdigit():
+            return int(parts[1])
+
+    for key, value in (details.get("modelinfo") or {}).items():
+        if key.endswith(".context_length") and isinstance(value, int):
+            return min(value, default)
+
+    return default
+
+
+class ContextBudget:
+    """
+    Fits a prompt into the model's context window before it is sent.
+
+    Tokens are estimated from character counts.  When the prompt is over
+    budget the oldest turns are dropped first, keeping system messages and
+    the latest turn, then the largest remaining message is cut down in the
+    middle.
+    """
+
+    def __init__(self, config: ContextBudgetConfig = None) -> None:
+        self.config = config if config else ContextBudgetConfig()
+
+    def estimate(self, message: Message) -> int:
+        text = message.content or ""
+        return math.ceil(len(text) / self.config.chars_per_token) + (
+            MESSAGE_OVERHEAD_TOKENS
+        )
+
+    def budget(self, context: int) -> int:
+        budget = context - self.config.reserve_tokens
+        if self.config.max_prompt_tokens:
+            budget = min(budget, self.config.max_prompt_tokens)
+        return max(budget, 0)
+
+    def fit(
+        self, messages: list[Message], details: dict | None = None
+    ) -> tuple[list[Message], BudgetReport]:
+        context = context_length(details, self.config.default_context_length)
+        budget = self.budget(context)
+        sizes = [self.estimate(m) for m in messages]
+        report = BudgetReport(
+            context_length=context,
+            budget=budget,
+            original_tokens=sum(sizes),
+            prompt_tokens=sum(sizes),
+        )
+
+        if not self.config.enabled or report.original_tokens <= budget:
+            return messages, report
+
+        messages = list(messages)
+        total = report.original_tokens
+
+        # Drop the oldest turns, never system messages or the latest turn.
+        index = 0
+        while total > budget and index < len(messages) - 1:
+            if messages[index].role == "system":
+                index += 1
+                continue
+            total -= sizes.pop(index)
+            messages.pop(index)
+            report.dropped_messages += 1
+
+        # Still too long: shorten the largest message.
+        if total > budget and messages:
+            largest = max(range(len(messages)), key=lambda i: sizes[i])
+            excess = total - budget
+            messages[largest] = self._truncate(messages[largest], excess)
+            total += self.estimate(messages[largest]) - sizes[largest]
+            report.truncated_messages += 1
+
+        report.prompt_tokens = total
+        logger.info(f"Prompt trimmed to fit the context budget: {report}")
+        return messages, report
+
+    def _truncate(self, message: Message, excess_tokens: int) -> Message:
+        text = message.content or ""
+        cut = math.ceil(excess_tokens * self.config.chars_per_token) + len(
+            TRUNCATION_MARKER
+        )
+        keep = max(len(text) - cut, 0)
+        head = text[: keep // 2]
+        tail = text[len(text) - (keep - keep // 2) :] if keep else ""
+        return message.model_copy(update={"content": head + TRUNCATION_MARKER + tail})
+
+
+class BudgetedPrompt(BaseModel):
+    messages: list[Message]
+    report: BudgetReport
+
+    def headers(self) -> dict:
+        return {
+            "X-Prompt-Tokens": str(self.report.prompt_tokens),
+            "X-Prompt-Budget": str(self.report.budget),
+            "X-Prompt-Dropped-Messages": str(self.report.dropped_messages),
+            "X-Prompt-Truncated-Messages": str(self.report.truncated_messages),
+        }
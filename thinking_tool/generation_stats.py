@@ -0,0 +1,44 @@
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+@dataclass
+class GenerationStats:
+    """
+    Counts finished and cancelled generations.  The tokens a cancellation
+    saved are estimated from the mean length of finished generations.
+    """
+
+    completed: int = 0
+    cancelled: int = 0
+    completion_tokens: int = 0
+    # Tokens generated by cancelled generations before they were stopped.
+    cancelled_tokens: int = 0
+    tokens_saved: int = 0
+
+    @property
+    def mean_completion_tokens(self) -> float:
+        return self.completion_tokens / self.completed if self.completed else 0.0
+
+    def complete(self, tokens: int) -> None:
+        self.completed += 1
+        self.completion_tokens += tokens
+
+    def cancel(self, tokens: int = 0) -> int:
+        saved = max(round(self.mean_completion_tokens) - tokens, 0)
+        self.cancelled += 1
+        self.cancelled_tokens += tokens
+        self.tokens_saved += saved
+        logger.info(f"Generation cancelled after {tokens} tokens, ~{saved} saved")
+        return saved
+
+    def status(self) -> dict:
+        return {
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "mean_completion_tokens": self.mean_completion_tokens,
+            "cancelled_tokens": self.cancelled_tokens,
+            "tokens_saved": self.tokens_saved,
+        }
@@ -1,18 +1,27 @@
 from enum import Enum
-from typing import Any, Generator
+from typing import Any, AsyncGenerator
 from pydantic import BaseModel
 import ollama
 
 import logging
 
+from thinking_tool.backend_pool import (
+    BACKEND_ERRORS,
+    OllamaBackend,
+    OllamaBackendPool,
+)
 from thinking_tool.base import BaseLLM_Manager
+from thinking_tool.model_catalog import ModelCatalog
 from thinking_tool.models.config import OllamaConfig
+from thinking_tool.tracing import span
+from thinking_tool.warm_pool import WarmPool
 
 logger = logging.getLogger(__name__ + "." + __file__)
 
 
 Message = ollama.Message
 ChatResponse = ollama.ChatResponse
+ProgressResponse = ollama.ProgressResponse
 
 
 class LLM_ManagerStatus(Enum):
@@ -30,12 +39,16 @@ class LLM_ManagerResponse(BaseModel):
     models: Any = None
     details: dict = None
     stream: Any = None
+    error: Any = None
 
 
 class OllamaLLM_Manager(BaseLLM_Manager):
 
     config: OllamaConfig
     _client: ollama.AsyncClient
+    _pool: OllamaBackendPool
+    _catalog: ModelCatalog
+    _warm_pool: WarmPool
 
     def __init__(
         self,
@@ -44,55 +57,204 @@ class OllamaLLM_Manager(BaseLLM_Manager):
     ) -> None:
         super().__init__(config=config, **data)
         self.config = config if config else OllamaConfig()
-        self._client = ollama.AsyncClient(
-            host=self.config.host_uri(),
-            timeout=self.config.timeout,
-        )
+        self._connect()
 
-    async def load(self, model: str) -> Generator[ollama.ChatResponse, None, None]:
-        available_models = await self._client.list()
-        available_model_names = [model.model for model in available_models.models]
+    def _connect(self) -> None:
+        self._pool = OllamaBackendPool(self.config)
+        # The primary host, used for catalog and model management calls.
+        self._client = self._pool.primary.client
+        self._catalog = ModelCatalog(self._client, ttl=self.config.catalog_ttl)
+        self._warm_pool = WarmPool(self._pool, self.config)
 
-        if model not in available_model_names:
-            return LLM_ManagerResponse(
-                status=LLM_ManagerStatus.model_not_loaded,
-                models=available_model_names,
-            )
+    async def load(self, model: str) -> LLM_ManagerResponse:
+        try:
+            available_model_names = await self._catalog.names()
+            if model not in available_model_names:
+                return LLM_ManagerResponse(
+                    status=LLM_ManagerStatus.model_not_loaded,
+                    models=available_model_names,
+                )
+
+            model_details = await self._catalog.details(model)
+        except BACKEND_ERRORS as e:
+            return self._ollama_error_to_response(e)
 
         self.config.model = model
-        model_details = await self._client.show(model)
+        if self.config.warm_on_load:
+            self._warm_pool.warm_in_background(model)
+        return LLM_ManagerResponse(
+            status=LLM_ManagerStatus.ready,
+            models=model,
+            details=model_details,
+        )
+
+    async def update(self, config: OllamaConfig) -> LLM_ManagerResponse:
+        """
+        Applies new settings, then loads the model they name.  The model only
+        changes if it is available, and changed hosts get a new pool.
+        """
+        reconnect = (
+            config.host_uris() != self.config.host_uris()
+            or config.timeout != self.config.timeout
+        )
+        # Updated in place, as the server shares this config.
+        for name in OllamaConfig.model_fields:
+            if name != "model":
+                setattr(self.config, name, getattr(config, name))
+
+        if reconnect:
+            self._warm_pool.stop()
+            self._connect()
+            self._warm_pool.start()
+        return await self.load(config.model)
+
+    def start(self) -> None:
+        """
+        Starts keeping the pinned models loaded, so they are warm before the
+        first chat.  Must be called from the event loop.
+        """
+        self._warm_pool.start()
 
+    def stop(self) -> None:
+        self._warm_pool.stop()
+
+    async def warm(self, model: str | None = None) -> bool:
+        return await self._warm_pool.warm(model or self.config.model)
+
+    @property
+    def chat_options(self) -> dict:
+        """
+        Options sent with every chat besides the model and messages.
+        """
+        return {"format": "json"}
+
+    async def model_digest(self, model: str | None = None) -> str | None:
+        try:
+            return await self._catalog.digest(model or self.config.model)
+        except BACKEND_ERRORS as e:
+            logger.error(e)
+            return None
+
+    async def model_details(self, model: str | None = None) -> dict | None:
+        try:
+            return await self._catalog.details(model or self.config.model)
+        except BACKEND_ERRORS as e:
+            logger.error(e)
+            return None
+
+    async def local_models_available(self) -> LLM_ManagerResponse:
         try:
-            return LLM_ManagerResponse(
-                status=LLM_ManagerStatus.ready,
-                models=model,
-                details=model_details.model_dump(),
-            )
-        except ollama._types.ResponseError as e:
+            models = await self._catalog.names()
+        except BACKEND_ERRORS as e:
             return self._ollama_error_to_response(e)
 
-    async def status(self) -> LLM_ManagerResponse:
+        return LLM_ManagerResponse(status=LLM_ManagerStatus.ready, models=models)
+
+    async def pull(self, model: str) -> AsyncGenerator[ProgressResponse, None]:
+        try:
+            async for chunk in await self._client.pull(model, stream=True):
+                yield chunk
+        finally:
+            self._catalog.invalidate(model)
+
+    async def delete(self, model: str) -> LLM_ManagerResponse:
         try:
-            _ = await self._client.ps()
-            return LLM_ManagerResponse(status=LLM_ManagerStatus.ready)
-        except ollama._types.ResponseError as e:
+            await self._client.delete(model)
+        except BACKEND_ERRORS as e:
             return self._ollama_error_to_response(e)
+        finally:
+            self._catalog.invalidate(model)
 
-    async def chat(self, messages: list[Message]) -> LLM_ManagerResponse:
+        return LLM_ManagerResponse(status=LLM_ManagerStatus.ready, models=model)
+
+    async def status(self) -> LLM_ManagerResponse:
+        await self._pool.refresh()
+        details = {
+            "backends": self._pool.status(),
+            "warm_pool": self._warm_pool.status(),
+        }
+        if any(backend.healthy for backend in self._pool.backends):
+            return LLM_ManagerResponse(status=LLM_ManagerStatus.ready, details=details)
+
+        return LLM_ManagerResponse(status=LLM_ManagerStatus.error, details=details)
+
+    async def chat(
+        self, messages: list[Message], keep_alive: str | None = None
+    ) -> LLM_ManagerResponse:
         try:
-            model = await self._client.chat(
-                model=self.config.model,
-                messages=messages,
-                stream=True,
-                format="json",
-            )
-            return LLM_ManagerResponse(
-                status=LLM_ManagerStatus.generating,
-                stream=model,
-            )
-        except ollama._types.ResponseError as e:
+            backend, stream, first = await self._open_chat(messages, keep_alive)
+        except BACKEND_ERRORS as e:
             return self._ollama_error_to_response(e)
 
+        return LLM_ManagerResponse(
+            status=LLM_ManagerStatus.generating,
+            stream=self._relay(backend, stream, first),
+        )
+
+    async def _open_chat(
+        self, messages: list[Message], keep_alive: str | None = None
+    ) -> tuple[OllamaBackend, AsyncGenerator[ChatResponse, None], ChatResponse]:
+        """
+        Starts the chat on the best backend and waits for its first chunk.
+        Until then nothing has been sent to the caller, so a failing backend
+        is skipped and the next candidate is tried.
+        """
+        model = self.config.model
+        if keep_alive is None:
+            keep_alive = self._warm_pool.keep_alive(model)
+        error = None
+        self._pool.refresh_in_background()
+        self._warm_pool.start()
+        self._warm_pool.touch(model)
+        for backend in self._pool.candidates(model):
+            backend.outstanding += 1
+            stream = None
+            try:
+                with span("backend connect", host=backend.host, model=model):
+                    stream = await backend.client.chat(
+                        model=model,
+                        messages=messages,
+                        stream=True,
+                        keep_alive=keep_alive,
+                        **self.chat_options,
+                    )
+                with span("first token", host=backend.host, model=model):
+                    first = await anext(stream, None)
+            except BaseException as e:
+                # Released here until `_relay` owns the stream, cancellation
+                # included.
+                backend.outstanding -= 1
+                if stream is not None:
+                    await stream.aclose()
+                if not isinstance(e, BACKEND_ERRORS):
+                    raise
+                logger.warning(f"Chat failed on '{backend.host}': {e}")
+                self._pool.mark_failure(backend, e)
+                error = e
+                continue
+
+            self._pool.mark_success(backend, model)
+            return backend, stream, first
+
+        raise error
+
+    async def _relay(
+        self,
+        backend: OllamaBackend,
+        stream: AsyncGenerator[ChatResponse, None],
+        first: ChatResponse | None,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        try:
+            if first is not None:
+                yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            backend.outstanding -= 1
+            # Closing the response makes Ollama stop generating, rather than
+            # waiting for the garbage collector to drop the connection.
+            await stream.aclose()
+
     # async def generate(
     #     self,
     #     messages: list[str],
@@ -103,10 +265,6 @@ class OllamaLLM_Manager(BaseLLM_Manager):
     #         logger.info(type(chunk))
     #         yield chunk
 
-    def _ollama_error_to_response(
-        self, e: ollama._types.ResponseError
-    ) -> LLM_ManagerResponse:
+    def _ollama_error_to_response(self, e: Exception) -> LLM_ManagerResponse:
         logger.error(e)
-        response = LLM_ManagerResponse(status=LLM_ManagerStatus.error)
-        response.error = e
-        return response
+        return LLM_ManagerResponse(status=LLM_ManagerStatus.error, error=e)
@@ -0,0 +1,41 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class _ListenedQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.SimpleQueue, listener: QueueListener) -> None:
+        super().__init__(log_queue)
+        self.listener = listener
+
+
+def attach_queue_handler(
+    target: logging.Logger,
+    *handlers: logging.Handler,
+    filters: tuple[logging.Filter, ...] = (),
+) -> QueueHandler:
+    """
+    Moves `handlers` onto a background thread.  `target` only enqueues its
+    records, so formatting and I/O never run on the event loop.  `filters`
+    run before enqueueing, while the caller's context is still available.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    handler = _ListenedQueueHandler(log_queue, listener)
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+
+    listener.start()
+    # Records still queued at exit are written out.
+    atexit.register(listener.stop)
+    target.addHandler(handler)
+    return handler
+
+
+def detach_queue_handler(target: logging.Logger, handler: QueueHandler) -> None:
+    target.removeHandler(handler)
+    atexit.unregister(handler.listener.stop)
+    handler.listener.stop()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import mmap
+import os
+from time import monotonic
+from typing import AsyncGenerator
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+# Largest range returned by a single read.
+MAX_READ_LENGTH = 1024 * 1024
+# Seconds between size checks while following a file.
+FOLLOW_INTERVAL = 0.5
+
+
+class LogRange(BaseModel):
+    # Byte range `[offset, next_offset)` of the file and its size when read.
+    offset: int
+    next_offset: int
+    size: int
+    content: str
+
+
+def _size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _read(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def read_range(path: str, offset: int = 0, length: int = MAX_READ_LENGTH) -> LogRange:
+    """Reads `length` bytes from `offset`, clamped to the file."""
+    size = _size(path)
+    offset = min(max(offset, 0), size)
+    length = min(max(length, 0), MAX_READ_LENGTH, size - offset)
+    data = _read(path, offset, length) if length else b""
+
+    return LogRange(
+        offset=offset,
+        next_offset=offset + len(data),
+        size=size,
+        content=data.decode("utf-8", errors="replace"),
+    )
+
+
+def tail(path: str, lines: int) -> LogRange:
+    """
+    Reads the last `lines` lines.  The file is memory-mapped and scanned
+    backwards for newlines, so only the returned bytes are touched.
+    """
+    size = _size(path)
+    if size == 0 or lines <= 0:
+        return LogRange(offset=size, next_offset=size, size=size, content="")
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        size = len(m)
+        # A trailing newline ends the last line rather than starting a new one.
+        end = size - 1 if m[size - 1 : size] == b"\n" else size
+        start = end
+        for _ in range(lines):
+            start = m.rfind(b"\n", 0, start)
+            if start < 0:
+                break
+        start += 1
+        # Never return more than a single read would.
+        start = max(start, size - MAX_READ_LENGTH)
+        data = m[start:size]
+
+    return LogRange(
+        offset=start,
+        next_offset=size,
+        size=size,
+        content=data.decode("utf-8", errors="replace"),
+    )
+
+
+def follow(
+    path: str,
+    offset: int | None = None,
+    interval: float = FOLLOW_INTERVAL,
+    heartbeat: float | None = None,
+) -> AsyncGenerator[LogRange, None]:
+    """
+    Yields complete lines appended after `offset`, by default the end of the
+    file when `follow` is called.  Starts again from the beginning if the
+    file is truncated.  After `heartbeat` seconds without new lines an empty
+    range is yielded.
+    """
+    if offset is None:
+        offset = _size(path)
+    return _follow(path, offset, interval, heartbeat)
+
+
+async def _follow(
+    path: str, offset: int, interval: float, heartbeat: float | None
+) -> AsyncGenerator[LogRange, None]:
+    last_sent = monotonic()
+    while True:
+        size = _size(path)
+        if size < offset:
+            logger.info(f"Log file truncated, following from the start: '{path}'")
+            offset = 0
+
+        if size > offset:
+            data = await asyncio.to_thread(
+                _read, path, offset, min(size - offset, MAX_READ_LENGTH)
+            )
+            # Partial lines are sent once their newline is written, unless
+            # one fills a whole read.
+            complete = data.rfind(b"\n") + 1
+            if len(data) == MAX_READ_LENGTH and not complete:
+                complete = len(data)
+            if complete:
+                yield LogRange(
+                    offset=offset,
+                    next_offset=offset + complete,
+                    size=size,
+                    content=data[:complete].decode("utf-8", errors="replace"),
+                )
+                offset += complete
+                last_sent = monotonic()
+                continue
+
+        if heartbeat is not None and monotonic() - last_sent >= heartbeat:
+            yield LogRange(offset=offset, next_offset=offset, size=size, content="")
+            last_sent = monotonic()
+
+        await asyncio.sleep(interval)
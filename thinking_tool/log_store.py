@@ -0,0 +1,293 @@
+import bisect
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import IO, Iterator
+
+from pydantic import BaseModel
+
+from thinking_tool.models.config import LogStoreConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+COMPRESSED_SUFFIX = ".gz"
+
+# Stream being served by the current task, attached to its log records.
+current_stream_id: ContextVar[str | None] = ContextVar(
+    "current_stream_id", default=None
+)
+
+
+def _levelno(level: str) -> int | None:
+    levelno = logging.getLevelName(level.upper())
+    return levelno if isinstance(levelno, int) else None
+
+
+class LogRecord(BaseModel):
+    # Seconds since the epoch.
+    time: float
+    level: str
+    logger: str
+    message: str
+    stream_id: str | None = None
+
+
+@dataclass
+class _Segment:
+    number: int
+    directory: str
+    # Sparse index of `(time, offset)`, one entry every `index_interval`
+    # bytes.  A closed segment ends with an entry at its size.
+    index: list[tuple[float, int]] = field(default_factory=list)
+    closed: bool = False
+    compressed: bool = False
+
+    @property
+    def path(self) -> str:
+        name = f"{SEGMENT_PREFIX}{self.number:08d}{SEGMENT_SUFFIX}"
+        if self.compressed:
+            name += COMPRESSED_SUFFIX
+        return os.path.join(self.directory, name)
+
+    @property
+    def index_path(self) -> str:
+        name = f"{SEGMENT_PREFIX}{self.number:08d}{INDEX_SUFFIX}"
+        return os.path.join(self.directory, name)
+
+    @property
+    def first_time(self) -> float | None:
+        return self.index[0][0] if self.index else None
+
+    @property
+    def last_time(self) -> float | None:
+        # Only known once the segment is closed.
+        return self.index[-1][0] if self.closed and self.index else None
+
+    def start_offset(self, since: float | None) -> int:
+        if since is None or not self.index:
+            return 0
+        # Last indexed record before `since`, earlier ones can be skipped.
+        position = bisect.bisect_left(self.index, (since, -1)) - 1
+        return self.index[position][1] if position >= 0 else 0
+
+    def open(self) -> IO[bytes]:
+        if self.compressed:
+            return gzip.open(self.path, "rb")
+        return open(self.path, "rb")
+
+
+class LogStore:
+    """
+    Append-only store of structured log records, one JSON object per line.
+
+    Records are written to numbered segments next to a sparse time index,
+    so queries seek straight to the first relevant record.  Full segments
+    are closed, optionally gzipped, and the oldest are deleted once there
+    are more than `max_segments`.
+    """
+
+    def __init__(self, config: LogStoreConfig = None) -> None:
+        self.config = config if config else LogStoreConfig()
+        self._lock = threading.Lock()
+        self._segments: list[_Segment] = []
+        self._file: IO[bytes] | None = None
+        self._size = 0
+        self._indexed_at = 0
+        self._last_time: float | None = None
+
+        os.makedirs(self.config.directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        segments: dict[int, _Segment] = {}
+        for name in os.listdir(self.config.directory):
+            if not name.startswith(SEGMENT_PREFIX):
+                continue
+            number, _, suffix = name[len(SEGMENT_PREFIX) :].partition(".")
+            if not number.isdigit() or "." + suffix == INDEX_SUFFIX:
+                continue
+            segment = segments.setdefault(
+                int(number), _Segment(int(number), self.config.directory)
+            )
+            segment.compressed = suffix.endswith(COMPRESSED_SUFFIX[1:])
+
+        for number in sorted(segments):
+            segment = segments[number]
+            if not os.path.exists(segment.path):
+                continue
+            segment.index = self._read_index(segment)
+            # A segment left open by a crash is never skipped by time.
+            segment.closed = segment.compressed or (
+                bool(segment.index)
+                and segment.index[-1][1] == os.path.getsize(segment.path)
+            )
+            self._segments.append(segment)
+
+    def _read_index(self, segment: _Segment) -> list[tuple[float, int]]:
+        try:
+            with open(segment.index_path, "r") as f:
+                entries = [line.split() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        return [(float(time), int(offset)) for time, offset in entries]
+
+    def append(self, record: LogRecord) -> None:
+        line = (record.model_dump_json() + "\n").encode()
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+
+            if not self._segments[-1].index or (
+                self._size - self._indexed_at >= self.config.index_interval
+            ):
+                self._add_index_entry(record.time, self._size)
+
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line)
+            self._last_time = record.time
+
+            if self._size >= self.config.segment_bytes:
+                self._close_segment()
+
+    def _open_segment(self) -> None:
+        # Each process starts a new segment rather than appending to one it
+        # didn't index.
+        number = self._segments[-1].number + 1 if self._segments else 0
+        segment = _Segment(number, self.config.directory)
+        self._segments.append(segment)
+        self._file = open(segment.path, "ab")
+        self._size = 0
+        self._indexed_at = 0
+
+    def _add_index_entry(self, time: float, offset: int) -> None:
+        segment = self._segments[-1]
+        segment.index.append((time, offset))
+        with open(segment.index_path, "a") as f:
+            f.write(f"{time!r} {offset}\n")
+        self._indexed_at = offset
+
+    def _close_segment(self) -> None:
+        segment = self._segments[-1]
+        self._add_index_entry(self._last_time, self._size)
+        self._file.close()
+        self._file = None
+        segment.closed = True
+
+        if self.config.compress:
+            with open(segment.path, "rb") as src, gzip.open(
+                segment.path + COMPRESSED_SUFFIX, "wb"
+            ) as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segment.path)
+            segment.compressed = True
+
+        while len(self._segments) > self.config.max_segments:
+            oldest = self._segments.pop(0)
+            for path in (oldest.path, oldest.index_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._close_segment()
+
+    def query(
+        self,
+        level: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        stream_id: str | None = None,
+        limit: int = 1000,
+    ) -> list[LogRecord]:
+        """Records matching every given filter, oldest first."""
+        levelno = _levelno(level) if level else None
+
+        records = []
+        for record in self._scan(since, until):
+            if levelno is not None and (_levelno(record.level) or 0) < levelno:
+                continue
+            if stream_id is not None and record.stream_id != stream_id:
+                continue
+            records.append(record)
+            if len(records) >= limit:
+                break
+        return records
+
+    def _scan(self, since: float | None, until: float | None) -> Iterator[LogRecord]:
+        with self._lock:
+            segments = list(self._segments)
+
+        for segment in segments:
+            if since is not None and segment.last_time is not None:
+                if segment.last_time < since:
+                    continue
+            if until is not None and segment.first_time is not None:
+                if segment.first_time > until:
+                    return
+
+            try:
+                f = segment.open()
+            except FileNotFoundError:
+                # Rotated away while scanning.
+                continue
+
+            with f:
+                f.seek(segment.start_offset(since))
+                for line in f:
+                    try:
+                        record = LogRecord(**json.loads(line))
+                    except ValueError:
+                        # A partly written last line.
+                        continue
+                    if since is not None and record.time < since:
+                        continue
+                    if until is not None and record.time > until:
+                        return
+                    yield record
+
+
+class StreamIdFilter(logging.Filter):
+    """
+    Stamps records with the current stream ID while they are still in the
+    task which logged them, for handlers running on another thread.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "stream_id", None) is None:
+            record.stream_id = current_stream_id.get()
+        return True
+
+
+class LogStoreHandler(logging.Handler):
+    """Writes log records to a `LogStore`."""
+
+    def __init__(self, store: LogStore, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self.store = store
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.store.append(
+                LogRecord(
+                    time=record.created,
+                    level=record.levelname,
+                    logger=record.name,
+                    message=record.getMessage(),
+                    stream_id=getattr(record, "stream_id", None)
+                    or current_stream_id.get(),
+                )
+            )
+        except Exception:
+            self.handleError(record)
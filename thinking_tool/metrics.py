@@ -0,0 +1,311 @@
+import bisect
+import logging
+from typing import Callable, Iterable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from a cached token to a cold load of a large model.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)  # fmt: skip
+INTER_TOKEN_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+TOKENS_PER_SECOND_BUCKETS = (1, 2.5, 5, 10, 20, 35, 50, 75, 100, 150, 250, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for key, value in self._values.items():
+            lines.append(
+                f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: a count per bucket (not cumulative), the last one
+        # for values above every bucket, then the sum.
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                labels = _format_labels(
+                    self.labels + ("le",), key + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics rendered in the Prometheus text format.
+
+    Updating a metric is a dict lookup and an addition, and only happens on
+    the event loop, so no locking is needed.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: '{metric.name}'")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _seconds(nanoseconds: int | None) -> float | None:
+    return nanoseconds / 1e9 if nanoseconds else None
+
+
+class ServerMetrics(MetricsRegistry):
+    """The metrics of a `ThinkingToolServer`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests = self.counter(
+            "thinking_requests_total",
+            "Requests handled, by route, method and status.",
+            ("route", "method", "status"),
+        )
+        self.queue_wait = self.histogram(
+            "thinking_queue_wait_seconds",
+            "Time spent waiting for a scheduler slot.",
+        )
+        self.rejected = self.counter(
+            "thinking_rejected_total",
+            "Requests rejected because the scheduler was saturated.",
+        )
+        self.generations = self.counter(
+            "thinking_generations_total",
+            "Generations by model and outcome.",
+            ("model", "outcome"),
+        )
+        self.generating = self.gauge(
+            "thinking_generations_in_flight",
+            "Generations currently streaming from a backend.",
+        )
+        self.time_to_first_token = self.histogram(
+            "thinking_time_to_first_token_seconds",
+            "Time from starting a chat to its first chunk, model load included.",
+            ("model",),
+        )
+        self.inter_token = self.histogram(
+            "thinking_inter_token_seconds",
+            "Mean time between chunks, one observation per generation.",
+            ("model",),
+            buckets=INTER_TOKEN_BUCKETS,
+        )
+        self.generation_time = self.histogram(
+            "thinking_generation_seconds",
+            "Time from starting a chat to its last chunk.",
+            ("model",),
+        )
+        self.tokens_per_second = self.histogram(
+            "thinking_tokens_per_second",
+            "Generation speed, from the backend's eval stats when available.",
+            ("model",),
+            buckets=TOKENS_PER_SECOND_BUCKETS,
+        )
+        self.backend_duration = self.histogram(
+            "ollama_duration_seconds",
+            "Durations reported by Ollama on the final chunk, by stage.",
+            ("model", "stage"),
+        )
+        self.tokens = self.counter(
+            "ollama_tokens_total",
+            "Tokens evaluated by Ollama, by kind.",
+            ("model", "kind"),
+        )
+        self.streams = self.gauge(
+            "thinking_streams",
+            "Registered streams, by state.",
+            ("state",),
+        )
+        self.scheduler_queued = self.gauge(
+            "thinking_scheduler_queued",
+            "Requests waiting for a scheduler slot.",
+        )
+        self.scheduler_active = self.gauge(
+            "thinking_scheduler_active",
+            "Scheduler slots in use, by model.",
+            ("model",),
+        )
+
+    def observe_generation(
+        self,
+        started: float,
+        first_at: float | None,
+        ended: float,
+        chunks: int,
+        last,
+        cancelled: bool = False,
+    ) -> None:
+        """Records a generation once it ends, from its timings and last chunk."""
+        model = last.model if last is not None else ""
+        done = last is not None and last.done
+        outcome = "cancelled" if cancelled else "done" if done else "stopped"
+        self.generations.inc(model=model, outcome=outcome)
+        if first_at is None:
+            return
+
+        self.time_to_first_token.observe(first_at - started, model=model)
+        if chunks > 1:
+            self.inter_token.observe((ended - first_at) / (chunks - 1), model=model)
+        if not done:
+            return
+
+        self.generation_time.observe(ended - started, model=model)
+        eval_seconds = _seconds(last.eval_duration)
+        if eval_seconds and last.eval_count:
+            self.tokens_per_second.observe(last.eval_count / eval_seconds, model=model)
+        elif chunks > 1 and ended > first_at:
+            # Each chunk carries about one token.
+            speed = (chunks - 1) / (ended - first_at)
+            self.tokens_per_second.observe(speed, model=model)
+
+        for stage, nanoseconds in (
+            ("load", last.load_duration),
+            ("prompt_eval", last.prompt_eval_duration),
+            ("eval", last.eval_duration),
+            ("total", last.total_duration),
+        ):
+            seconds = _seconds(nanoseconds)
+            if seconds is not None:
+                self.backend_duration.observe(seconds, model=model, stage=stage)
+        if last.prompt_eval_count:
+            self.tokens.inc(last.prompt_eval_count, model=model, kind="prompt")
+        if last.eval_count:
+            self.tokens.inc(last.eval_count, model=model, kind="completion")
+
+    def route_class(self) -> type[APIRoute]:
+        """A route class counting every request it handles."""
+        requests = self.requests
+
+        class InstrumentedRoute(APIRoute):
+            def get_route_handler(self) -> Callable:
+                handler = super().get_route_handler()
+                route = self.path
+
+                async def instrumented(request: Request) -> Response:
+                    try:
+                        response = await handler(request)
+                    except Exception as e:
+                        status = getattr(e, "status_code", 500)
+                        requests.inc(route=route, method=request.method, status=status)
+                        raise
+                    requests.inc(
+                        route=route,
+                        method=request.method,
+                        status=response.status_code,
+                    )
+                    return response
+
+                return instrumented
+
+        return InstrumentedRoute
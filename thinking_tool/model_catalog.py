@@ -0,0 +1,92 @@
+import asyncio
+from time import monotonic
+import logging
+
+import ollama
+
+from thinking_tool.backend_pool import BACKEND_ERRORS
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class ModelCatalog:
+    """
+    Caches the models available on an Ollama host along with their digests
+    and `show()` details.
+
+    The model list is fetched once and then served from memory.  After `ttl`
+    seconds the stale list is still returned, while a refresh runs in the
+    background.  `show()` details are kept per model until its digest
+    changes or the model is invalidated.
+    """
+
+    def __init__(self, client: ollama.AsyncClient, ttl: float = 60.0) -> None:
+        self.client = client
+        self.ttl = ttl
+
+        self._digests: dict[str, str] = {}
+        self._details: dict[str, tuple[str, dict]] = {}
+        self._fetched_at: float | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def stale(self) -> bool:
+        return self._fetched_at is None or monotonic() - self._fetched_at > self.ttl
+
+    async def models(self) -> dict[str, str]:
+        """
+        Returns a mapping of model name to digest.
+        """
+        if self._fetched_at is None:
+            await self.refresh()
+        elif self.stale:
+            self._refresh_in_background()
+        return self._digests
+
+    async def names(self) -> list[str]:
+        return list(await self.models())
+
+    async def digest(self, model: str) -> str | None:
+        return (await self.models()).get(model)
+
+    async def details(self, model: str) -> dict:
+        digest = await self.digest(model)
+        cached = self._details.get(model)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        details = (await self.client.show(model)).model_dump()
+        self._details[model] = (digest, details)
+        return details
+
+    async def refresh(self) -> None:
+        response = await self.client.list()
+        self._digests = {model.model: model.digest for model in response.models}
+        self._fetched_at = monotonic()
+
+        # Forget details of models which have gone away.
+        for model in list(self._details):
+            if model not in self._digests:
+                del self._details[model]
+
+    def invalidate(self, model: str | None = None) -> None:
+        """
+        Forces the next lookup to fetch the model list again.  If `model` is
+        given, its cached details are dropped as well, otherwise all are.
+        """
+        self._fetched_at = None
+        if model is None:
+            self._details.clear()
+        else:
+            self._details.pop(model, None)
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except BACKEND_ERRORS as e:
+            logger.error(f"Unable to refresh model catalog: {e}")
@@ -3,6 +3,30 @@ from .request import (
     ServerConfigRequest,
     ThinkingServerConfig,
     PullModelRequest,
+    RequestPriority,
+    SessionMessagesRequest,
+    SessionThinkingRequest,
+    ThinkingBatchRequest,
+    WireFormat,
+)
+from .response import (
+    BatchResult,
+    BudgetReport,
+    SessionResponse,
+    ThinkingResponse,
+    UpdateConfigResponse,
+)
+from .config import (
+    BatchConfig,
+    CodeWatchConfig,
+    ContextBudgetConfig,
+    LogStoreConfig,
+    OllamaConfig,
+    PullConfig,
+    ResponseCacheConfig,
+    SchedulerConfig,
+    SessionConfig,
+    StreamCoalescingConfig,
+    StreamRegistryConfig,
+    TracingConfig,
 )
-from .response import ThinkingResponse, UpdateConfigResponse
-from .config import OllamaConfig
@@ -4,4 +4,138 @@ from thinking_tool.base import BaseLLM_ManagerConfig
 
 
 class OllamaConfig(BaseLLM_ManagerConfig):
-    pass
+    # Additional Ollama hosts, e.g. "http://192.168.1.178:11434".  Requests are
+    # balanced across these and `host_uri()`.
+    hosts: list[str] = Field(default_factory=list)
+    # Consecutive failures before a host is ejected from the pool.
+    max_failures: int = Field(default=3)
+    # Seconds an ejected host sits out before it is tried again.
+    eject_seconds: float = Field(default=30.0)
+    # Seconds between background `ps()`/`list()` refreshes of each host.
+    refresh_interval: float = Field(default=10.0)
+    # Seconds the cached model catalog is served before it is refreshed.
+    catalog_ttl: float = Field(default=60.0)
+    # How long Ollama keeps a model loaded after its last request.
+    keep_alive: str = Field(default="30m")
+    # Load a model as soon as it is selected, rather than on the first chat.
+    warm_on_load: bool = Field(default=True)
+    # Models held loaded indefinitely, and reloaded if they go away.
+    pinned_models: list[str] = Field(default_factory=list)
+    # Models besides the pinned and configured ones each host may keep
+    # loaded.  The least recently used are unloaded first.
+    max_warm_models: int = Field(default=1)
+    # Seconds between `ps()` checks of the loaded models, 0 to disable.
+    keep_alive_interval: float = Field(default=60.0)
+
+    def host_uris(self) -> list[str]:
+        uris = [self.host_uri()]
+        uris.extend(host for host in self.hosts if host not in uris)
+        return uris
+
+
+class StreamRegistryConfig(BaseModel):
+    # Seconds a stream may wait for its first `/stream_response` before expiring.
+    ttl: float = Field(default=300.0)
+    # Maximum number of streams (pending, active or done) held at once.
+    max_streams: int = Field(default=1024)
+    # Seconds of silence before SSE and WebSocket streams send a ping.
+    heartbeat_interval: float = Field(default=15.0)
+    # Seconds an SSE or WebSocket stream keeps generating without a client,
+    # so one which reconnects can resume.  `/stream_response` streams are
+    # cancelled as soon as their client goes away.
+    resume_timeout: float = Field(default=30.0)
+
+
+class SchedulerConfig(BaseModel):
+    # Generations allowed to run at once per model, unless overridden below.
+    max_concurrency: int = Field(default=2)
+    model_concurrency: dict[str, int] = Field(default_factory=dict)
+    # Requests allowed to wait for a slot across all models.
+    max_queue: int = Field(default=64)
+    # Seconds a request may wait for a slot before it is rejected.
+    queue_timeout: float = Field(default=60.0)
+    # Value of the Retry-After header on 429 and 503 responses.
+    retry_after: int = Field(default=5)
+
+
+class ResponseCacheConfig(BaseModel):
+    # Only worth enabling for deterministic prompts and model options.
+    enabled: bool = Field(default=False)
+    max_entries: int = Field(default=256)
+    # Serialized size of all cached streams held in memory.
+    max_bytes: int = Field(default=64 * 1024 * 1024)
+    # Optional directory for a second, on-disk tier.
+    directory: str | None = Field(default=None)
+    max_disk_entries: int = Field(default=4096)
+
+
+class SessionConfig(BaseModel):
+    max_sessions: int = Field(default=256)
+    # Seconds an idle session is kept.
+    ttl: float = Field(default=3600.0)
+    # How long Ollama keeps the model, and its cached prompt prefix, loaded
+    # between turns.
+    keep_alive: str = Field(default="30m")
+
+
+class ContextBudgetConfig(BaseModel):
+    # When disabled prompts are still measured, but never trimmed.
+    enabled: bool = Field(default=True)
+    chars_per_token: float = Field(default=4.0)
+    # Tokens of the context window kept free for the reply.
+    reserve_tokens: int = Field(default=1024)
+    # Optional cap on prompt tokens below the context window.
+    max_prompt_tokens: int | None = Field(default=None)
+    # Ollama's context window when the model doesn't set `num_ctx`.
+    default_context_length: int = Field(default=4096)
+
+
+class CodeWatchConfig(BaseModel):
+    # Keep the code index up to date from filesystem events instead of
+    # scanning on every `/code` request.
+    enabled: bool = Field(default=False)
+    # Poll instead of using inotify, e.g. for network filesystems.
+    polling: bool = Field(default=False)
+    # Seconds between scans when polling.
+    poll_interval: float = Field(default=1.0)
+
+
+class LogStoreConfig(BaseModel):
+    # Also write logs as structured records, queryable through `/logs`.
+    enabled: bool = Field(default=False)
+    directory: str = Field(default="thinking_logs")
+    # Bytes written to a segment before a new one is started.
+    segment_bytes: int = Field(default=8 * 1024 * 1024)
+    # Bytes between two entries of a segment's time index.
+    index_interval: int = Field(default=64 * 1024)
+    # Oldest segments beyond this are deleted.
+    max_segments: int = Field(default=16)
+    # Gzip segments once they are full.
+    compress: bool = Field(default=True)
+
+
+class StreamCoalescingConfig(BaseModel):
+    # Seconds a chunk may wait to be written together with the ones after
+    # it.  0 writes every chunk on its own.
+    flush_interval: float = Field(default=0.02)
+    # Bytes which are written straight away.
+    flush_bytes: int = Field(default=16 * 1024)
+
+
+class BatchConfig(BaseModel):
+    # Requests of a `/think_batch` generating at once.  They still queue for
+    # scheduler slots like any other request.
+    max_parallel: int = Field(default=4)
+    # Largest batch accepted.
+    max_requests: int = Field(default=1024)
+
+
+class PullConfig(BaseModel):
+    # Downloads allowed to run at once, later pulls wait for a slot.
+    max_parallel: int = Field(default=1)
+
+
+class TracingConfig(BaseModel):
+    enabled: bool = Field(default=True)
+    # Most recent spans kept in memory, older ones are dropped.
+    max_spans: int = Field(default=10000)
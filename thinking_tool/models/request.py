@@ -1,8 +1,22 @@
 import logging
+from enum import Enum
 from typing import Callable
 from pydantic import BaseModel, Field
 
-from thinking_tool.models.config import OllamaConfig
+from thinking_tool.models.config import (
+    BatchConfig,
+    CodeWatchConfig,
+    ContextBudgetConfig,
+    LogStoreConfig,
+    StreamCoalescingConfig,
+    OllamaConfig,
+    PullConfig,
+    ResponseCacheConfig,
+    SchedulerConfig,
+    SessionConfig,
+    StreamRegistryConfig,
+    TracingConfig,
+)
 
 
 logger = logging.getLogger(__name__ + "." + __file__)
@@ -11,14 +25,58 @@ logger = logging.getLogger(__name__ + "." + __file__)
 class ThinkingServerConfig(BaseModel):
     name: str = Field(default="deep_thought")
     model_settings: OllamaConfig = OllamaConfig()
+    streams: StreamRegistryConfig = StreamRegistryConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    # Identical in-flight /think requests share a single generation.
+    coalesce_requests: bool = Field(default=True)
+    # Level every streamed chunk is logged at.  Each generation is also
+    # summarised in a single INFO record.
+    chunk_log_level: str = Field(default="DEBUG")
+    stream_coalescing: StreamCoalescingConfig = StreamCoalescingConfig()
+    sessions: SessionConfig = SessionConfig()
+    context_budget: ContextBudgetConfig = ContextBudgetConfig()
+    code_watch: CodeWatchConfig = CodeWatchConfig()
+    log_store: LogStoreConfig = LogStoreConfig()
+    pulls: PullConfig = PullConfig()
+    batch: BatchConfig = BatchConfig()
+    tracing: TracingConfig = TracingConfig()
 
 
 class ServerConfigRequest(BaseModel):
     config: ThinkingServerConfig
 
 
+class RequestPriority(str, Enum):
+    interactive = "interactive"
+    batch = "batch"
+
+
+class WireFormat(str, Enum):
+    # Every chunk as a complete `ChatResponse`.
+    full = "full"
+    # Only `content`, `thinking` and `done`, with the stats on the last chunk.
+    lean = "lean"
+
+
 class ThinkingRequest(BaseModel):
     messages: list[str] | None
+    priority: RequestPriority = RequestPriority.interactive
+
+
+class ThinkingBatchRequest(BaseModel):
+    requests: list[ThinkingRequest]
+
+
+class SessionMessagesRequest(BaseModel):
+    messages: list[str]
+    role: str = "user"
+
+
+class SessionThinkingRequest(BaseModel):
+    # New user turns only, the history is kept by the server.
+    messages: list[str] = Field(default_factory=list)
+    priority: RequestPriority = RequestPriority.interactive
 
 
 class PullModelRequest(BaseModel):
@@ -34,3 +92,5 @@ class StreamRequest(BaseModel):
     request: dict
     method: Callable = None
     media_type: str = "text/plain"
+    # Streams with a priority take a scheduler slot while they generate.
+    priority: RequestPriority | None = None
@@ -1,5 +1,6 @@
 import logging
 from fastapi.responses import JSONResponse
+from ollama import ChatResponse
 from pydantic import BaseModel
 
 from thinking_tool.models.request import ThinkingServerConfig
@@ -25,8 +26,33 @@ class ThinkingResponse(BaseModel):
     # stream_url: str
 
 
+class BudgetReport(BaseModel):
+    # Estimated prompt size and the decisions made to fit it.
+    context_length: int
+    budget: int
+    original_tokens: int
+    prompt_tokens: int
+    dropped_messages: int = 0
+    truncated_messages: int = 0
+
+
 class StreamResponse(BaseModel):
     stream_url: str | None
+    budget: BudgetReport | None = None
+
+
+class BatchResult(BaseModel):
+    # Position of the request in the batch, results arrive as they finish.
+    index: int
+    # The whole thought, with the stats of its last chunk.
+    response: ChatResponse | None = None
+    error: str | None = None
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+    length: int = 0
+    busy: bool = False
 
 
 class OllamaErroResponse(JSONResponse):
@@ -34,7 +60,7 @@ class OllamaErroResponse(JSONResponse):
 
     def __init__(self, error_msg: str):
         content = {"message": f"Unable to connect to llama service.\n{error_msg}"}
-        super().__init__(content=content)
+        super().__init__(content=content, status_code=self.status_code)
 
 
 class OllamaNoDownloadedModelsResponse(JSONResponse):
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import AsyncGenerator, AsyncIterator, Callable
+
+import ollama
+
+from thinking_tool.broadcast import Broadcast
+from thinking_tool.models.config import PullConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+ProgressResponse = ollama.ProgressResponse
+
+QUEUED = "queued"
+
+
+def pull_key(model: str) -> str:
+    # Ollama treats a name without a tag as `:latest`.
+    return model if ":" in model.rsplit("/", 1)[-1] else f"{model}:latest"
+
+
+async def progress(
+    broadcast: Broadcast, start: int = 0
+) -> AsyncGenerator[ProgressResponse, None]:
+    """
+    Streams the progress of a pull from the `start`th update.  Raises the
+    pull's error if it failed.
+    """
+    async for _, chunk in broadcast.subscribe(start):
+        yield chunk
+
+
+class PullManager:
+    """
+    Runs model pulls as background tasks, one per model.
+
+    Requests for a model which is already being pulled join its download
+    rather than starting another.  Progress is kept in a `Broadcast`, so
+    every subscriber gets the whole stream and a subscriber going away
+    doesn't stop the download.  At most `max_parallel` downloads run at once,
+    the rest report `queued` until a slot frees up.
+    """
+
+    def __init__(
+        self,
+        pull: Callable[[str], AsyncIterator[ProgressResponse]],
+        config: PullConfig = None,
+    ) -> None:
+        self.config = config if config else PullConfig()
+        self._pull = pull
+        self._pulls: dict[str, Broadcast] = {}
+        self._slots: asyncio.Semaphore | None = None
+
+    def __contains__(self, model: str) -> bool:
+        return pull_key(model) in self._pulls
+
+    def get(self, model: str) -> Broadcast | None:
+        return self._pulls.get(pull_key(model))
+
+    def pull(self, model: str) -> Broadcast:
+        """
+        Returns the running pull of `model`, starting one if there is none.
+        """
+        key = pull_key(model)
+        broadcast = self._pulls.get(key)
+        if broadcast is None:
+            broadcast = Broadcast(
+                self._download(model),
+                on_done=lambda done: self._forget(key, done),
+            ).start()
+            self._pulls[key] = broadcast
+        return broadcast
+
+    async def subscribe(
+        self, model: str, start: int = 0
+    ) -> AsyncGenerator[ProgressResponse, None]:
+        """
+        Streams the progress of the pull of `model`, from the `start`th
+        update.  Raises the pull's error if it failed.
+        """
+        async for chunk in progress(self.pull(model), start):
+            yield chunk
+
+    def status(self) -> list[dict]:
+        pulls = []
+        for model, broadcast in self._pulls.items():
+            last = broadcast.chunks[-1] if broadcast.chunks else None
+            pulls.append(
+                {
+                    "model": model,
+                    "status": last.status if last else None,
+                    "completed": last.completed if last else None,
+                    "total": last.total if last else None,
+                    "updates": len(broadcast.chunks),
+                    "subscribers": broadcast.subscribers,
+                }
+            )
+        return pulls
+
+    async def _download(self, model: str) -> AsyncGenerator[ProgressResponse, None]:
+        # Created lazily, so it belongs to the running loop.
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.config.max_parallel)
+        if self._slots.locked():
+            yield ProgressResponse(status=QUEUED)
+
+        async with self._slots:
+            logger.info(f"Pull started: '{model}'")
+            async for chunk in self._pull(model):
+                yield chunk
+            logger.info(f"Pull finished: '{model}'")
+
+    def _forget(self, key: str, broadcast: Broadcast) -> None:
+        if self._pulls.get(key) is broadcast:
+            del self._pulls[key]
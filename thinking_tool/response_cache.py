@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from thinking_tool.llm_manager import ChatResponse
+from thinking_tool.models.config import ResponseCacheConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+@dataclass
+class CacheEntry:
+    chunks: list[ChatResponse]
+    size: int
+
+
+class ResponseCache:
+    """
+    Exact-match cache of complete thought streams.
+
+    Entries are keyed by a hash of the model digest, the messages and the chat
+    options, and hold the chunk sequence so a hit can be replayed as a
+    stream.  Memory is bounded by entry count and serialized size with LRU
+    eviction.  If a directory is configured, entries are also written there
+    as NDJSON and promoted back into memory on a memory miss.
+    """
+
+    def __init__(self, config: ResponseCacheConfig = None) -> None:
+        self.config = config if config else ResponseCacheConfig()
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._directory = Path(self.config.directory) if self.config.directory else None
+        if self._directory:
+            self._directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    @staticmethod
+    def key(model: str, digest: str | None, messages: list, options: dict) -> str:
+        payload = json.dumps(
+            {
+                "model": model,
+                "digest": digest,
+                "messages": [
+                    m.model_dump() if isinstance(m, BaseModel) else m for m in messages
+                ],
+                "options": options,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or (
+            self._directory is not None and self._path(key).exists()
+        )
+
+    async def get(self, key: str) -> list[ChatResponse] | None:
+        entry = self._entries.get(key)
+        if entry is None and self._directory is not None:
+            entry = await asyncio.to_thread(self._read, key)
+            if entry is not None:
+                self._store(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry.chunks
+
+    async def put(self, key: str, chunks: list[ChatResponse]) -> None:
+        lines = [chunk.model_dump_json() for chunk in chunks]
+        entry = CacheEntry(chunks=chunks, size=sum(len(line) for line in lines))
+        if entry.size > self.config.max_bytes:
+            return
+
+        self._store(key, entry)
+        if self._directory is not None:
+            await asyncio.to_thread(self._write, key, lines)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self.size,
+        }
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= previous.size
+
+        self._entries[key] = entry
+        self.size += entry.size
+
+        while self._entries and (
+            len(self._entries) > self.config.max_entries
+            or self.size > self.config.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.ndjson"
+
+    def _read(self, key: str) -> CacheEntry | None:
+        try:
+            with open(self._path(key), "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+
+        chunks = [ChatResponse.model_validate_json(line) for line in lines if line]
+        return CacheEntry(chunks=chunks, size=sum(len(line) for line in lines))
+
+    def _write(self, key: str, lines: list[str]) -> None:
+        path = self._path(key)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
+
+        files = sorted(self._directory.glob("*.ndjson"), key=os.path.getmtime)
+        for stale in files[: max(len(files) - self.config.max_disk_entries, 0)]:
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+from itertools import count
+from time import monotonic
+import logging
+
+from thinking_tool.models.config import SchedulerConfig
+from thinking_tool.models.request import RequestPriority
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+# Lower ranks are served first.
+PRIORITY_RANK = {
+    RequestPriority.interactive: 0,
+    RequestPriority.batch: 1,
+}
+
+
+class SchedulerSaturated(Exception):
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SchedulerTimeout(SchedulerSaturated):
+    status_code = 503
+
+
+class Ticket:
+    """
+    A slot for one generation.  Releasing it hands the slot to the next
+    waiter; releasing twice is harmless.
+    """
+
+    def __init__(self, lane: "_ModelLane", queued_for: float = 0.0) -> None:
+        self.queued_for = queued_for
+        self._lane = lane
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._lane.release()
+
+
+class _ModelLane:
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self.waiters: list[tuple[int, int, asyncio.Future]] = []
+
+    def release(self) -> None:
+        # Hand the slot straight to the best waiter, so `active` only drops
+        # when nobody is waiting.
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class RequestScheduler:
+    """
+    Admission control in front of the LLM manager.
+
+    Each model may run `max_concurrency` generations at once.  Further
+    requests wait in a queue shared by all models, interactive requests ahead
+    of batch requests.  A full queue raises `SchedulerSaturated` (429) and a
+    request waiting longer than `queue_timeout` raises `SchedulerTimeout`
+    (503).
+    """
+
+    def __init__(self, config: SchedulerConfig = None) -> None:
+        self.config = config if config else SchedulerConfig()
+        self.queued = 0
+        self._lanes: dict[str, _ModelLane] = {}
+        self._sequence = count()
+
+    async def acquire(
+        self,
+        model: str,
+        priority: RequestPriority = RequestPriority.interactive,
+    ) -> Ticket:
+        lane = self._lane(model)
+        if lane.active < lane.limit and not self._has_waiters(lane):
+            lane.active += 1
+            return Ticket(lane)
+
+        if self.queued >= self.config.max_queue:
+            raise SchedulerSaturated(
+                f"Request queue is full ({self.config.max_queue} waiting)",
+                retry_after=self.config.retry_after,
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (PRIORITY_RANK[priority], next(self._sequence), future)
+        heapq.heappush(lane.waiters, entry)
+        self.queued += 1
+        started = monotonic()
+        try:
+            await asyncio.wait_for(future, self.config.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # The slot may have been handed over just before the timeout or
+            # cancellation.
+            if future.done() and not future.cancelled():
+                lane.release()
+            if isinstance(e, asyncio.TimeoutError):
+                raise SchedulerTimeout(
+                    f"Timed out after {self.config.queue_timeout}s "
+                    f"waiting for '{model}'",
+                    retry_after=self.config.retry_after,
+                )
+            raise
+        finally:
+            self.queued -= 1
+
+        return Ticket(lane, queued_for=monotonic() - started)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "models": {
+                model: {"active": lane.active, "limit": lane.limit}
+                for model, lane in self._lanes.items()
+            },
+        }
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            limit = self.config.model_concurrency.get(
+                model, self.config.max_concurrency
+            )
+            lane = self._lanes[model] = _ModelLane(limit)
+        return lane
+
+    def _has_waiters(self, lane: _ModelLane) -> bool:
+        return any(not future.done() for _, _, future in lane.waiters)
@@ -1,7 +1,15 @@
+from dataclasses import dataclass
+from hashlib import sha1
 from pathlib import Path
 from pydantic import BaseModel
 from glob import glob
+from typing import AsyncGenerator, Callable
 import logging
+import os
+import threading
+
+from thinking_tool.code_watcher import CodeWatcher, create_watcher
+from thinking_tool.log_reader import LogRange, follow, read_range, tail
 
 logger = logging.getLogger(__name__ + "." + __file__)
 
@@ -16,7 +24,39 @@ class LogFile(BaseModel):
     content: str
 
 
+class CodeChange(BaseModel):
+    name: str
+    # "created", "modified" or "deleted".
+    event: str
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as used for `If-None-Match`.
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+@dataclass
+class _CachedFile:
+    mtime_ns: int
+    size: int
+    code_file: CodeFile
+
+    @property
+    def signature(self) -> str:
+        return f"{self.mtime_ns:x}-{self.size:x}"
+
+
 class SelfAwareness:
+    """
+    Reads the server's own code and logs.  Code files are cached by path and
+    only re-read when their mtime or size changes.
+
+    After `watch()` the cache is kept up to date by a filesystem watcher
+    instead, so reads no longer touch the disk and subscribers are told
+    about every change.
+    """
+
     code_directory: str
 
     log_directory: str
@@ -29,28 +69,129 @@ class SelfAwareness:
         super().__init__()
         self.code_directory = code_directory
         self.log_filepath = Path(__file__).parent / log_directory / self.log_filename
+        # Code files by name, which is their path as found by `glob`.
+        self._files: dict[str, _CachedFile] = {}
+        # Guards `_files` against the watcher thread.
+        self._lock = threading.RLock()
+        self._watcher: CodeWatcher | None = None
+        self._subscribers: list[Callable[[CodeChange], None]] = []
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None
+
+    def watch(self, poll_interval: float = 1.0, polling: bool = False) -> None:
+        if self._watcher is not None:
+            return
+
+        # Started before the scan, so nothing changes unseen in between.
+        watcher = create_watcher(
+            self.code_directory,
+            self._on_change,
+            poll_interval=poll_interval,
+            polling=polling,
+        ).start()
+        with self._lock:
+            self._scan_code()
+            self._watcher = watcher
+        logger.info(f"Watching code files with {type(watcher).__name__}")
+
+    def unwatch(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def subscribe(self, callback: Callable[[CodeChange], None]) -> Callable[[], None]:
+        """
+        Calls `callback` with every change seen while watching.  It runs on
+        the watcher thread.  Returns a function which unsubscribes.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
 
     def _load_code(self):
+        with self._lock:
+            if self._watcher is not None:
+                return [cached.code_file for cached in self._files.values()]
+            return self._scan_code()
+
+    def _scan_code(self):
         pattern = f"{self.code_directory}/**/*.py"
-        logger.info(f"Looking for code files in '{pattern}'")
+        logger.debug(f"Looking for code files in '{pattern}'")
         file_paths = glob(pattern, recursive=True)
-        logger.info("Found code files:")
-        logger.info(file_paths)
+
+        for name in set(self._files) - set(file_paths):
+            del self._files[name]
 
         code_files = []
 
         for code_path in file_paths:
-            with open(code_path, "r") as f:
-                content = f.read()
-                code_files.append(CodeFile(name=code_path, content=content))
+            code_file = self._load_file(code_path)
+            if code_file is not None:
+                code_files.append(code_file)
 
         if code_files is None or len(code_files) == 0:
             logger.error("No code files found")
 
-        logger.info(f"Loaded code files: {len(code_files)}")
+        logger.debug(f"Loaded code files: {len(code_files)}")
 
         return code_files
 
+    def _load_file(self, name: str) -> CodeFile | None:
+        try:
+            stat = os.stat(name)
+        except OSError:
+            self._files.pop(name, None)
+            return None
+
+        cached = self._files.get(name)
+        if (
+            cached is not None
+            and cached.mtime_ns == stat.st_mtime_ns
+            and cached.size == stat.st_size
+        ):
+            return cached.code_file
+
+        with open(name, "r") as f:
+            code_file = CodeFile(name=name, content=f.read())
+
+        logger.info(f"Loaded code file: '{name}'")
+        self._files[name] = _CachedFile(stat.st_mtime_ns, stat.st_size, code_file)
+        return code_file
+
+    def _on_change(self, path: str) -> None:
+        # Directories are rescanned, picking up new files and dropping gone ones.
+        names = {path}
+        if not path.endswith(".py"):
+            prefix = os.path.join(path, "")
+            names = set(glob(f"{path}/**/*.py", recursive=True))
+            with self._lock:
+                names.update(name for name in self._files if name.startswith(prefix))
+
+        for name in sorted(names):
+            with self._lock:
+                change = self._refresh(name)
+            if change is None:
+                continue
+
+            logger.info(f"Code file {change.event}: '{name}'")
+            for callback in list(self._subscribers):
+                try:
+                    callback(change)
+                except Exception as e:
+                    logger.exception(e)
+
+    def _refresh(self, name: str) -> CodeChange | None:
+        before = self._files.get(name)
+        code_file = self._load_file(name)
+        if code_file is None:
+            return CodeChange(name=name, event="deleted") if before else None
+        if before is None:
+            return CodeChange(name=name, event="created")
+        if before.code_file is not code_file:
+            return CodeChange(name=name, event="modified")
+        return None
+
     def _load_logs(self):
         with open(self.log_filepath, "r") as f:
             content = f.read()
@@ -60,12 +201,49 @@ class SelfAwareness:
         if name is None:
             return None
 
-        for code_file in self._load_code():
-            if code_file.name == name:
-                return code_file
+        with self._lock:
+            if self._watcher is not None:
+                cached = self._files.get(name)
+                return cached.code_file if cached else None
+
+            # Only names found by a scan are read, unknown ones trigger a rescan.
+            if name not in self._files:
+                self._scan_code()
+                cached = self._files.get(name)
+                return cached.code_file if cached else None
+
+            return self._load_file(name)
 
     def all_code_files(self) -> list[CodeFile]:
         return self._load_code()
 
+    def etag(self, name: str | None = None) -> str | None:
+        """
+        Weak ETag of a cached code file, or of all of them when `name` is
+        `None`.  Built from mtimes and sizes, so call it after loading.
+        """
+        with self._lock:
+            if name is not None:
+                cached = self._files.get(name)
+                return f'W/"{cached.signature}"' if cached else None
+
+            digest = sha1()
+            for name in sorted(self._files):
+                digest.update(f"{name}:{self._files[name].signature};".encode())
+            return f'W/"{digest.hexdigest()}"'
+
     def all_log_files(self) -> list:
         return self._load_logs()
+
+    def log_range(self, offset: int = 0, length: int | None = None) -> LogRange:
+        if length is None:
+            return read_range(self.log_filepath, offset)
+        return read_range(self.log_filepath, offset, length)
+
+    def log_tail(self, lines: int) -> LogRange:
+        return tail(self.log_filepath, lines)
+
+    def follow_logs(
+        self, offset: int | None = None, heartbeat: float | None = None
+    ) -> AsyncGenerator[LogRange, None]:
+        return follow(self.log_filepath, offset, heartbeat=heartbeat)
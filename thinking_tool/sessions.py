@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import monotonic
+from uuid import uuid4
+import logging
+
+from thinking_tool.llm_manager import Message
+from thinking_tool.models.config import SessionConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+@dataclass
+class Session:
+    session_id: str
+    messages: list[Message] = field(default_factory=list)
+    last_used: float = field(default_factory=monotonic)
+    # Set while a thought is generated, turns can't interleave.
+    busy: bool = False
+
+    def append(self, role: str, contents: list[str]) -> None:
+        self.messages.extend(Message(role=role, content=c) for c in contents)
+        self.last_used = monotonic()
+
+    def status(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "length": len(self.messages),
+            "busy": self.busy,
+        }
+
+
+class SessionStoreFull(Exception):
+    pass
+
+
+class SessionStore:
+    """
+    Keeps conversation histories on the server so clients only send new
+    turns.  Sessions idle for longer than `ttl` expire, and the least
+    recently used session which isn't busy is evicted once `max_sessions`
+    is reached.
+    """
+
+    def __init__(self, config: SessionConfig = None) -> None:
+        self.config = config if config else SessionConfig()
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self) -> Session:
+        self.expire()
+        while len(self._sessions) >= self.config.max_sessions:
+            # Busy sessions have a turn in flight, which would be lost.
+            session_id = next(
+                (sid for sid, s in self._sessions.items() if not s.busy), None
+            )
+            if session_id is None:
+                raise SessionStoreFull(
+                    f"Session store is full ({self.config.max_sessions} sessions, "
+                    "all busy)"
+                )
+            del self._sessions[session_id]
+            logger.info(f"Session evicted: '{session_id}'")
+
+        session = Session(session_id=str(uuid4()))
+        self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        self.expire()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> Session | None:
+        return self._sessions.pop(session_id, None)
+
+    def expire(self) -> None:
+        # Least recently used first, so stop at the first live session.
+        now = monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.busy or now - session.last_used <= self.config.ttl:
+                return
+            logger.info(f"Session expired: '{session_id}'")
+            del self._sessions[session_id]
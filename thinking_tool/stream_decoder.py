@@ -0,0 +1,82 @@
+import json
+import logging
+from typing import Any, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+DEFAULT_READ_SIZE = 64 * 1024
+
+CR = ord("\r")
+
+
+def loads(data: memoryview | bytes) -> Any:
+    # orjson parses straight from the memoryview; the standard library needs
+    # its own bytes copy of the record.
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+class NDJSONDecoder:
+    """
+    Incrementally splits a byte stream into newline delimited JSON records.
+
+    Bytes are appended to one reusable buffer and complete records are
+    parsed through a `memoryview` of it, so records may span any number of
+    reads and a single read may hold any number of records.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        # Bytes before this offset are known not to contain a newline.
+        self._scanned = 0
+
+    def feed(self, data: bytes) -> list[Any]:
+        """
+        Adds `data` to the buffer and returns every record it completed.
+        """
+        buffer = self._buffer
+        buffer += data
+
+        records = []
+        start = 0
+        with memoryview(buffer) as view:
+            while True:
+                end = buffer.find(b"\n", max(start, self._scanned))
+                if end == -1:
+                    break
+                stop = end - 1 if end > start and buffer[end - 1] == CR else end
+                if stop > start:
+                    records.append(loads(view[start:stop]))
+                start = end + 1
+
+        if start:
+            del buffer[:start]
+        self._scanned = len(buffer)
+        return records
+
+    def flush(self) -> list[Any]:
+        """
+        Returns the trailing record of a stream which didn't end in a newline.
+        """
+        if not self._buffer.strip():
+            self._buffer.clear()
+            self._scanned = 0
+            return []
+
+        record = loads(self._buffer)
+        self._buffer.clear()
+        self._scanned = 0
+        return [record]
+
+
+def decode_ndjson(chunks: Iterable[bytes]) -> Iterator[Any]:
+    decoder = NDJSONDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.flush()
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from time import monotonic
+from typing import Any
+import logging
+
+from thinking_tool.models.config import StreamRegistryConfig
+from thinking_tool.models.request import StreamRequest
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+# Minimum number of seconds between two expiry sweeps.
+SWEEP_INTERVAL = 1.0
+
+
+class StreamState(Enum):
+    pending = "pending"
+    active = "active"
+    done = "done"
+
+
+class StreamRegistryFull(Exception):
+    pass
+
+
+@dataclass
+class StreamEntry:
+    request: StreamRequest
+    state: StreamState = StreamState.pending
+    created_at: float = field(default_factory=monotonic)
+    updated_at: float = field(default_factory=monotonic)
+    # Set when the stream is served through a resumable transport.
+    broadcast: Any = None
+
+    @property
+    def stream_id(self) -> str:
+        return self.request.stream_id
+
+    def status(self) -> dict:
+        return {
+            "stream_id": self.stream_id,
+            "state": self.state.value,
+            "age": monotonic() - self.created_at,
+            "cancelled": bool(getattr(self.broadcast, "cancelled", False)),
+        }
+
+
+class StreamRegistry:
+    """
+    Holds every stream created by `/think` or `/pull_model` until it is
+    consumed, expires or is evicted.
+
+    Streams move from `pending` (registered, not yet requested) to `active`
+    (being served) to `done`.  Pending and done streams older than the
+    configured TTL are dropped.  The registry is only touched from the event
+    loop, so it needs no locking.
+    """
+
+    def __init__(self, config: StreamRegistryConfig = None) -> None:
+        self.config = config if config else StreamRegistryConfig()
+        self._streams: OrderedDict[str, StreamEntry] = OrderedDict()
+        self._last_sweep = monotonic()
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def __contains__(self, stream_id: str) -> bool:
+        return stream_id in self._streams
+
+    def register(self, request: StreamRequest) -> StreamEntry:
+        self.expire()
+
+        if len(self._streams) >= self.config.max_streams:
+            self._evict_done()
+
+        if len(self._streams) >= self.config.max_streams:
+            raise StreamRegistryFull(
+                f"Stream registry is full ({self.config.max_streams} streams)"
+            )
+
+        entry = StreamEntry(request=request)
+        self._streams[request.stream_id] = entry
+        return entry
+
+    def get(self, stream_id: str) -> StreamEntry | None:
+        self.expire()
+        return self._streams.get(stream_id)
+
+    def claim(self, stream_id: str) -> StreamEntry | None:
+        """
+        Marks a pending stream as active and returns it.  Returns `None` when
+        the stream is unknown, expired or already claimed.
+        """
+        entry = self.get(stream_id)
+        if entry is None or entry.state != StreamState.pending:
+            return None
+
+        self._set_state(entry, StreamState.active)
+        return entry
+
+    def unclaim(self, stream_id: str) -> None:
+        """
+        Puts an active stream back to pending, e.g. when it couldn't be
+        served yet, so it can be claimed again.
+        """
+        entry = self._streams.get(stream_id)
+        if entry is not None and entry.state == StreamState.active:
+            self._set_state(entry, StreamState.pending)
+
+    def finish(self, stream_id: str) -> None:
+        entry = self._streams.get(stream_id)
+        if entry is not None:
+            self._set_state(entry, StreamState.done)
+
+    def remove(self, stream_id: str) -> StreamEntry | None:
+        return self._streams.pop(stream_id, None)
+
+    def stats(self) -> dict:
+        counts = {state.value: 0 for state in StreamState}
+        for entry in self._streams.values():
+            counts[entry.state.value] += 1
+        return counts
+
+    def expire(self, force: bool = False) -> None:
+        now = monotonic()
+        if not force and now - self._last_sweep < SWEEP_INTERVAL:
+            return
+
+        self._last_sweep = now
+        expired = [
+            stream_id
+            for stream_id, entry in self._streams.items()
+            if entry.state != StreamState.active
+            and now - entry.updated_at > self.config.ttl
+        ]
+        for stream_id in expired:
+            logger.info(f"Stream expired: '{stream_id}'")
+            del self._streams[stream_id]
+
+    def _evict_done(self) -> None:
+        # Oldest first, as the registry keeps insertion order.
+        for stream_id, entry in list(self._streams.items()):
+            if len(self._streams) < self.config.max_streams:
+                return
+            if entry.state == StreamState.done:
+                del self._streams[stream_id]
+
+    def _set_state(self, entry: StreamEntry, state: StreamState) -> None:
+        entry.state = state
+        entry.updated_at = monotonic()
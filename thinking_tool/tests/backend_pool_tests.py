@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+import logging
+import httpx
+import ollama
+
+from thinking_tool.backend_pool import OllamaBackendPool
+from thinking_tool.llm_manager import (
+    LLM_ManagerStatus,
+    Message,
+    OllamaLLM_Manager,
+)
+from thinking_tool.models.config import OllamaConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+HOSTS = ["http://ollama-b:11434", "http://ollama-c:11434"]
+
+
+class FailingClient:
+    async def ps(self):
+        raise ConnectionError("Connection refused")
+
+    async def list(self):
+        raise ConnectionError("Connection refused")
+
+    async def chat(self, **kwargs):
+        async def stream():
+            raise httpx.ConnectError("Connection refused")
+            yield
+
+        return stream()
+
+
+class WorkingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def ps(self):
+        return ollama.ProcessResponse(models=[])
+
+    async def list(self):
+        return ollama.ListResponse(models=[])
+
+    async def chat(self, **kwargs):
+        self.calls += 1
+
+        async def stream():
+            for content in ["Hello", " there"]:
+                yield ollama.ChatResponse(
+                    model=kwargs["model"],
+                    message=Message(role="assistant", content=content),
+                )
+
+        return stream()
+
+
+class StallingClient(WorkingClient):
+    def __init__(self):
+        super().__init__()
+        self.closed = False
+
+    async def chat(self, **kwargs):
+        async def stream():
+            try:
+                await asyncio.sleep(60)
+                yield
+            finally:
+                self.closed = True
+
+        return stream()
+
+
+@pytest.fixture
+def config():
+    return OllamaConfig(host="http://ollama-a", hosts=HOSTS, max_failures=1)
+
+
+def test_pool_builds_a_client_per_host(config: OllamaConfig):
+    pool = OllamaBackendPool(config)
+    assert [b.host for b in pool.backends] == ["http://ollama-a:11434"] + HOSTS
+    assert pool.primary.host == config.host_uri()
+
+
+def test_pool_prefers_hosts_with_model_loaded(config: OllamaConfig):
+    pool = OllamaBackendPool(config)
+    pool.backends[0].outstanding = 1
+    pool.backends[2].loaded_models.add("qwen2.5:0.5b")
+    pool.backends[2].outstanding = 5
+
+    candidates = pool.candidates("qwen2.5:0.5b")
+    assert candidates[0] is pool.backends[2]
+    assert candidates[1] is pool.backends[1]
+
+
+def test_pool_ejects_failing_hosts(config: OllamaConfig):
+    pool = OllamaBackendPool(config)
+    pool.mark_failure(pool.backends[0], ConnectionError("down"))
+
+    assert not pool.backends[0].healthy
+    assert pool.candidates("any")[-1] is pool.backends[0]
+
+
+def test_pool_ignores_model_errors_for_health(config: OllamaConfig):
+    pool = OllamaBackendPool(config)
+    pool.mark_failure(pool.backends[0], ollama.ResponseError("not found", 404))
+    assert pool.backends[0].healthy
+
+
+@pytest.mark.asyncio
+async def test_manager_retries_chat_on_next_host(config: OllamaConfig):
+    manager = OllamaLLM_Manager(config=config)
+    working = WorkingClient()
+    manager._pool.backends[0].client = FailingClient()
+    manager._pool.backends[1].client = working
+    manager._pool.backends[2].client = working
+
+    result = await manager.chat([Message(role="user", content="Hello")])
+    assert result.status == LLM_ManagerStatus.generating
+
+    chunks = [chunk.message.content async for chunk in result.stream]
+    assert chunks == ["Hello", " there"]
+    assert working.calls == 1
+    assert not manager._pool.backends[0].healthy
+    assert all(backend.outstanding == 0 for backend in manager._pool.backends)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_chat_before_its_first_chunk_releases_the_host(
+    config: OllamaConfig,
+):
+    manager = OllamaLLM_Manager(config=config)
+    stalling = StallingClient()
+    for backend in manager._pool.backends:
+        backend.client = stalling
+
+    chat = asyncio.create_task(manager.chat([Message(role="user", content="Hi")]))
+    await asyncio.sleep(0.05)
+    chat.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await chat
+
+    assert stalling.closed
+    assert all(backend.outstanding == 0 for backend in manager._pool.backends)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import pytest
+import logging
+
+from thinking_tool.broadcast import Broadcast, StreamCancelled
+from thinking_tool.transports import ndjson_stream, resume_index, sse_stream
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+async def _numbers(count: int, delay: float = 0.0):
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield {"n": i}
+
+
+async def _collect(broadcast: Broadcast, start: int = 0) -> list:
+    return [chunk async for _, chunk in broadcast.subscribe(start)]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_fans_out_to_all_subscribers():
+    broadcast = Broadcast(_numbers(5, delay=0.001))
+    first, second = await asyncio.gather(_collect(broadcast), _collect(broadcast))
+
+    assert first == second == [{"n": i} for i in range(5)]
+    assert broadcast.done
+    assert broadcast.subscribers == 0
+
+
+@pytest.mark.asyncio
+async def test_broadcast_replays_from_start_index():
+    broadcast = Broadcast(_numbers(5)).start()
+    await _collect(broadcast)
+
+    assert await _collect(broadcast, start=3) == [{"n": 3}, {"n": 4}]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_yields_heartbeats_while_idle():
+    broadcast = Broadcast(_numbers(1, delay=0.05))
+    received = [chunk async for _, chunk in broadcast.subscribe(heartbeat=0.01)]
+
+    assert None in received
+    assert received[-1] == {"n": 0}
+
+
+@pytest.mark.asyncio
+async def test_broadcast_records_source_errors():
+    async def failing():
+        yield {"n": 0}
+        raise RuntimeError("backend went away")
+
+    broadcast = Broadcast(failing())
+    received = []
+    with pytest.raises(RuntimeError, match="backend went away"):
+        async for _, chunk in broadcast.subscribe():
+            received.append(chunk)
+    assert received == [{"n": 0}]
+    assert isinstance(broadcast.error, RuntimeError)
+
+    # Late subscribers get the chunks, then the error.
+    with pytest.raises(RuntimeError):
+        await _collect(broadcast)
+
+
+@pytest.mark.asyncio
+async def test_failed_streams_end_with_an_error_record():
+    async def failing():
+        yield {"n": 0}
+        raise RuntimeError("backend went away")
+
+    broadcast = Broadcast(failing())
+    chunks = (chunk async for _, chunk in broadcast.subscribe())
+    lines = [line async for line in ndjson_stream(chunks)]
+    assert [json.loads(line) for line in lines] == [
+        {"n": 0},
+        {"error": "backend went away"},
+    ]
+
+    frames = [frame async for frame in sse_stream(broadcast)]
+    assert frames[-2] == 'event: error\ndata: {"message": "backend went away"}\n\n'
+    assert frames[-1] == "event: end\ndata: {}\n\n"
+
+
+@pytest.mark.asyncio
+async def test_broadcast_cancels_its_source_once_idle():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.001)
+                yield {"n": 0}
+        finally:
+            closed.set()
+
+    broadcast = Broadcast(endless(), idle_timeout=0)
+    async for _ in broadcast.subscribe():
+        break
+
+    await asyncio.wait_for(closed.wait(), 1)
+    await asyncio.sleep(0)
+    assert broadcast.done
+    assert broadcast.cancelled
+
+
+@pytest.mark.asyncio
+async def test_broadcast_cancelled_before_starting_never_runs():
+    broadcast = Broadcast(_numbers(5))
+
+    assert broadcast.cancel()
+    assert not broadcast.cancel()
+    with pytest.raises(StreamCancelled):
+        await _collect(broadcast)
+    assert isinstance(broadcast.error, StreamCancelled)
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_frames_events_with_ids():
+    broadcast = Broadcast(_numbers(2))
+    frames = [frame async for frame in sse_stream(broadcast, start=resume_index("0"))]
+
+    assert frames[0] == 'id: 1\nevent: chunk\ndata: {"n": 1}\n\n'
+    assert frames[-1] == "event: end\ndata: {}\n\n"
+
+
+def test_resume_index_defaults_to_start():
+    assert resume_index(None) == 0
+    assert resume_index("garbage") == 0
+    assert resume_index(4) == 5
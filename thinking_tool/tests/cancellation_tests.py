@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+import logging
+from uuid import uuid4
+
+from thinking_tool.llm_manager import (
+    ChatResponse,
+    LLM_ManagerResponse,
+    LLM_ManagerStatus,
+    Message,
+)
+from thinking_tool.models import ThinkingRequest
+from thinking_tool.models.request import StreamRequest
+from thinking_tool.thinking_server import ThinkingToolServer
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class EndlessChat:
+    def __init__(self):
+        self.closed = asyncio.Event()
+
+    async def __call__(self, messages: list[Message]) -> LLM_ManagerResponse:
+        async def stream():
+            try:
+                while True:
+                    await asyncio.sleep(0.001)
+                    yield ChatResponse(
+                        model="qwen2.5:0.5b",
+                        message=Message(role="assistant", content="."),
+                        done=False,
+                    )
+            finally:
+                self.closed.set()
+
+        return LLM_ManagerResponse(status=LLM_ManagerStatus.generating, stream=stream())
+
+
+@pytest.fixture
+def server():
+    server = ThinkingToolServer()
+    object.__setattr__(server.llm_mang, "chat", EndlessChat())
+    return server
+
+
+def _register(server: ThinkingToolServer) -> str:
+    stream_request = StreamRequest(
+        stream_id=str(uuid4()),
+        method=server._think_chunks,
+        request={"request": ThinkingRequest(messages=["Hello"])},
+    )
+    server.streams.register(stream_request)
+    return stream_request.stream_id
+
+
+@pytest.mark.asyncio
+async def test_disconnecting_cancels_the_generation(server):
+    stream_id = _register(server)
+    response = await server.stream_response(stream_id)
+    async for _ in response.body_iterator:
+        break
+    await response.body_iterator.aclose()
+
+    await asyncio.wait_for(server.llm_mang.chat.closed.wait(), 1)
+    await asyncio.sleep(0)
+    assert server.streams.get(stream_id).status()["cancelled"]
+    assert server.generation_stats.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_stream_cancels_it(server):
+    pending = _register(server)
+    response = await server.cancel_stream(pending)
+    assert response.status_code == 200
+    assert pending not in server.streams
+
+    stream_id = _register(server)
+    response = await server.stream_response(stream_id)
+    async for _ in response.body_iterator:
+        break
+    assert (await server.cancel_stream(stream_id)).status_code == 200
+
+    await asyncio.wait_for(server.llm_mang.chat.closed.wait(), 1)
+    await asyncio.sleep(0)
+    assert (await server.cancel_stream(stream_id)).status_code == 409
+    assert server.generation_stats.cancelled == 2
+    await response.body_iterator.aclose()
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+import logging
+
+from thinking_tool.coalescer import coalesce
+from thinking_tool.llm_manager import ChatResponse, Message
+from thinking_tool.models.config import StreamCoalescingConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+async def _tokens(texts: list[str], delay: float = 0.0, done: bool = True):
+    for i, text in enumerate(texts):
+        if delay:
+            await asyncio.sleep(delay)
+        yield ChatResponse(
+            model="qwen2.5:0.5b",
+            message=Message(role="assistant", content=text),
+            done=done and i == len(texts) - 1,
+        )
+
+
+def _encode(chunk: ChatResponse) -> str:
+    return chunk.message.content
+
+
+async def _writes(chunks, **config) -> list[bytes]:
+    config = StreamCoalescingConfig(**config)
+    return [data async for data in coalesce(chunks, _encode, config)]
+
+
+@pytest.mark.asyncio
+async def test_fast_chunks_are_joined_until_done():
+    writes = await _writes(_tokens(["a", "b", "c"]), flush_interval=10)
+    assert writes == [b"abc"]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_flushed_by_size():
+    writes = await _writes(
+        _tokens(["aa", "bb", "cc"], done=False), flush_interval=10, flush_bytes=4
+    )
+    assert writes == [b"aabb", b"cc"]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_flushed_by_time():
+    writes = await _writes(
+        _tokens(["a", "b", "c", "d"], delay=0.03, done=False), flush_interval=0.05
+    )
+    assert b"".join(writes) == b"abcd"
+    assert 1 < len(writes) < 4
+
+
+@pytest.mark.asyncio
+async def test_closing_the_coalescer_closes_the_source():
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            async for chunk in _tokens(["a", "b", "c"], delay=0.05, done=False):
+                yield chunk
+        finally:
+            closed.set()
+
+    writes = coalesce(source(), _encode, StreamCoalescingConfig(flush_interval=0.01))
+    assert await anext(writes) == b"a"
+    await writes.aclose()
+    await asyncio.wait_for(closed.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_closing_the_coalescer_after_reading_ahead_closes_the_source():
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            async for chunk in _tokens(["a", "b", "c"], delay=0.02, done=False):
+                yield chunk
+        finally:
+            closed.set()
+
+    writes = coalesce(source(), _encode, StreamCoalescingConfig(flush_interval=0.01))
+    assert await anext(writes) == b"a"
+    # Lets the read ahead of "b" complete before closing.
+    await asyncio.sleep(0.05)
+    await writes.aclose()
+    assert closed.is_set()
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from rich import print
 from fastapi import FastAPI
@@ -6,7 +7,14 @@ import contextlib
 import time
 import threading
 import logging
+from typing import Callable, ContextManager
 
+from thinking_tool.llm_manager import (
+    ChatResponse,
+    LLM_ManagerResponse,
+    LLM_ManagerStatus,
+    Message,
+)
 from thinking_tool.models.config import OllamaConfig
 from thinking_tool.models.request import PullModelRequest, ThinkingServerConfig
 from thinking_tool.models.response import UpdateConfigResponse
@@ -27,6 +35,64 @@ OLLAMA_HOST = "http://192.168.1.177"
 OLLAMA_PORT = 11434
 
 
+FAKE_MODEL = "qwen2.5:0.5b"
+FAKE_TOKENS = ["Deep", " thought", "."]
+
+
+class FakeChat:
+    """
+    Stands in for `OllamaLLM_Manager.chat`.  Answers every prompt with the
+    tokens `answer` gives for it, one chunk every `delay` seconds.  The last
+    chunk carries `eval_count` and any other `stats`.
+    """
+
+    def __init__(
+        self,
+        answer: Callable[[list[Message]], list[str]] = lambda _: FAKE_TOKENS,
+        delay: float = 0.01,
+        **stats,
+    ):
+        self.answer = answer
+        self.delay = delay
+        self.stats = stats
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(
+        self, messages: list[Message], keep_alive: str = None
+    ) -> LLM_ManagerResponse:
+        self.calls += 1
+        tokens = self.answer(messages)
+        stats = {"eval_count": len(tokens), **self.stats}
+
+        async def stream():
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                for i, token in enumerate(tokens):
+                    await asyncio.sleep(self.delay)
+                    last = i == len(tokens) - 1
+                    yield ChatResponse(
+                        model=FAKE_MODEL,
+                        message=Message(role="assistant", content=token),
+                        done=last,
+                        **(stats if last else {}),
+                    )
+            finally:
+                self.running -= 1
+
+        return LLM_ManagerResponse(status=LLM_ManagerStatus.generating, stream=stream())
+
+
+async def _fake_digest(model: str | None = None) -> str:
+    return "digest"
+
+
+async def _no_details(model: str | None = None) -> dict | None:
+    return None
+
+
 class Server(uvicorn.Server):
     def install_signal_handlers(self):
         pass
@@ -44,6 +110,44 @@ class Server(uvicorn.Server):
             thread.join()
 
 
+@pytest.fixture
+def fake_server() -> Callable[..., ThinkingToolServer]:
+    """
+    Builds a `ThinkingToolServer` whose chats are answered by a `FakeChat`
+    made with `chat_settings`, so no Ollama host is needed.
+    """
+
+    def build(
+        config: ThinkingServerConfig = None, **chat_settings
+    ) -> ThinkingToolServer:
+        server = ThinkingToolServer(config=config)
+        object.__setattr__(server.llm_mang, "chat", FakeChat(**chat_settings))
+        object.__setattr__(server.llm_mang, "model_digest", _fake_digest)
+        object.__setattr__(server.llm_mang, "model_details", _no_details)
+        return server
+
+    return build
+
+
+@pytest.fixture
+def serve() -> Callable[[ThinkingToolServer], ContextManager[str]]:
+    """Runs a `ThinkingToolServer` over HTTP on a free port, yielding its URL."""
+
+    @contextlib.contextmanager
+    def run(thinking_tool: ThinkingToolServer):
+        app = FastAPI()
+        app.include_router(thinking_tool.router)
+        config = uvicorn.Config(
+            app, host="127.0.0.1", port=0, log_level=SERVER_LOG_LEVEL
+        )
+        server = Server(config=config)
+        with server.run_in_thread():
+            port = server.servers[0].sockets[0].getsockname()[1]
+            yield f"http://127.0.0.1:{port}"
+
+    return run
+
+
 @pytest.fixture(scope="session")
 def server():
     HOST = "0.0.0.0"
@@ -0,0 +1,74 @@
+import logging
+
+from thinking_tool.context_budget import (
+    TRUNCATION_MARKER,
+    ContextBudget,
+    context_length,
+)
+from thinking_tool.llm_manager import Message
+from thinking_tool.models.config import ContextBudgetConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def _budget(**kwargs) -> ContextBudget:
+    # One token per character keeps the arithmetic readable.
+    return ContextBudget(
+        ContextBudgetConfig(chars_per_token=1.0, reserve_tokens=0, **kwargs)
+    )
+
+
+def test_context_length_prefers_num_ctx_over_model_info():
+    details = {
+        "parameters": "stop <|im_end|>\nnum_ctx 8192",
+        "modelinfo": {"qwen2.context_length": 32768},
+    }
+    assert context_length(details, 4096) == 8192
+
+    del details["parameters"]
+    assert context_length(details, 4096) == 4096
+    assert context_length({"modelinfo": {"llama.context_length": 2048}}, 4096) == 2048
+    assert context_length(None, 4096) == 4096
+
+
+def test_prompt_within_budget_is_untouched():
+    messages = [Message(role="user", content="Hello")]
+    fitted, report = _budget(max_prompt_tokens=100).fit(messages)
+
+    assert fitted == messages
+    assert report.prompt_tokens == report.original_tokens
+    assert report.dropped_messages == report.truncated_messages == 0
+
+
+def test_oldest_turns_are_dropped_first():
+    messages = [
+        Message(role="system", content="s" * 10),
+        Message(role="user", content="a" * 40),
+        Message(role="assistant", content="b" * 40),
+        Message(role="user", content="c" * 10),
+    ]
+    fitted, report = _budget(max_prompt_tokens=40).fit(messages)
+
+    assert [m.role for m in fitted] == ["system", "user"]
+    assert fitted[-1].content == "c" * 10
+    assert report.dropped_messages == 2
+    assert report.prompt_tokens <= report.budget
+
+
+def test_latest_turn_is_truncated_in_the_middle():
+    messages = [Message(role="user", content="a" * 50 + "b" * 50)]
+    fitted, report = _budget(max_prompt_tokens=60).fit(messages)
+
+    content = fitted[0].content
+    assert TRUNCATION_MARKER in content
+    assert content.startswith("a") and content.endswith("b")
+    assert report.truncated_messages == 1
+    assert report.prompt_tokens <= report.budget
+
+
+def test_disabled_budget_only_measures():
+    messages = [Message(role="user", content="a" * 100)]
+    fitted, report = _budget(enabled=False, max_prompt_tokens=10).fit(messages)
+
+    assert fitted == messages
+    assert report.prompt_tokens > report.budget
@@ -0,0 +1,46 @@
+import logging
+import threading
+
+from thinking_tool.log_queue import attach_queue_handler, detach_queue_handler
+from thinking_tool.log_store import StreamIdFilter, current_stream_id
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append((record, threading.current_thread()))
+
+
+def test_records_are_handled_on_the_listener_thread():
+    target = logging.getLogger("thinking_tool.log_queue_test")
+    target.setLevel(logging.DEBUG)
+    recording = RecordingHandler()
+    handler = attach_queue_handler(target, recording, filters=(StreamIdFilter(),))
+
+    token = current_stream_id.set("abc")
+    target.debug("Hello %s", "Bob")
+    current_stream_id.reset(token)
+    detach_queue_handler(target, handler)
+
+    [(record, thread)] = recording.records
+    assert thread is not threading.current_thread()
+    assert record.getMessage() == "Hello Bob"
+    assert record.stream_id == "abc"
+
+
+def test_listener_respects_handler_levels():
+    target = logging.getLogger("thinking_tool.log_queue_test")
+    recording = RecordingHandler()
+    recording.setLevel(logging.ERROR)
+    handler = attach_queue_handler(target, recording)
+
+    target.warning("Ignored")
+    target.error("Kept")
+    detach_queue_handler(target, handler)
+
+    assert [r.getMessage() for r, _ in recording.records] == ["Kept"]
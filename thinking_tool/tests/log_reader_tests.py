@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+import logging
+
+from thinking_tool.log_reader import follow, read_range, tail
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+LINES = "".join(f"line {i}\n" for i in range(100))
+
+
+def test_read_range_is_clamped_to_the_file(tmp_path):
+    path = tmp_path / "thinking.log"
+    path.write_text(LINES)
+
+    logs = read_range(path, offset=7, length=7)
+    assert logs.content == "line 1\n"
+    assert logs.next_offset == 14
+
+    logs = read_range(path, offset=len(LINES) - 3, length=100)
+    assert logs.content == "99\n"
+    assert logs.next_offset == logs.size == len(LINES)
+
+
+def test_tail_returns_the_last_lines(tmp_path):
+    path = tmp_path / "thinking.log"
+    path.write_text(LINES)
+
+    logs = tail(path, 2)
+    assert logs.content == "line 98\nline 99\n"
+    assert logs.next_offset == len(LINES)
+    assert tail(path, 1000).content == LINES
+
+    path.write_text("first\nunterminated")
+    assert tail(path, 1).content == "unterminated"
+
+
+def test_tail_of_missing_or_empty_file_is_empty(tmp_path):
+    path = tmp_path / "thinking.log"
+    assert tail(path, 10).content == ""
+
+    path.write_text("")
+    assert tail(path, 10).content == ""
+
+
+@pytest.mark.asyncio
+async def test_follow_yields_complete_appended_lines(tmp_path):
+    path = tmp_path / "thinking.log"
+    path.write_text("old\n")
+    logs = follow(path, interval=0.01)
+
+    with open(path, "a") as f:
+        f.write("new\npart")
+        f.flush()
+        first = await asyncio.wait_for(anext(logs), 1)
+        f.write("ial\n")
+        f.flush()
+        second = await asyncio.wait_for(anext(logs), 1)
+
+    assert first.content == "new\n"
+    assert second.content == "partial\n"
+    assert second.next_offset == path.stat().st_size
+    await logs.aclose()
+
+
+@pytest.mark.asyncio
+async def test_follow_restarts_after_truncation(tmp_path):
+    path = tmp_path / "thinking.log"
+    path.write_text(LINES)
+    logs = follow(path, interval=0.01)
+
+    path.write_text("rotated\n")
+    assert (await asyncio.wait_for(anext(logs), 1)).content == "rotated\n"
+    await logs.aclose()
@@ -0,0 +1,122 @@
+import os
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from thinking_tool.log_queue import detach_queue_handler
+from thinking_tool.log_store import (
+    LogRecord,
+    LogStore,
+    LogStoreHandler,
+    current_stream_id,
+)
+from thinking_tool.models.config import LogStoreConfig
+from thinking_tool.models.request import ThinkingServerConfig
+from thinking_tool.thinking_server import ThinkingToolServer
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def _record(time: float, level: str = "INFO", stream_id: str = None) -> LogRecord:
+    return LogRecord(
+        time=time,
+        level=level,
+        logger="thinking_tool.test",
+        message=f"at {time}",
+        stream_id=stream_id,
+    )
+
+
+def _store(tmp_path, **kwargs) -> LogStore:
+    return LogStore(LogStoreConfig(directory=str(tmp_path), **kwargs))
+
+
+def test_query_filters_by_level_time_and_stream(tmp_path):
+    store = _store(tmp_path)
+    for i in range(10):
+        store.append(_record(i, "ERROR" if i % 3 == 0 else "INFO", f"s{i % 2}"))
+
+    assert [r.time for r in store.query(level="error")] == [0, 3, 6, 9]
+    assert [r.time for r in store.query(since=4, until=6)] == [4, 5, 6]
+    assert [r.time for r in store.query(stream_id="s1", limit=2)] == [1, 3]
+    assert [r.time for r in store.query(level="WARNING", since=5)] == [6, 9]
+
+
+def test_segments_rotate_compress_and_expire(tmp_path):
+    size = len(_record(0).model_dump_json()) + 1
+    store = _store(
+        tmp_path, segment_bytes=size * 3, index_interval=size, max_segments=2
+    )
+    for i in range(12):
+        store.append(_record(i))
+
+    names = sorted(os.listdir(tmp_path))
+    assert [n for n in names if n.endswith(".gz")] == [
+        "segment-00000002.jsonl.gz",
+        "segment-00000003.jsonl.gz",
+    ]
+    assert [r.time for r in store.query()] == list(range(6, 12))
+    assert [r.time for r in store.query(since=10)] == [10, 11]
+
+
+def test_index_seeks_past_older_records(tmp_path):
+    size = len(_record(0).model_dump_json()) + 1
+    store = _store(tmp_path, index_interval=size * 10)
+    for i in range(100):
+        store.append(_record(i))
+
+    segment = store._segments[-1]
+    assert segment.start_offset(55) == segment.index[5][1] > 0
+    assert [r.time for r in store.query(since=55, until=57)] == [55, 56, 57]
+
+
+def test_reopened_store_keeps_old_segments(tmp_path):
+    store = _store(tmp_path, compress=False)
+    store.append(_record(1))
+    store.close()
+
+    store = _store(tmp_path, compress=False)
+    store.append(_record(2))
+    assert store._segments[0].closed
+    assert [r.time for r in store.query(since=1)] == [1, 2]
+
+
+def test_handler_records_stream_ids(tmp_path):
+    store = _store(tmp_path)
+    test_logger = logging.getLogger("thinking_tool.log_store_test")
+    handler = LogStoreHandler(store)
+    test_logger.addHandler(handler)
+    try:
+        test_logger.error("Boom", extra={"stream_id": "abc"})
+    finally:
+        test_logger.removeHandler(handler)
+
+    [record] = store.query(stream_id="abc")
+    assert record.message == "Boom"
+    assert record.level == "ERROR"
+
+
+def test_logs_endpoint_queries_the_store(tmp_path):
+    server = ThinkingToolServer(
+        ThinkingServerConfig(
+            log_store=LogStoreConfig(enabled=True, directory=str(tmp_path))
+        )
+    )
+    app = FastAPI()
+    app.include_router(server.router)
+    http = TestClient(app)
+
+    token = current_stream_id.set("abc")
+    logging.getLogger("thinking_tool.log_store_test").error("Boom")
+    current_stream_id.reset(token)
+
+    # Stopping the listener writes out everything still queued.
+    package_logger = logging.getLogger("thinking_tool")
+    for handler in list(package_logger.handlers):
+        if any(isinstance(h, LogStoreHandler) for h in handler.listener.handlers):
+            detach_queue_handler(package_logger, handler)
+
+    [record] = http.get("/logs", params={"level": "ERROR"}).json()
+    assert record["message"] == "Boom"
+    assert record["stream_id"] == "abc"
+    assert http.get("/logs", params={"since": "not a time"}).status_code == 400
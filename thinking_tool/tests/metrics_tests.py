@@ -0,0 +1,65 @@
+import pytest
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from thinking_tool.metrics import MetricsRegistry
+from thinking_tool.models import ThinkingRequest
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), (0.1, 1))
+    latency.observe(0.05, route="/think")
+    latency.observe(0.1, route="/think")
+    latency.observe(5, route="/think")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/think",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/think",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/think",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/think"} 5.15' in lines
+    assert 'latency_seconds_count{route="/think"} 3' in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors.", ("message",)).inc(message='a "b"\n')
+    assert 'errors_total{message="a \\"b\\"\\n"} 1' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_generations_are_measured(fake_server):
+    server = fake_server(
+        eval_duration=60_000_000, prompt_eval_count=12, prompt_eval_duration=5_000_000
+    )
+    request = ThinkingRequest(messages=["Hello"])
+    assert len([chunk async for chunk in server._think_chunks(request)]) == 3
+
+    text = server.metrics.render()
+    model = 'model="qwen2.5:0.5b"'
+    assert f'thinking_generations_total{{{model},outcome="done"}} 1' in text
+    assert f"thinking_time_to_first_token_seconds_count{{{model}}} 1" in text
+    assert f'thinking_tokens_per_second_bucket{{{model},le="50"}} 1' in text
+    assert f'ollama_duration_seconds_count{{{model},stage="prompt_eval"}} 1' in text
+    assert f'ollama_tokens_total{{{model},kind="prompt"}} 12' in text
+    assert "thinking_generations_in_flight 0" in text
+
+
+def test_requests_are_counted_per_route(fake_server):
+    server = fake_server()
+    app = FastAPI()
+    app.include_router(server.router)
+    client = TestClient(app)
+
+    client.get("/metrics")
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'thinking_requests_total{route="/metrics",method="GET",status="200"} 1'
+        in response.text
+    )
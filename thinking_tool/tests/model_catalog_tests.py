@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+import logging
+import ollama
+
+from thinking_tool.model_catalog import ModelCatalog
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class CountingClient:
+    def __init__(self):
+        self.digests = {"qwen2.5:0.5b": "abc", "reader-lm": "def"}
+        self.list_calls = 0
+        self.show_calls = 0
+
+    async def list(self):
+        self.list_calls += 1
+        return ollama.ListResponse(
+            models=[
+                ollama.ListResponse.Model(model=name, digest=digest)
+                for name, digest in self.digests.items()
+            ]
+        )
+
+    async def show(self, model: str):
+        self.show_calls += 1
+        return ollama.ShowResponse(model_info={"general.architecture": "qwen2"})
+
+
+@pytest.mark.asyncio
+async def test_catalog_serves_repeat_lookups_from_memory():
+    client = CountingClient()
+    catalog = ModelCatalog(client)
+
+    assert await catalog.names() == ["qwen2.5:0.5b", "reader-lm"]
+    assert await catalog.digest("reader-lm") == "def"
+    details = await catalog.details("qwen2.5:0.5b")
+    assert details["modelinfo"]["general.architecture"] == "qwen2"
+    await catalog.details("qwen2.5:0.5b")
+
+    assert client.list_calls == 1
+    assert client.show_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_catalog_invalidate_refetches_list_and_details():
+    client = CountingClient()
+    catalog = ModelCatalog(client)
+    await catalog.details("qwen2.5:0.5b")
+
+    catalog.invalidate("qwen2.5:0.5b")
+    await catalog.details("qwen2.5:0.5b")
+
+    assert client.list_calls == 2
+    assert client.show_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_catalog_refetches_details_when_digest_changes():
+    client = CountingClient()
+    catalog = ModelCatalog(client, ttl=0.0)
+    await catalog.details("qwen2.5:0.5b")
+
+    client.digests["qwen2.5:0.5b"] = "new"
+    await catalog.refresh()
+    await catalog.details("qwen2.5:0.5b")
+
+    assert client.show_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_catalog_refreshes_in_background():
+    client = CountingClient()
+    catalog = ModelCatalog(client, ttl=0.0)
+    await catalog.names()
+
+    client.digests["gemma:7b"] = "ghi"
+    assert "gemma:7b" not in await catalog.names()
+
+    await asyncio.sleep(0)
+    assert "gemma:7b" in await catalog.names()
+    assert client.list_calls >= 2
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import pytest
+import logging
+
+import ollama
+
+from thinking_tool.models import PullModelRequest
+from thinking_tool.models.config import PullConfig
+from thinking_tool.pull_manager import QUEUED, PullManager, pull_key
+from thinking_tool.thinking_server import ThinkingToolServer
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+STATUSES = ["pulling manifest", "downloading", "success"]
+
+
+class SlowPull:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def __call__(self, model: str):
+        self.calls.append(model)
+
+        async def stream():
+            for status in STATUSES:
+                await asyncio.sleep(0.01)
+                yield ollama.ProgressResponse(status=status)
+
+        return stream()
+
+
+async def _statuses(pulls: PullManager, model: str) -> list[str]:
+    return [chunk.status async for chunk in pulls.subscribe(model)]
+
+
+def test_pull_key_adds_the_default_tag():
+    assert pull_key("qwen2.5") == "qwen2.5:latest"
+    assert pull_key("qwen2.5:0.5b") == "qwen2.5:0.5b"
+    assert pull_key("localhost:5000/reader-lm") == "localhost:5000/reader-lm:latest"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_pulls_share_one_download():
+    pull = SlowPull()
+    pulls = PullManager(pull)
+
+    results = await asyncio.gather(
+        _statuses(pulls, "reader-lm"), _statuses(pulls, "reader-lm:latest")
+    )
+
+    assert results == [STATUSES, STATUSES]
+    assert pull.calls == ["reader-lm"]
+    assert "reader-lm" not in pulls
+
+
+@pytest.mark.asyncio
+async def test_leaving_a_pull_does_not_stop_it():
+    pull = SlowPull()
+    pulls = PullManager(pull)
+
+    async for _ in pulls.subscribe("reader-lm"):
+        break
+    broadcast = pulls.get("reader-lm")
+    await asyncio.wait_for(broadcast._task, 1)
+
+    assert [chunk.status for chunk in broadcast.chunks] == STATUSES
+
+
+@pytest.mark.asyncio
+async def test_pulls_beyond_the_limit_are_queued():
+    pulls = PullManager(SlowPull(), config=PullConfig(max_parallel=1))
+
+    first, second = await asyncio.gather(
+        _statuses(pulls, "reader-lm"), _statuses(pulls, "qwen2.5:0.5b")
+    )
+
+    assert first == STATUSES
+    assert second == [QUEUED] + STATUSES
+
+
+@pytest.mark.asyncio
+async def test_pull_model_starts_the_download_straight_away():
+    pull = SlowPull()
+    server = ThinkingToolServer()
+    server.pulls = PullManager(pull)
+
+    response = await server.pull_model(PullModelRequest(model="reader-lm"))
+    stream_id = json.loads(response.body)["stream_url"].split("stream_id=")[1]
+    await asyncio.wait_for(server.pulls.get("reader-lm")._task, 1)
+    assert pull.calls == ["reader-lm"]
+
+    # The finished download is replayed to the stream, not started again.
+    response = await server.stream_response(stream_id)
+    lines = [line async for line in response.body_iterator]
+    statuses = [json.loads(line)["status"] for line in b"".join(lines).splitlines()]
+    assert statuses == STATUSES
+    assert pull.calls == ["reader-lm"]
+
+
+@pytest.mark.asyncio
+async def test_pull_progress_never_starts_a_download():
+    pull = SlowPull()
+    server = ThinkingToolServer()
+    server.pulls = PullManager(pull)
+
+    response = await server.pull_progress("reader-lm")
+    assert response.status_code == 404
+
+    server.pulls.pull("reader-lm")
+    response = await server.pull_progress("reader-lm")
+    await asyncio.wait_for(server.pulls.get("reader-lm")._task, 1)
+    assert "reader-lm" not in server.pulls
+
+    # Read once the pull finished and was forgotten.
+    lines = "".join([line async for line in response.body_iterator]).splitlines()
+    assert [json.loads(line)["status"] for line in lines] == STATUSES
+    assert pull.calls == ["reader-lm"]
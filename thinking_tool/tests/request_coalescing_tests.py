@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+import logging
+
+from thinking_tool.models import ThinkingRequest
+from thinking_tool.thinking_server import ThinkingToolServer
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+async def _think(server: ThinkingToolServer, text: str) -> str:
+    request = ThinkingRequest(messages=[text])
+    return "".join(
+        [chunk.message.content async for chunk in server._think_chunks(request)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_generation(fake_server):
+    server = fake_server()
+    first = asyncio.create_task(_think(server, "Hello"))
+    await asyncio.sleep(0.015)
+    late = asyncio.create_task(_think(server, "Hello"))
+
+    assert await first == await late == "Deep thought."
+    assert server.llm_mang.chat.calls == 1
+    assert server._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_different_requests_are_not_coalesced(fake_server):
+    server = fake_server()
+    await asyncio.gather(_think(server, "Hello"), _think(server, "Goodbye"))
+    assert server.llm_mang.chat.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_coalescing_can_be_disabled(fake_server):
+    server = fake_server()
+    server.config.coalesce_requests = False
+    await asyncio.gather(_think(server, "Hello"), _think(server, "Hello"))
+    assert server.llm_mang.chat.calls == 2
@@ -0,0 +1,81 @@
+import pytest
+import logging
+
+from thinking_tool.llm_manager import ChatResponse, Message
+from thinking_tool.models.config import ResponseCacheConfig
+from thinking_tool.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+OPTIONS = {"format": "json"}
+
+
+def _chunks(text: str) -> list[ChatResponse]:
+    return [
+        ChatResponse(
+            model="qwen2.5:0.5b",
+            message=Message(role="assistant", content=token),
+            done=i == len(text) - 1,
+        )
+        for i, token in enumerate(text)
+    ]
+
+
+def test_cache_key_depends_on_digest_messages_and_options():
+    key = ResponseCache.key("qwen2.5:0.5b", "abc", ["Hello"], OPTIONS)
+
+    assert key == ResponseCache.key("qwen2.5:0.5b", "abc", ["Hello"], OPTIONS)
+    assert key != ResponseCache.key("qwen2.5:0.5b", "def", ["Hello"], OPTIONS)
+    assert key != ResponseCache.key("qwen2.5:0.5b", "abc", ["Hello!"], OPTIONS)
+    assert key != ResponseCache.key("qwen2.5:0.5b", "abc", ["Hello"], {})
+
+
+@pytest.mark.asyncio
+async def test_cache_counts_hits_and_misses():
+    cache = ResponseCache(ResponseCacheConfig(enabled=True))
+    assert await cache.get("key") is None
+
+    await cache.put("key", _chunks("hey"))
+    chunks = await cache.get("key")
+
+    assert "".join(chunk.message.content for chunk in chunks) == "hey"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(ResponseCacheConfig(enabled=True, max_entries=2))
+    await cache.put("a", _chunks("a"))
+    await cache.put("b", _chunks("b"))
+    await cache.get("a")
+    await cache.put("c", _chunks("c"))
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_by_size():
+    size = len(_chunks("a")[0].model_dump_json())
+    cache = ResponseCache(ResponseCacheConfig(enabled=True, max_bytes=size * 3))
+    await cache.put("a", _chunks("ab"))
+    await cache.put("b", _chunks("cd"))
+
+    assert "a" not in cache
+    assert cache.size <= size * 3
+
+
+@pytest.mark.asyncio
+async def test_cache_promotes_entries_from_disk(tmp_path):
+    config = ResponseCacheConfig(enabled=True, directory=str(tmp_path))
+    await ResponseCache(config).put("key", _chunks("hey"))
+
+    cache = ResponseCache(config)
+    assert "key" in cache
+    chunks = await cache.get("key")
+
+    assert [chunk.message.content for chunk in chunks] == ["h", "e", "y"]
+    assert chunks[-1].done
+    assert cache.stats()["entries"] == 1
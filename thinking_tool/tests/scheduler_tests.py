@@ -0,0 +1,128 @@
+import asyncio
+import json
+import pytest
+import logging
+
+from thinking_tool.models import ThinkingRequest
+from thinking_tool.models.config import SchedulerConfig
+from thinking_tool.models.request import RequestPriority, ThinkingServerConfig
+from thinking_tool import scheduler as scheduler_module
+from thinking_tool.scheduler import (
+    RequestScheduler,
+    SchedulerSaturated,
+    SchedulerTimeout,
+)
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+MODEL = "deepseek-r1:14b"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_concurrency_per_model():
+    scheduler = RequestScheduler(SchedulerConfig(max_concurrency=2))
+    first = await scheduler.acquire(MODEL)
+    await scheduler.acquire(MODEL)
+    await scheduler.acquire("other-model")
+
+    waiting = asyncio.create_task(scheduler.acquire(MODEL))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    assert scheduler.queued == 1
+
+    first.release()
+    first.release()
+    ticket = await waiting
+    assert ticket.queued_for >= 0
+    assert scheduler.stats()["models"][MODEL] == {"active": 2, "limit": 2}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_interactive_before_batch():
+    scheduler = RequestScheduler(SchedulerConfig(max_concurrency=1))
+    running = await scheduler.acquire(MODEL)
+    order = []
+
+    async def wait(name: str, priority: RequestPriority):
+        ticket = await scheduler.acquire(MODEL, priority)
+        order.append(name)
+        ticket.release()
+
+    batch = asyncio.create_task(wait("batch", RequestPriority.batch))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(wait("interactive", RequestPriority.interactive))
+    await asyncio.sleep(0)
+
+    running.release()
+    await asyncio.gather(batch, interactive)
+    assert order == ["interactive", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rejects_when_queue_is_full():
+    scheduler = RequestScheduler(
+        SchedulerConfig(max_concurrency=1, max_queue=1, retry_after=7)
+    )
+    await scheduler.acquire(MODEL)
+    waiting = asyncio.create_task(scheduler.acquire(MODEL))
+    await asyncio.sleep(0)
+
+    with pytest.raises(SchedulerSaturated) as e:
+        await scheduler.acquire(MODEL)
+    assert e.value.status_code == 429
+    assert e.value.retry_after == 7
+
+    waiting.cancel()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_times_out_queued_requests():
+    scheduler = RequestScheduler(SchedulerConfig(max_concurrency=1, queue_timeout=0.01))
+    running = await scheduler.acquire(MODEL)
+
+    with pytest.raises(SchedulerTimeout) as e:
+        await scheduler.acquire(MODEL)
+    assert e.value.status_code == 503
+    assert scheduler.queued == 0
+
+    # The timed out waiter must not swallow the released slot.
+    running.release()
+    await asyncio.wait_for(scheduler.acquire(MODEL), 1)
+
+
+@pytest.mark.asyncio
+async def test_slot_handed_over_as_the_wait_times_out_is_released(monkeypatch):
+    scheduler = RequestScheduler(SchedulerConfig(max_concurrency=1))
+    running = await scheduler.acquire(MODEL)
+
+    async def wait_for(future, timeout):
+        # The slot arrives, but the wait still reports a timeout.
+        running.release()
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(scheduler_module.asyncio, "wait_for", wait_for)
+    with pytest.raises(SchedulerTimeout):
+        await scheduler.acquire(MODEL)
+
+    assert scheduler.stats()["models"][MODEL]["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_streams_can_be_retried(fake_server):
+    config = ThinkingServerConfig(
+        scheduler=SchedulerConfig(max_concurrency=1, max_queue=0)
+    )
+    server = fake_server(config)
+    running = await server.scheduler.acquire(server.llm_mang.config.model)
+    response = await server.think(ThinkingRequest(messages=["Hello"]))
+    stream_id = json.loads(response.body)["stream_url"].split("stream_id=")[1]
+
+    response = await server.stream_response(stream_id)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+    running.release()
+    response = await server.stream_response(stream_id)
+    assert response.status_code == 200
+    body = b"".join([line async for line in response.body_iterator])
+    assert json.loads(body.splitlines()[-1])["done"]
@@ -0,0 +1,122 @@
+import os
+import time
+import pytest
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from thinking_tool.code_watcher import InotifyWatcher
+from thinking_tool.self_awareness import CodeChange, SelfAwareness, etag_matches
+from thinking_tool.thinking_server import ThinkingToolServer
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def _write(path, content: str, mtime_ns: int) -> None:
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_code_files_are_reread_only_when_changed(tmp_path):
+    module = tmp_path / "module.py"
+    _write(module, "a = 1\n", 1_000_000_000)
+    self_awareness = SelfAwareness(code_directory=str(tmp_path))
+
+    first = self_awareness.code_file(str(module))
+    assert first.content == "a = 1\n"
+    assert self_awareness.code_file(str(module)) is first
+
+    _write(module, "a = 22\n", 2_000_000_000)
+    assert self_awareness.code_file(str(module)).content == "a = 22\n"
+
+
+def test_new_and_removed_files_are_picked_up(tmp_path):
+    self_awareness = SelfAwareness(code_directory=str(tmp_path))
+    assert self_awareness.all_code_files() == []
+
+    module = tmp_path / "module.py"
+    module.write_text("a = 1\n")
+    assert self_awareness.code_file(str(module)) is not None
+
+    module.unlink()
+    assert self_awareness.code_file(str(module)) is None
+    assert self_awareness.all_code_files() == []
+
+
+def test_etag_changes_with_the_files(tmp_path):
+    module = tmp_path / "module.py"
+    _write(module, "a = 1\n", 1_000_000_000)
+    self_awareness = SelfAwareness(code_directory=str(tmp_path))
+    self_awareness.all_code_files()
+    etag = self_awareness.etag()
+
+    _write(module, "a = 22\n", 2_000_000_000)
+    self_awareness.all_code_files()
+    assert self_awareness.etag() != etag
+    assert etag_matches(f'"x", {etag}', etag)
+    assert etag_matches("*", etag)
+
+
+def test_code_answers_not_modified(tmp_path):
+    (tmp_path / "module.py").write_text("a = 1\n")
+    server = ThinkingToolServer()
+    server.self_awareness = SelfAwareness(code_directory=str(tmp_path))
+    app = FastAPI()
+    app.include_router(server.router)
+    http = TestClient(app)
+
+    response = http.get("/code")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = http.get("/code", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def _wait_for(changes: list[CodeChange], name, event: str, timeout=5.0) -> bool:
+    # A write may be seen as several changes, e.g. created then modified.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if (str(name), event) in [(c.name, c.event) for c in changes]:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.mark.parametrize(
+    "polling",
+    [
+        True,
+        pytest.param(
+            False,
+            marks=pytest.mark.skipif(
+                not InotifyWatcher.available(), reason="inotify not available"
+            ),
+        ),
+    ],
+)
+def test_watcher_keeps_the_index_up_to_date(tmp_path, polling: bool):
+    module = tmp_path / "module.py"
+    module.write_text("a = 1\n")
+    self_awareness = SelfAwareness(code_directory=str(tmp_path))
+    changes = []
+    self_awareness.subscribe(changes.append)
+    self_awareness.watch(poll_interval=0.01, polling=polling)
+    try:
+        new = tmp_path / "package" / "new.py"
+        new.parent.mkdir()
+        new.write_text("b = 2\n")
+        assert _wait_for(changes, new, "created")
+
+        _write(module, "a = 22\n", 2_000_000_000)
+        assert _wait_for(changes, module, "modified")
+        assert self_awareness.code_file(str(module)).content == "a = 22\n"
+
+        module.unlink()
+        assert _wait_for(changes, module, "deleted")
+    finally:
+        self_awareness.unwatch()
+
+    assert [c.name for c in self_awareness.all_code_files()] == [str(new)]
+    assert self_awareness.code_file(str(new)).content == "b = 2\n"
@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from thinking_tool.llm_manager import (
+    ChatResponse,
+    LLM_ManagerResponse,
+    LLM_ManagerStatus,
+    Message,
+)
+from thinking_tool.models.config import SessionConfig
+from thinking_tool.models.request import SessionThinkingRequest
+from thinking_tool.scheduler import SchedulerSaturated
+from thinking_tool.sessions import SessionStore, SessionStoreFull
+from thinking_tool.thinking_server import ThinkingToolServer
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class RecordingChat:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, messages: list[Message], keep_alive: str = None):
+        self.calls.append((messages, keep_alive))
+
+        async def stream():
+            for i, token in enumerate(["Hi", " Bob"]):
+                yield ChatResponse(
+                    model="qwen2.5:0.5b",
+                    message=Message(role="assistant", content=token),
+                    done=i == 1,
+                )
+
+        return LLM_ManagerResponse(status=LLM_ManagerStatus.generating, stream=stream())
+
+
+@pytest.fixture
+def server():
+    server = ThinkingToolServer()
+    object.__setattr__(server.llm_mang, "chat", RecordingChat())
+    return server
+
+
+@pytest.fixture
+def http(server: ThinkingToolServer):
+    app = FastAPI()
+    app.include_router(server.router)
+    return TestClient(app)
+
+
+def test_session_store_evicts_least_recently_used():
+    store = SessionStore(SessionConfig(max_sessions=2))
+    first = store.create()
+    second = store.create()
+    store.get(first.session_id)
+    store.create()
+
+    assert store.get(first.session_id) is first
+    assert store.get(second.session_id) is None
+
+
+def test_session_store_never_evicts_busy_sessions():
+    store = SessionStore(SessionConfig(max_sessions=2))
+    first = store.create()
+    first.busy = True
+    second = store.create()
+    third = store.create()
+
+    assert store.get(first.session_id) is first
+    assert store.get(second.session_id) is None
+
+    third.busy = True
+    with pytest.raises(SessionStoreFull):
+        store.create()
+
+
+def test_session_store_expires_idle_sessions():
+    store = SessionStore(SessionConfig(ttl=0.0))
+    session = store.create()
+    store.expire()
+
+    assert store.get(session.session_id) is None
+
+
+def test_session_keeps_history_between_turns(server, http: TestClient):
+    session_id = http.post("/sessions").json()["session_id"]
+    http.post(
+        f"/sessions/{session_id}/messages",
+        json={"messages": ["Be brief."], "role": "system"},
+    )
+
+    http.post(f"/sessions/{session_id}/think", json={"messages": ["I'm Bob."]})
+    http.post(f"/sessions/{session_id}/think", json={"messages": ["Who am I?"]})
+
+    messages, keep_alive = server.llm_mang.chat.calls[-1]
+    assert [(m.role, m.content) for m in messages] == [
+        ("system", "Be brief."),
+        ("user", "I'm Bob."),
+        ("assistant", "Hi Bob"),
+        ("user", "Who am I?"),
+    ]
+    assert keep_alive == server.config.sessions.keep_alive
+
+    session = http.get(f"/sessions/{session_id}").json()
+    assert session["length"] == 5
+    assert not session["busy"]
+
+
+def test_unknown_session_returns_404(http: TestClient):
+    assert http.post("/sessions/missing/think", json={}).status_code == 404
+    assert http.delete("/sessions/missing").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_session_is_busy_while_waiting_for_a_slot(server):
+    slot = asyncio.Event()
+
+    async def acquire_slot(priority):
+        await slot.wait()
+        raise SchedulerSaturated("Too many requests", retry_after=1)
+
+    object.__setattr__(server, "_acquire_slot", acquire_slot)
+    session_id = server.sessions.create().session_id
+    request = SessionThinkingRequest(messages=["Hi"])
+
+    first = asyncio.create_task(server.think_in_session(session_id, request))
+    await asyncio.sleep(0)
+    second = await asyncio.wait_for(server.think_in_session(session_id, request), 1)
+    assert second.status_code == 409
+
+    slot.set()
+    assert (await first).status_code == 429
+    assert not server.sessions.get(session_id).busy
@@ -0,0 +1,32 @@
+import json
+import logging
+
+from thinking_tool.stream_decoder import NDJSONDecoder, decode_ndjson
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+RECORDS = [{"message": {"content": f"token {i}"}, "done": i == 9} for i in range(10)]
+STREAM = b"".join(json.dumps(record).encode() + b"\n" for record in RECORDS)
+
+
+def test_decoder_handles_records_split_across_reads():
+    chunks = [STREAM[i : i + 7] for i in range(0, len(STREAM), 7)]
+    assert list(decode_ndjson(chunks)) == RECORDS
+
+
+def test_decoder_handles_many_records_in_one_read():
+    assert list(decode_ndjson([STREAM])) == RECORDS
+
+
+def test_decoder_returns_records_as_soon_as_complete():
+    decoder = NDJSONDecoder()
+    assert decoder.feed(b'{"a": 1}\n{"b"') == [{"a": 1}]
+    assert decoder.feed(b": 2") == []
+    assert decoder.feed(b"}\n") == [{"b": 2}]
+
+
+def test_decoder_skips_blank_lines_and_flushes_trailing_record():
+    decoder = NDJSONDecoder()
+    assert decoder.feed(b'\n\r\n{"a": 1}\r\n{"b": 2}') == [{"a": 1}]
+    assert decoder.flush() == [{"b": 2}]
+    assert decoder.flush() == []
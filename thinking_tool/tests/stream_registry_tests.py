@@ -0,0 +1,88 @@
+import pytest
+import logging
+
+from thinking_tool.models.config import StreamRegistryConfig
+from thinking_tool.models.request import StreamRequest
+from thinking_tool.stream_registry import (
+    StreamRegistry,
+    StreamRegistryFull,
+    StreamState,
+)
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def _request(stream_id: str) -> StreamRequest:
+    return StreamRequest(stream_id=stream_id, request={})
+
+
+def test_registry_holds_many_pending_streams():
+    registry = StreamRegistry()
+    for i in range(100):
+        registry.register(_request(f"stream-{i}"))
+
+    assert len(registry) == 100
+    assert registry.get("stream-0").state == StreamState.pending
+    assert registry.get("stream-99").state == StreamState.pending
+
+
+def test_registry_claim_is_single_use():
+    registry = StreamRegistry()
+    registry.register(_request("a"))
+    registry.register(_request("b"))
+
+    entry = registry.claim("a")
+    assert entry.stream_id == "a"
+    assert entry.state == StreamState.active
+    assert registry.claim("a") is None
+    assert registry.claim("b").stream_id == "b"
+    assert registry.claim("missing") is None
+
+
+def test_registry_unclaimed_streams_can_be_claimed_again():
+    registry = StreamRegistry()
+    registry.register(_request("a"))
+    registry.claim("a")
+    registry.unclaim("a")
+
+    assert registry.get("a").state == StreamState.pending
+    assert registry.claim("a").stream_id == "a"
+
+
+def test_registry_finish_marks_stream_done():
+    registry = StreamRegistry()
+    registry.register(_request("a"))
+    registry.claim("a")
+    registry.finish("a")
+
+    assert registry.get("a").state == StreamState.done
+    assert registry.stats() == {"pending": 0, "active": 0, "done": 1}
+
+
+def test_registry_expires_unclaimed_streams():
+    registry = StreamRegistry(StreamRegistryConfig(ttl=0.0))
+    registry.register(_request("pending"))
+    registry.register(_request("active"))
+    registry.claim("active")
+
+    registry.expire(force=True)
+
+    assert "pending" not in registry
+    assert "active" in registry
+
+
+def test_registry_evicts_done_streams_when_full():
+    registry = StreamRegistry(StreamRegistryConfig(max_streams=2))
+    registry.register(_request("a"))
+    registry.claim("a")
+    registry.finish("a")
+    registry.register(_request("b"))
+
+    registry.register(_request("c"))
+
+    assert "a" not in registry
+    assert "b" in registry
+    assert "c" in registry
+
+    with pytest.raises(StreamRegistryFull):
+        registry.register(_request("d"))
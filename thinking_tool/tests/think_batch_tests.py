@@ -0,0 +1,50 @@
+import json
+import pytest
+import logging
+
+from thinking_tool.llm_manager import Message
+from thinking_tool.models import ThinkingBatchRequest, ThinkingRequest
+from thinking_tool.models.config import BatchConfig
+from thinking_tool.models.request import ThinkingServerConfig
+from thinking_tool.thinking_server import ThinkingToolServer
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def _count(messages: list[Message]) -> list[str]:
+    # A prompt of N is answered with N chunks.
+    return [str(i) for i in range(int(messages[-1].content))]
+
+
+def _batch_server(fake_server) -> ThinkingToolServer:
+    config = ThinkingServerConfig(batch=BatchConfig(max_parallel=2, max_requests=4))
+    return fake_server(config, answer=_count)
+
+
+def _batch(*counts: int) -> ThinkingBatchRequest:
+    return ThinkingBatchRequest(
+        requests=[ThinkingRequest(messages=[str(count)]) for count in counts]
+    )
+
+
+async def _results(response) -> list[dict]:
+    body = "".join([line async for line in response.body_iterator])
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_batch_results_arrive_in_completion_order(fake_server):
+    server = _batch_server(fake_server)
+    results = await _results(await server.think_batch(_batch(6, 1, 3)))
+
+    assert [result["index"] for result in results] == [1, 2, 0]
+    assert results[2]["response"]["message"]["content"] == "012345"
+    assert results[2]["response"]["eval_count"] == 6
+    assert server.llm_mang.chat.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_oversized_batches_are_rejected(fake_server):
+    server = _batch_server(fake_server)
+    response = await server.think_batch(_batch(1, 1, 1, 1, 1))
+    assert response.status_code == 413
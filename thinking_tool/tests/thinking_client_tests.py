@@ -0,0 +1,174 @@
+import json
+import pytest
+import logging
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from thinking_tool.models import ThinkingRequest
+from thinking_tool.thinking_client import AsyncThinkingToolClient, ThinkingToolClient
+from thinking_tool.tracing import TRACE_HEADER
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+BASE_URL = "http://thinking-tool"
+
+
+class FakeServer:
+    def __init__(self, responses: list):
+        # Each request gets the next response, or raises it if an exception.
+        self.responses = list(responses)
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _ndjson(*records: dict) -> httpx.Response:
+    body = "".join(json.dumps(record) + "\n" for record in records)
+    return httpx.Response(200, content=body.encode())
+
+
+def _async_client(server: FakeServer, **settings) -> AsyncThinkingToolClient:
+    client = AsyncThinkingToolClient(BASE_URL, backoff_factor=0, **settings)
+    client.client = httpx.AsyncClient(
+        base_url=BASE_URL, transport=httpx.MockTransport(server)
+    )
+    return client
+
+
+def test_client_pools_connections_and_only_retries_statuses_of_gets():
+    client = ThinkingToolClient(BASE_URL, pool_size=4, retries=2)
+    adapter = client.session.get_adapter(BASE_URL)
+
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 4
+    retry = adapter.max_retries
+    assert retry.total == 2
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("POST", 503)
+    assert not retry.is_retry("GET", 404)
+
+
+def test_async_client_pools_connections():
+    client = AsyncThinkingToolClient(BASE_URL, pool_size=4)
+    pool = client.client._transport._pool
+    assert pool._max_connections == 4
+    assert pool._max_keepalive_connections == 4
+
+
+@pytest.mark.asyncio
+async def test_async_client_retries_gets_on_error_statuses():
+    server = FakeServer([httpx.Response(503), httpx.Response(200, json=["m"])])
+    async with _async_client(server) as client:
+        assert await client.list_models() == ["m"]
+    assert len(server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_never_resends_posts_after_a_response():
+    server = FakeServer([httpx.Response(503, json={}), httpx.Response(200, json={})])
+    async with _async_client(server) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.create_session()
+    assert len(server.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_retries_connection_errors():
+    server = FakeServer(
+        [httpx.ConnectError("refused"), httpx.Response(200, json={"session_id": "a"})]
+    )
+    async with _async_client(server) as client:
+        session = await client.create_session()
+    assert session.session_id == "a"
+    assert len(server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_streams_thoughts():
+    server = FakeServer(
+        [
+            _ndjson(
+                {"content": "Hi", "done": False},
+                {"content": "", "done": True, "model": "qwen2.5:0.5b"},
+            )
+        ]
+    )
+    async with _async_client(server) as client:
+        chunks = [c async for c in client.think(ThinkingRequest(messages=["Hi"]))]
+
+    assert [c.message.content for c in chunks] == ["Hi", ""]
+    assert chunks[-1].done
+    [request] = server.requests
+    assert request.url.params["stream"] == "true"
+    assert request.headers[TRACE_HEADER] == client.last_trace_id
+
+
+@pytest.mark.asyncio
+async def test_async_client_matches_the_sync_client():
+    server = FakeServer(
+        [
+            httpx.Response(200, json={"session_id": "a", "length": 1}),
+            _ndjson({"status": "success"}),
+            httpx.Response(200, json={"name": "a.py", "content": "pass"}),
+        ]
+    )
+    async with _async_client(server) as client:
+        session = await client.append_session("a", ["Be brief."], role="system")
+        records = [r async for r in client.stream_response("b")]
+        [code] = await client.get_code("a.py")
+
+    assert session.length == 1
+    assert json.loads(server.requests[0].content) == {
+        "messages": ["Be brief."],
+        "role": "system",
+    }
+    assert records == [{"status": "success"}]
+    assert server.requests[1].url.params["stream_id"] == "b"
+    assert (code.name, code.content) == ("a.py", "pass")
+
+
+def test_think_streams_ndjson_when_asked(fake_server):
+    server = fake_server()
+    app = FastAPI()
+    app.include_router(server.router)
+
+    response = TestClient(app).post(
+        "/think", params={"stream": True}, json={"messages": ["Hi"]}
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["message"]["content"] for r in records] == ["Deep", " thought", "."]
+    assert [r["done"] for r in records] == [False, False, True]
+    assert len(server.streams) == 0
+
+
+def test_client_thinks_in_one_round_trip(fake_server, serve):
+    server = fake_server()
+    with serve(server) as base_url, ThinkingToolClient(base_url) as client:
+        chunks = list(client.think(ThinkingRequest(messages=["Hi"])))
+
+    assert [c.message.content for c in chunks] == ["Deep", " thought", "."]
+    assert [c.done for c in chunks] == [False, False, True]
+    # Streamed in the `/think` response, without a `/stream_response` call.
+    text = server.metrics.render()
+    think = 'thinking_requests_total{route="/think",method="POST",status="200"} 1'
+    assert think in text
+    assert "/stream_response" not in text
+
+
+def test_client_streams_registered_responses(fake_server, serve):
+    server = fake_server()
+    with serve(server) as base_url, ThinkingToolClient(base_url) as client:
+        stream_url = client._post("/think", {"messages": ["Hi"]})["stream_url"]
+        stream_id = httpx.URL(stream_url).params["stream_id"]
+        records = list(client.stream_response(stream_id))
+
+    assert [r["message"]["content"] for r in records] == ["Deep", " thought", "."]
+    assert [r["done"] for r in records] == [False, False, True]
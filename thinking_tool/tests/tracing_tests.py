@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+import logging
+
+import ollama
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from thinking_tool.llm_manager import Message
+from thinking_tool.models import OllamaConfig, TracingConfig
+from thinking_tool.models.request import ThinkingServerConfig
+from thinking_tool import thinking_server
+from thinking_tool.thinking_server import ThinkingToolServer
+from thinking_tool.tracing import TRACE_HEADER, Span, Tracer, span
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class ChattyClient:
+    async def chat(self, **kwargs):
+        async def stream():
+            for i in range(3):
+                await asyncio.sleep(0.001)
+                yield ollama.ChatResponse(
+                    model=kwargs["model"],
+                    message=Message(role="assistant", content="."),
+                    done=i == 2,
+                )
+
+        return stream()
+
+
+async def _no_details(model: str | None = None) -> None:
+    return None
+
+
+@pytest.fixture
+def client():
+    config = ThinkingServerConfig(
+        model_settings=OllamaConfig(keep_alive_interval=0, warm_on_load=False),
+        coalesce_requests=False,
+    )
+    server = ThinkingToolServer(config=config)
+    server.llm_mang._pool.primary.client = ChattyClient()
+    object.__setattr__(server.llm_mang, "model_details", _no_details)
+
+    app = FastAPI()
+    app.include_router(server.router)
+    return TestClient(app)
+
+
+def test_spans_outside_a_trace_are_not_recorded():
+    tracer = Tracer()
+    with span("orphan") as attributes:
+        attributes["ignored"] = True
+    assert tracer.spans() == []
+
+
+def test_ring_buffer_keeps_the_latest_spans():
+    tracer = Tracer(TracingConfig(max_spans=2))
+    for i in range(3):
+        tracer.add(Span(trace_id=str(i), span_id=str(i), name="s", start=i, end=i))
+    assert [s.trace_id for s in tracer.spans()] == ["1", "2"]
+
+
+def test_a_thought_is_traced_from_handshake_to_completion(client):
+    response = client.post(
+        "/think",
+        params={"stream": True},
+        json={"messages": ["Hello"]},
+        headers={TRACE_HEADER: "trace-1"},
+    )
+    assert response.headers[TRACE_HEADER] == "trace-1"
+
+    spans = client.get("/traces", params={"trace_id": "trace-1"}).json()
+    names = [s["name"] for s in spans]
+    for name in ("handshake", "scheduler wait", "backend connect", "first token"):
+        assert name in names
+    assert names[-1] == "completion"
+
+    handshake = spans[names.index("handshake")]
+    assert all(s["parent_id"] == handshake["span_id"] for s in spans[1:])
+    assert spans[-1]["attributes"]["chunks"] == 3
+
+    chrome = client.get("/traces/chrome", params={"trace_id": "trace-1"}).json()
+    events = [e for e in chrome["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in events] == names
+
+
+def test_traces_have_their_own_default_limit(client, monkeypatch):
+    monkeypatch.setattr(thinking_server, "DEFAULT_TRACE_QUERY_LIMIT", 2)
+    client.post("/think", params={"stream": True}, json={"messages": ["Hello"]})
+
+    assert len(client.get("/traces").json()) == 2
+    assert len(client.get("/traces", params={"limit": 3}).json()) == 3
+
+
+def test_requests_without_a_trace_id_get_one(client):
+    response = client.get("/streams")
+    assert response.headers[TRACE_HEADER]
+    assert client.get("/metrics").headers.get(TRACE_HEADER) is None
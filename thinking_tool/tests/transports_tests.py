@@ -0,0 +1,66 @@
+import json
+import logging
+
+import ollama
+import pytest
+
+from thinking_tool.llm_manager import ChatResponse, Message
+from thinking_tool.thinking_client import decode_chunk
+from thinking_tool.transports import encode_lean
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+def test_lean_chunks_only_carry_content():
+    chunk = ChatResponse(
+        model="qwen2.5:0.5b",
+        created_at="2024-01-01T00:00:00Z",
+        message=Message(role="assistant", content='say "hi"\n'),
+        done=False,
+    )
+    assert json.loads(encode_lean(chunk)) == {"content": 'say "hi"\n', "done": False}
+
+
+@pytest.mark.skipif(
+    "thinking" not in Message.model_fields, reason="ollama client without thinking"
+)
+def test_lean_chunks_carry_thinking():
+    chunk = ChatResponse(
+        model="qwen2.5:0.5b",
+        message=Message(role="assistant", content="", thinking="hmm"),
+        done=False,
+    )
+    assert json.loads(encode_lean(chunk))["thinking"] == "hmm"
+
+
+def test_last_lean_chunk_carries_the_stats():
+    chunk = ChatResponse(
+        model="qwen2.5:0.5b",
+        message=Message(role="assistant", content=""),
+        done=True,
+        done_reason="stop",
+        eval_count=42,
+    )
+    record = json.loads(encode_lean(chunk))
+
+    assert record["model"] == "qwen2.5:0.5b"
+    assert record["eval_count"] == 42
+    assert "message" not in record
+
+
+def test_client_decodes_lean_records():
+    chunk = decode_chunk({"content": "Hi", "done": False})
+    assert chunk.message.content == "Hi"
+    assert chunk.message.role == "assistant"
+    assert not chunk.done
+
+    chunk = decode_chunk({"content": "", "done": True, "eval_count": 42}, validate=True)
+    assert chunk.eval_count == 42
+
+    full = ChatResponse(model="m", message=Message(role="assistant", content="Hi"))
+    assert decode_chunk(full.model_dump()).message.content == "Hi"
+
+
+def test_client_raises_error_records():
+    with pytest.raises(ollama.ResponseError, match="backend went away"):
+        decode_chunk({"error": "backend went away"})
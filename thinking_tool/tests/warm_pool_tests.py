@@ -0,0 +1,112 @@
+import asyncio
+import time
+import pytest
+import logging
+import ollama
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from thinking_tool.backend_pool import OllamaBackendPool
+from thinking_tool.models.config import OllamaConfig
+from thinking_tool.models.request import ThinkingServerConfig
+from thinking_tool.warm_pool import KEEP_FOREVER, UNLOAD, WarmPool
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+
+class LoadingClient:
+    def __init__(self, loaded: list[str] = ()):
+        self.loaded = list(loaded)
+        self.generates: list[tuple[str, object]] = []
+
+    async def ps(self):
+        return ollama.ProcessResponse(
+            models=[ollama.ProcessResponse.Model(model=m) for m in self.loaded]
+        )
+
+    async def list(self):
+        return ollama.ListResponse(models=[])
+
+    async def generate(self, model: str, keep_alive=None):
+        self.generates.append((model, keep_alive))
+        await asyncio.sleep(0.01)
+        if keep_alive == UNLOAD:
+            self.loaded.remove(model)
+        elif model not in self.loaded:
+            self.loaded.append(model)
+        return ollama.GenerateResponse(model=model, response="")
+
+
+def _warm_pool(client: LoadingClient, **settings) -> WarmPool:
+    config = OllamaConfig(model="deepseek-r1:14b", **settings)
+    pool = OllamaBackendPool(config)
+    pool.primary.client = client
+    return WarmPool(pool, config)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_warms_share_one_load():
+    client = LoadingClient()
+    warm_pool = _warm_pool(client)
+
+    warms = [warm_pool.warm("qwen2.5:0.5b") for _ in range(3)]
+    assert all(await asyncio.gather(*warms))
+    assert client.generates == [("qwen2.5:0.5b", "30m")]
+    assert "qwen2.5:0.5b" in warm_pool.pool.primary.loaded_models
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_models_are_unloaded():
+    client = LoadingClient()
+    warm_pool = _warm_pool(client, max_warm_models=1)
+
+    await warm_pool.warm("llama3.2:1b")
+    await warm_pool.warm("qwen2.5:0.5b")
+    await warm_pool.warm("deepseek-r1:14b")
+
+    assert ("llama3.2:1b", UNLOAD) in client.generates
+    assert warm_pool.pool.primary.loaded_models == {"qwen2.5:0.5b", "deepseek-r1:14b"}
+
+
+@pytest.mark.asyncio
+async def test_refresh_reloads_missing_pinned_models():
+    client = LoadingClient(loaded=["llama3.2:1b", "mistral:7b"])
+    warm_pool = _warm_pool(client, pinned_models=["qwen2.5:0.5b"], max_warm_models=0)
+
+    await warm_pool.refresh()
+
+    assert ("qwen2.5:0.5b", KEEP_FOREVER) in client.generates
+    assert client.loaded == ["llama3.2:1b", "mistral:7b", "qwen2.5:0.5b"]
+
+
+@pytest.mark.asyncio
+async def test_models_loaded_by_others_are_not_unloaded():
+    client = LoadingClient(loaded=["mistral:7b"])
+    warm_pool = _warm_pool(client, max_warm_models=0)
+
+    await warm_pool.refresh()
+    await warm_pool.warm("qwen2.5:0.5b")
+
+    assert ("mistral:7b", UNLOAD) not in client.generates
+    assert ("qwen2.5:0.5b", UNLOAD) in client.generates
+    assert client.loaded == ["mistral:7b"]
+
+
+def test_server_startup_warms_pinned_models(fake_server):
+    config = ThinkingServerConfig(
+        model_settings=OllamaConfig(pinned_models=["qwen2.5:0.5b"])
+    )
+    server = fake_server(config)
+    client = LoadingClient()
+    server.llm_mang._pool.primary.client = client
+    app = FastAPI()
+    app.include_router(server.router)
+
+    # No chat is made, only the server started.
+    with TestClient(app):
+        deadline = time.monotonic() + 5
+        while "qwen2.5:0.5b" not in client.loaded and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert client.generates == [("qwen2.5:0.5b", KEEP_FOREVER)]
+    assert server.llm_mang._warm_pool._task is None
@@ -1,49 +1,172 @@
-import json
+import asyncio
 import logging
+import httpx
 import ollama
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # from dataclasses import dataclass
-from typing import Generator, Optional, List, Dict
+from typing import AsyncGenerator, Generator, Optional, List, Dict
 
 from thinking_tool.models.request import (
     PullModelRequest,
     ServerConfigRequest,
+    SessionThinkingRequest,
+    ThinkingBatchRequest,
     ThinkingRequest,
     ThinkingServerConfig,
+    WireFormat,
 )
 from thinking_tool.models.response import (
+    BatchResult,
+    SessionResponse,
     StreamResponse,
     UpdateConfigResponse,
 )
+from thinking_tool.log_reader import LogRange
+from thinking_tool.log_store import LogRecord
 from thinking_tool.self_awareness import CodeFile
+from thinking_tool.tracing import TRACE_HEADER, new_trace_id
+from thinking_tool.stream_decoder import DEFAULT_READ_SIZE, NDJSONDecoder, decode_ndjson
 
 logger = logging.getLogger(__name__ + "." + __file__)
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+# (connect, read) seconds.  The read timeout is the longest silence allowed
+# between two chunks of a stream, not the length of a whole thought.
+DEFAULT_TIMEOUT = (5.0, 300.0)
+RETRY_STATUSES = (429, 502, 503, 504)
+# Streams are requested in the lean wire format and decoded by `decode_chunk`.
+LEAN = {"wire": WireFormat.lean.value}
+
+
+def decode_chunk(record: Dict, validate: bool = False) -> ollama.ChatResponse:
+    """
+    Builds a `ChatResponse` from a lean stream record.  Unless `validate` is
+    set the models are constructed without running pydantic validation.
+    """
+    if "error" in record:
+        # The stream failed on the server.
+        raise ollama.ResponseError(record["error"])
+    if "message" in record:
+        # A full record, from a server which ignored `wire=lean`.
+        return ollama.ChatResponse(**record)
+
+    record = dict(record)
+    message = {"role": "assistant", "content": record.pop("content", "")}
+    for key in ("thinking", "tool_calls"):
+        if key in record:
+            message[key] = record.pop(key)
+
+    if validate or "tool_calls" in message:
+        return ollama.ChatResponse(message=message, **record)
+    return ollama.ChatResponse.model_construct(
+        message=ollama.Message.model_construct(**message), **record
+    )
+
+
+def _log_query(level, since, until, stream_id, limit: int) -> Dict:
+    params = {"level": level, "since": since, "until": until, "stream_id": stream_id}
+    return {"limit": limit, **{k: v for k, v in params.items() if v is not None}}
+
 
 class ThinkingToolClient:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        # Maximum bytes read from a stream at once.
+        read_size: int = DEFAULT_READ_SIZE,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retries: int = DEFAULT_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+    ):
         self.base_url = base_url
+        self.read_size = read_size
+        self.timeout = timeout
+        # Trace ID of the latest `think()`, for looking up its spans.
+        self.last_trace_id: Optional[str] = None
+
+        # Connections are kept alive and reused between calls.  Connection
+        # errors are always retried; status retries only apply to idempotent
+        # methods, so a `/think` POST is never sent twice.
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUSES,
+                raise_on_status=False,
+            ),
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self) -> "ThinkingToolClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
 
     def _get(self, endpoint: str, params: Optional[Dict] = None):
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params, timeout=self.timeout)
         response.raise_for_status()
         return response.json()
 
-    def _post(self, endpoint: str, json_data: Dict):
+    def _post(self, endpoint: str, json_data: Dict, headers: Optional[Dict] = None):
         url = f"{self.base_url}{endpoint}"
-        response = requests.post(url, json=json_data)
+        response = self.session.post(
+            url, json=json_data, headers=headers, timeout=self.timeout
+        )
         response.raise_for_status()
         return response.json()
 
     def _stream_response(
-        self, endpoint: str, params: Optional[Dict] = None
-    ) -> Generator[str, None, None]:
-        response = requests.get(endpoint, stream=True)
-        for chunk in response.iter_content(chunk_size=1024):
-            if chunk:
-                yield json.loads(chunk.decode())
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Generator[Dict, None, None]:
+        with self.session.get(
+            endpoint, params=params, headers=headers, stream=True, timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            yield from self._decode_stream(response)
+
+    def _stream_post(
+        self,
+        endpoint: str,
+        json_data: Dict,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Generator[Dict, None, None]:
+        url = f"{self.base_url}{endpoint}"
+        with self.session.post(
+            url,
+            json=json_data,
+            params=params,
+            headers=headers,
+            stream=True,
+            timeout=self.timeout,
+        ) as response:
+            response.raise_for_status()
+            yield from self._decode_stream(response)
+
+    def _decode_stream(
+        self, response: requests.Response
+    ) -> Generator[Dict, None, None]:
+        # Streams are newline delimited JSON, records are yielded as soon as
+        # their newline arrives.
+        yield from decode_ndjson(response.iter_content(chunk_size=self.read_size))
 
     # Implement /list_models endpoint
     def list_models(self) -> List[str]:
@@ -68,22 +191,131 @@ class ThinkingToolClient:
         """
         stream = StreamResponse(**self._post("/pull_model", {"model": request.model}))
         for chunk in self._stream_response(f"{self.base_url}{stream.stream_url}"):
+            if "error" in chunk:
+                raise ollama.ResponseError(chunk["error"])
             yield ollama.ProgressResponse(**chunk)
 
+    def list_pulls(self) -> List[Dict]:
+        """
+        Lists the model pulls running on the server.
+        Returns:
+            The model, latest status and progress of each pull.
+        """
+        return self._get("/pulls")
+
     # Implement /think endpoint
     def think(
-        self, request: ThinkingRequest
+        self,
+        request: ThinkingRequest,
+        stream: bool = True,
+        validate: bool = False,
+        trace_id: Optional[str] = None,
     ) -> Generator[ollama.ChatResponse, None, None]:
         """
         Initiates a thinking process with given messages.
         Args:
             request: ThinkingRequest containing messages for the LLM to process.
+            stream: If True, the thought is streamed back in the `/think`
+                response.  If False, `/think` returns a `stream_url` which is
+                then fetched from `/stream_response`.
+            validate: If True, every chunk is validated by pydantic.
+            trace_id: Groups the server's spans for this thought, a new ID
+                by default.  Kept in `last_trace_id`.
         Returns:
             Response containing the generated response.
         """
-        stream = StreamResponse(**self._post("/think", {"messages": request.messages}))
-        for chunk in self._stream_response(f"{self.base_url}{stream.stream_url}"):
-            yield ollama.ChatResponse(**chunk)
+        self.last_trace_id = trace_id = trace_id or new_trace_id()
+        headers = {TRACE_HEADER: trace_id}
+        if stream:
+            chunks = self._stream_post(
+                "/think",
+                request.model_dump(),
+                params={"stream": True, **LEAN},
+                headers=headers,
+            )
+        else:
+            stream_info = StreamResponse(
+                **self._post("/think", request.model_dump(), headers=headers)
+            )
+            chunks = self._stream_response(
+                f"{self.base_url}{stream_info.stream_url}", LEAN, headers=headers
+            )
+
+        for chunk in chunks:
+            yield decode_chunk(chunk, validate)
+
+    def think_batch(
+        self, requests: List[ThinkingRequest]
+    ) -> Generator[BatchResult, None, None]:
+        """
+        Runs many independent requests in one call.
+        Args:
+            requests: The requests to think about, run concurrently.
+        Returns:
+            A result per request, in the order they finish.  `index` is the
+            position of its request in `requests`.
+        """
+        batch = ThinkingBatchRequest(requests=requests)
+        for result in self._stream_post("/think_batch", batch.model_dump()):
+            yield BatchResult(**result)
+
+    def create_session(self) -> SessionResponse:
+        """
+        Creates a conversation session which keeps its history on the server.
+        Returns:
+            The new session.
+        """
+        return SessionResponse(**self._post("/sessions", {}))
+
+    def append_session(
+        self, session_id: str, messages: List[str], role: str = "user"
+    ) -> SessionResponse:
+        """
+        Adds turns to a session's history without thinking about them.
+        Args:
+            session_id: The session to add to.
+            messages: The new turns.
+            role: The role of the new turns.
+        Returns:
+            The updated session.
+        """
+        response = self._post(
+            f"/sessions/{session_id}/messages",
+            {"messages": messages, "role": role},
+        )
+        return SessionResponse(**response)
+
+    def think_in_session(
+        self, session_id: str, request: SessionThinkingRequest, validate: bool = False
+    ) -> Generator[ollama.ChatResponse, None, None]:
+        """
+        Thinks about a session's history plus the new turns in `request`.
+        Only the new turns are sent; the reply is added to the history.
+        Args:
+            session_id: The session to think in.
+            request: SessionThinkingRequest containing the new turns.
+            validate: If True, every chunk is validated by pydantic.
+        Returns:
+            Response containing the generated response.
+        """
+        chunks = self._stream_post(
+            f"/sessions/{session_id}/think", request.model_dump(), params=LEAN
+        )
+        for chunk in chunks:
+            yield decode_chunk(chunk, validate)
+
+    def delete_session(self, session_id: str) -> SessionResponse:
+        """
+        Deletes a session and its history.
+        Args:
+            session_id: The session to delete.
+        Returns:
+            The deleted session.
+        """
+        url = f"{self.base_url}/sessions/{session_id}"
+        response = self.session.delete(url, timeout=self.timeout)
+        response.raise_for_status()
+        return SessionResponse(**response.json())
 
     # Implement /update_settings endpoint
     def update_settings(self, request: ServerConfigRequest) -> UpdateConfigResponse:
@@ -100,15 +332,29 @@ class ThinkingToolClient:
         return UpdateConfigResponse(config=config)
 
     # Implement /stream_response endpoint
-    def stream_response(self, stream_id: str) -> Dict:
+    def stream_response(self, stream_id: str) -> Generator[Dict, None, None]:
         """
         Streams a response for a given stream_id.
         Args:
             stream_id: The ID of the stream to monitor.
         Returns:
-            Streamed response containing messages as they are generated.
+            The stream's records as they are generated.
+        """
+        params = {"stream_id": stream_id}
+        yield from self._stream_response(f"{self.base_url}/stream_response", params)
+
+    def cancel_stream(self, stream_id: str) -> Dict:
+        """
+        Stops a stream and the generation behind it.
+        Args:
+            stream_id: The stream to cancel.
+        Returns:
+            The status of the cancelled stream.
         """
-        return self._get("/stream_response", {"stream_id": stream_id})
+        url = f"{self.base_url}/streams/{stream_id}"
+        response = self.session.delete(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
 
     # Implement /logs endpoint
     def get_logs(self) -> Dict:
@@ -119,6 +365,73 @@ class ThinkingToolClient:
         """
         return self._get("/logs")
 
+    def get_log_range(self, offset: int = 0, length: Optional[int] = None) -> LogRange:
+        """
+        Retrieves a byte range of the server log.
+        Args:
+            offset: First byte to read.
+            length: Optional. Bytes to read, capped by the server.
+        Returns:
+            The range read, with `next_offset` to continue from.
+        """
+        params = {"offset": offset}
+        if length is not None:
+            params["length"] = length
+        return LogRange(**self._get("/logs", params))
+
+    def tail_logs(self, lines: int) -> LogRange:
+        """
+        Retrieves the last lines of the server log.
+        Args:
+            lines: Number of lines to read.
+        Returns:
+            The range read, with `next_offset` to continue from.
+        """
+        return LogRange(**self._get("/logs", {"tail": lines}))
+
+    def follow_logs(
+        self, tail: Optional[int] = None, offset: Optional[int] = None
+    ) -> Generator[LogRange, None, None]:
+        """
+        Streams lines as they are appended to the server log.
+        Args:
+            tail: Optional. Start with this many existing lines.
+            offset: Optional. Start from this byte instead of the end.
+        Returns:
+            Ranges of complete lines as they are written.
+        """
+        params = {"follow": "true"}
+        if tail is not None:
+            params["tail"] = tail
+        elif offset is not None:
+            params["offset"] = offset
+        for chunk in self._stream_response(f"{self.base_url}/logs", params):
+            # Empty ranges are heartbeats.
+            if chunk["content"]:
+                yield LogRange(**chunk)
+
+    def query_logs(
+        self,
+        level: Optional[str] = None,
+        since: Optional[float | str] = None,
+        until: Optional[float | str] = None,
+        stream_id: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[LogRecord]:
+        """
+        Queries the server's structured log store.
+        Args:
+            level: Optional. Minimum level, e.g. "ERROR".
+            since: Optional. Epoch seconds or ISO 8601 timestamp.
+            until: Optional. Epoch seconds or ISO 8601 timestamp.
+            stream_id: Optional. Only records logged while serving this stream.
+            limit: Maximum number of records returned.
+        Returns:
+            Matching records, oldest first.
+        """
+        params = _log_query(level, since, until, stream_id, limit)
+        return [LogRecord(**record) for record in self._get("/logs", params)]
+
     # Implement /code endpoint
     def get_code(self, filename: Optional[str] = None) -> List[CodeFile]:
         """
@@ -130,9 +443,33 @@ class ThinkingToolClient:
         """
         params = {"filename": filename} if filename else None
         result = self._get("/code", params)
-        files = [CodeFile(**file) for file in result]
+        # A single file comes back on its own, not in a list.
+        files = [CodeFile(**file) for file in ([result] if filename else result)]
         return files
 
+    def get_trace(self, trace_id: Optional[str] = None) -> List[Dict]:
+        """
+        Retrieves recorded spans.
+        Args:
+            trace_id: Only spans of this trace, by default `last_trace_id`.
+        Returns:
+            The spans, oldest first.
+        """
+        trace_id = trace_id or self.last_trace_id
+        return self._get("/traces", {"trace_id": trace_id} if trace_id else None)
+
+    def get_chrome_trace(self, trace_id: Optional[str] = None) -> Dict:
+        """
+        Retrieves recorded spans as a Chrome trace, for chrome://tracing or
+        Perfetto.
+        Args:
+            trace_id: Only spans of this trace, by default `last_trace_id`.
+        Returns:
+            The trace, ready to be saved as JSON.
+        """
+        trace_id = trace_id or self.last_trace_id
+        return self._get("/traces/chrome", {"trace_id": trace_id} if trace_id else None)
+
     def get_docs(self) -> List[CodeFile]:
         """
         Retrieves API documentation from the server.
@@ -140,3 +477,397 @@ class ThinkingToolClient:
             Dictionary containing the requested code or list of files if no filename is provided.
         """
         return self._get("/openapi.json")
+
+
+class AsyncThinkingToolClient:
+    """
+    An asyncio version of `ThinkingToolClient` built on `httpx`.  Streams are
+    plain async generators, so one event loop can drive many concurrent
+    `think()` calls over a shared connection pool.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retries: int = DEFAULT_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+    ):
+        self.base_url = base_url
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        # Trace ID of the latest `think()`, for looking up its spans.
+        self.last_trace_id: Optional[str] = None
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+        )
+
+    async def __aenter__(self) -> "AsyncThinkingToolClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _send(self, request: httpx.Request, stream: bool = False):
+        # Mirrors the sync client: connection errors are retried for every
+        # method, error statuses only for GETs.
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff_factor * 2 ** (attempt - 1))
+
+            try:
+                response = await self.client.send(request, stream=stream)
+            except httpx.ConnectError:
+                if attempt == self.retries:
+                    raise
+                continue
+
+            if (
+                request.method == "GET"
+                and response.status_code in RETRY_STATUSES
+                and attempt < self.retries
+            ):
+                await response.aclose()
+                continue
+
+            return response
+
+    async def _get(self, endpoint: str, params: Optional[Dict] = None):
+        response = await self._send(
+            self.client.build_request("GET", endpoint, params=params)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _post(
+        self, endpoint: str, json_data: Dict, headers: Optional[Dict] = None
+    ):
+        response = await self._send(
+            self.client.build_request("POST", endpoint, json=json_data, headers=headers)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _stream(
+        self,
+        method: str,
+        endpoint: str,
+        json_data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> AsyncGenerator[Dict, None]:
+        request = self.client.build_request(
+            method, endpoint, json=json_data, params=params, headers=headers
+        )
+        response = await self._send(request, stream=True)
+        try:
+            response.raise_for_status()
+            decoder = NDJSONDecoder()
+            async for data in response.aiter_bytes():
+                for record in decoder.feed(data):
+                    yield record
+            for record in decoder.flush():
+                yield record
+        finally:
+            await response.aclose()
+
+    async def list_models(self) -> List[str]:
+        """
+        Lists available models.
+        Returns:
+            List of model names/ids.
+        """
+        return await self._get("/list_models")
+
+    async def pull_model(
+        self, request: PullModelRequest
+    ) -> AsyncGenerator[ollama.ProgressResponse, None]:
+        """
+        Pulls a specified model.
+        Args:
+            request: PullModelRequest containing the model name/id.
+        Returns:
+            Progress of the download as it happens.
+        """
+        stream = StreamResponse(
+            **await self._post("/pull_model", {"model": request.model})
+        )
+        async for chunk in self._stream("GET", stream.stream_url):
+            if "error" in chunk:
+                raise ollama.ResponseError(chunk["error"])
+            yield ollama.ProgressResponse(**chunk)
+
+    async def list_pulls(self) -> List[Dict]:
+        """
+        Lists the model pulls running on the server.
+        Returns:
+            The model, latest status and progress of each pull.
+        """
+        return await self._get("/pulls")
+
+    async def think(
+        self,
+        request: ThinkingRequest,
+        stream: bool = True,
+        validate: bool = False,
+        trace_id: Optional[str] = None,
+    ) -> AsyncGenerator[ollama.ChatResponse, None]:
+        """
+        Initiates a thinking process with given messages.
+        Args:
+            request: ThinkingRequest containing messages for the LLM to process.
+            stream: If True, the thought is streamed back in the `/think`
+                response, otherwise through `/stream_response`.
+            validate: If True, every chunk is validated by pydantic.
+            trace_id: Groups the server's spans for this thought, a new ID
+                by default.  Kept in `last_trace_id`.
+        Returns:
+            Response containing the generated response.
+        """
+        self.last_trace_id = trace_id = trace_id or new_trace_id()
+        headers = {TRACE_HEADER: trace_id}
+        if stream:
+            chunks = self._stream(
+                "POST",
+                "/think",
+                request.model_dump(),
+                params={"stream": True, **LEAN},
+                headers=headers,
+            )
+        else:
+            stream_info = StreamResponse(
+                **await self._post("/think", request.model_dump(), headers=headers)
+            )
+            # httpx would replace the `stream_id` query rather than add to it.
+            url = httpx.URL(stream_info.stream_url).copy_merge_params(LEAN)
+            chunks = self._stream("GET", url, headers=headers)
+
+        async for chunk in chunks:
+            yield decode_chunk(chunk, validate)
+
+    async def think_batch(
+        self, requests: List[ThinkingRequest]
+    ) -> AsyncGenerator[BatchResult, None]:
+        """
+        Runs many independent requests in one call.
+        Args:
+            requests: The requests to think about, run concurrently.
+        Returns:
+            A result per request, in the order they finish.  `index` is the
+            position of its request in `requests`.
+        """
+        batch = ThinkingBatchRequest(requests=requests)
+        async for result in self._stream("POST", "/think_batch", batch.model_dump()):
+            yield BatchResult(**result)
+
+    async def create_session(self) -> SessionResponse:
+        """
+        Creates a conversation session which keeps its history on the server.
+        Returns:
+            The new session.
+        """
+        return SessionResponse(**await self._post("/sessions", {}))
+
+    async def append_session(
+        self, session_id: str, messages: List[str], role: str = "user"
+    ) -> SessionResponse:
+        """
+        Adds turns to a session's history without thinking about them.
+        Args:
+            session_id: The session to add to.
+            messages: The new turns.
+            role: The role of the new turns.
+        Returns:
+            The updated session.
+        """
+        response = await self._post(
+            f"/sessions/{session_id}/messages",
+            {"messages": messages, "role": role},
+        )
+        return SessionResponse(**response)
+
+    async def think_in_session(
+        self, session_id: str, request: SessionThinkingRequest, validate: bool = False
+    ) -> AsyncGenerator[ollama.ChatResponse, None]:
+        """
+        Thinks about a session's history plus the new turns in `request`.
+        Args:
+            session_id: The session to think in.
+            request: SessionThinkingRequest containing the new turns.
+            validate: If True, every chunk is validated by pydantic.
+        Returns:
+            Response containing the generated response.
+        """
+        chunks = self._stream(
+            "POST", f"/sessions/{session_id}/think", request.model_dump(), LEAN
+        )
+        async for chunk in chunks:
+            yield decode_chunk(chunk, validate)
+
+    async def delete_session(self, session_id: str) -> SessionResponse:
+        """
+        Deletes a session and its history.
+        Args:
+            session_id: The session to delete.
+        Returns:
+            The deleted session.
+        """
+        response = await self._send(
+            self.client.build_request("DELETE", f"/sessions/{session_id}")
+        )
+        response.raise_for_status()
+        return SessionResponse(**response.json())
+
+    async def update_settings(
+        self, request: ServerConfigRequest
+    ) -> UpdateConfigResponse:
+        """
+        Updates server settings with specified configuration.
+        Args:
+            request: ServerConfigRequest containing the updated configuration.
+        Returns:
+            Response containing the updated configuration.
+        """
+        response = await self._post("/update_settings", request.model_dump())
+        config = ThinkingServerConfig(**response)
+        return UpdateConfigResponse(config=config)
+
+    async def stream_response(self, stream_id: str) -> AsyncGenerator[Dict, None]:
+        """
+        Streams a response for a given stream_id.
+        Args:
+            stream_id: The ID of the stream to monitor.
+        Returns:
+            The stream's records as they are generated.
+        """
+        params = {"stream_id": stream_id}
+        async for record in self._stream("GET", "/stream_response", params=params):
+            yield record
+
+    async def cancel_stream(self, stream_id: str) -> Dict:
+        """
+        Stops a stream and the generation behind it.
+        Args:
+            stream_id: The stream to cancel.
+        Returns:
+            The status of the cancelled stream.
+        """
+        response = await self._send(
+            self.client.build_request("DELETE", f"/streams/{stream_id}")
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def get_logs(self) -> Dict:
+        """
+        Retrieves server logs.
+        Returns:
+            Dictionary containing log information.
+        """
+        return await self._get("/logs")
+
+    async def get_log_range(
+        self, offset: int = 0, length: Optional[int] = None
+    ) -> LogRange:
+        """
+        Retrieves a byte range of the server log.
+        """
+        params = {"offset": offset}
+        if length is not None:
+            params["length"] = length
+        return LogRange(**await self._get("/logs", params))
+
+    async def tail_logs(self, lines: int) -> LogRange:
+        """
+        Retrieves the last lines of the server log.
+        """
+        return LogRange(**await self._get("/logs", {"tail": lines}))
+
+    async def follow_logs(
+        self, tail: Optional[int] = None, offset: Optional[int] = None
+    ) -> AsyncGenerator[LogRange, None]:
+        """
+        Streams lines as they are appended to the server log.
+        """
+        params = {"follow": "true"}
+        if tail is not None:
+            params["tail"] = tail
+        elif offset is not None:
+            params["offset"] = offset
+        async for chunk in self._stream("GET", "/logs", params=params):
+            # Empty ranges are heartbeats.
+            if chunk["content"]:
+                yield LogRange(**chunk)
+
+    async def query_logs(
+        self,
+        level: Optional[str] = None,
+        since: Optional[float | str] = None,
+        until: Optional[float | str] = None,
+        stream_id: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[LogRecord]:
+        """
+        Queries the server's structured log store.
+        """
+        params = _log_query(level, since, until, stream_id, limit)
+        return [LogRecord(**record) for record in await self._get("/logs", params)]
+
+    async def get_code(self, filename: Optional[str] = None) -> List[CodeFile]:
+        """
+        Retrieves source code from the server.
+        Args:
+            filename: Optional. The name of the file to retrieve.
+        Returns:
+            List of the requested code files.
+        """
+        params = {"filename": filename} if filename else None
+        result = await self._get("/code", params)
+        # A single file comes back on its own, not in a list.
+        return [CodeFile(**file) for file in ([result] if filename else result)]
+
+    async def get_trace(self, trace_id: Optional[str] = None) -> List[Dict]:
+        """
+        Retrieves recorded spans.
+        Args:
+            trace_id: Only spans of this trace, by default `last_trace_id`.
+        Returns:
+            The spans, oldest first.
+        """
+        trace_id = trace_id or self.last_trace_id
+        return await self._get("/traces", {"trace_id": trace_id} if trace_id else None)
+
+    async def get_chrome_trace(self, trace_id: Optional[str] = None) -> Dict:
+        """
+        Retrieves recorded spans as a Chrome trace, for chrome://tracing or
+        Perfetto.
+        Args:
+            trace_id: Only spans of this trace, by default `last_trace_id`.
+        Returns:
+            The trace, ready to be saved as JSON.
+        """
+        trace_id = trace_id or self.last_trace_id
+        params = {"trace_id": trace_id} if trace_id else None
+        return await self._get("/traces/chrome", params)
+
+    async def get_docs(self) -> Dict:
+        """
+        Retrieves API documentation from the server.
+        Returns:
+            The server's OpenAPI definition.
+        """
+        return await self._get("/openapi.json")
@@ -1,19 +1,96 @@
-import json
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse, StreamingResponse
-from typing import AsyncGenerator
+import asyncio
+from fastapi import APIRouter, Header, WebSocket
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from datetime import datetime
+from time import monotonic, time
+from typing import AsyncGenerator, AsyncIterator
 from uuid import uuid4
 import logging
-from rich import print
 
 from thinking_tool.models.request import StreamRequest, ThinkingServerConfig
 
-from .self_awareness import SelfAwareness
-from .llm_manager import OllamaLLM_Manager
-from .models import ServerConfigRequest, ThinkingRequest, PullModelRequest
+from .self_awareness import CodeChange, SelfAwareness, etag_matches
+from .log_reader import LogRange
+from .log_store import LogStore, LogStoreHandler, StreamIdFilter, current_stream_id
+from .log_queue import attach_queue_handler
+from .llm_manager import (
+    ChatResponse,
+    LLM_ManagerStatus,
+    Message,
+    OllamaLLM_Manager,
+    ProgressResponse,
+)
+from .stream_registry import StreamRegistry, StreamRegistryFull, StreamState
+from .broadcast import Broadcast
+from .pull_manager import PullManager, progress
+from .generation_stats import GenerationStats
+from .metrics import METRICS_MEDIA_TYPE, ServerMetrics
+from .tracing import Tracer, record_span, span
+from .scheduler import RequestScheduler, SchedulerSaturated, Ticket
+from .response_cache import ResponseCache
+from .sessions import Session, SessionStore, SessionStoreFull
+from .context_budget import BudgetedPrompt, ContextBudget
+from .transports import (
+    NDJSON_MEDIA_TYPE,
+    SSE_HEADERS,
+    SSE_MEDIA_TYPE,
+    ndjson_stream,
+    resume_index,
+    sse_stream,
+    websocket_stream,
+)
+from .models import (
+    ServerConfigRequest,
+    ThinkingRequest,
+    PullModelRequest,
+    RequestPriority,
+    SessionMessagesRequest,
+    SessionThinkingRequest,
+    ThinkingBatchRequest,
+    WireFormat,
+)
+from .models.response import (
+    BatchResult,
+    BudgetReport,
+    OllamaErroResponse,
+    SessionResponse,
+)
 
 logger = logging.getLogger(__name__ + "." + __file__)
 
+DEFAULT_LOG_QUERY_LIMIT = 1000
+# Spans returned by `/traces` without a `limit`, at most `max_spans`.
+DEFAULT_TRACE_QUERY_LIMIT = 1000
+# Scraping and reading traces would otherwise fill the trace buffer.
+UNTRACED_ROUTES = ("/metrics", "/traces", "/traces/chrome")
+
+
+def _parse_time(value: str | None) -> float | None:
+    # Seconds since the epoch or an ISO 8601 timestamp.
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time: '{value}'")
+
+
+def _join_chunks(chunks: list[ChatResponse]) -> ChatResponse:
+    # The whole thought as one response, with the stats of the last chunk.
+    last = chunks[-1]
+    update = {"content": "".join(chunk.message.content or "" for chunk in chunks)}
+    # Older ollama clients have no `thinking` field.
+    if "thinking" in type(last.message).model_fields:
+        thinking = "".join(chunk.message.thinking or "" for chunk in chunks)
+        update["thinking"] = thinking or None
+    message = last.message.model_copy(update=update)
+    return last.model_copy(update={"message": message})
+
 
 class ThinkingToolServer:
 
@@ -26,11 +103,41 @@ class ThinkingToolServer:
         self.config = config if config else ThinkingServerConfig()
 
         self.code_dir = code_dir
-        self.last_response_stream = None
+        self.streams = StreamRegistry(config=self.config.streams)
+        self.scheduler = RequestScheduler(config=self.config.scheduler)
+        self.response_cache = ResponseCache(config=self.config.response_cache)
+        self._in_flight: dict[str, Broadcast] = {}
+        self.generation_stats = GenerationStats()
+        self.metrics = ServerMetrics()
+        self.tracer = Tracer(config=self.config.tracing)
+        self.sessions = SessionStore(config=self.config.sessions)
+        self.context_budget = ContextBudget(config=self.config.context_budget)
 
-        self.llm_mang = OllamaLLM_Manager(config=self.config)
+        self.llm_mang = OllamaLLM_Manager(config=self.config.model_settings)
+        self.pulls = PullManager(
+            lambda model: self.llm_mang.pull(model), config=self.config.pulls
+        )
         self.self_awareness = SelfAwareness()
-        self.router = APIRouter()
+        if self.config.code_watch.enabled:
+            self.self_awareness.watch(
+                poll_interval=self.config.code_watch.poll_interval,
+                polling=self.config.code_watch.polling,
+            )
+        self.log_store = None
+        if self.config.log_store.enabled:
+            self.log_store = LogStore(config=self.config.log_store)
+            attach_queue_handler(
+                logging.getLogger(__package__),
+                LogStoreHandler(self.log_store),
+                filters=(StreamIdFilter(),),
+            )
+        self.router = APIRouter(
+            route_class=self.tracer.route_class(
+                self.metrics.route_class(), exclude=UNTRACED_ROUTES
+            ),
+            on_startup=[self.startup],
+            on_shutdown=[self.shutdown],
+        )
 
         self.router.add_api_route(
             "/list_models",
@@ -46,6 +153,20 @@ class ThinkingToolServer:
             response_class=JSONResponse,
         )
 
+        self.router.add_api_route(
+            "/pulls",
+            self.pulls_status,
+            methods=["GET"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/pulls/{model:path}",
+            self.pull_progress,
+            methods=["GET"],
+            response_class=StreamingResponse,
+        )
+
         self.router.add_api_route(
             "/think",
             self.think,
@@ -53,6 +174,48 @@ class ThinkingToolServer:
             response_class=StreamingResponse,
         )
 
+        self.router.add_api_route(
+            "/think_batch",
+            self.think_batch,
+            methods=["POST"],
+            response_class=StreamingResponse,
+        )
+
+        self.router.add_api_route(
+            "/sessions",
+            self.create_session,
+            methods=["POST"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/sessions/{session_id}",
+            self.get_session,
+            methods=["GET"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/sessions/{session_id}",
+            self.delete_session,
+            methods=["DELETE"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/sessions/{session_id}/messages",
+            self.append_session,
+            methods=["POST"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/sessions/{session_id}/think",
+            self.think_in_session,
+            methods=["POST"],
+            response_class=StreamingResponse,
+        )
+
         self.router.add_api_route(
             "/update_settings",
             self.update_settings,
@@ -67,6 +230,46 @@ class ThinkingToolServer:
             response_class=StreamingResponse,
         )
 
+        self.router.add_api_route(
+            "/stream_events",
+            self.stream_events,
+            methods=["GET"],
+            response_class=StreamingResponse,
+        )
+
+        self.router.add_api_websocket_route(
+            "/stream_ws",
+            self.stream_ws,
+        )
+
+        self.router.add_api_route(
+            "/streams",
+            self.streams_status,
+            methods=["GET"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/streams/{stream_id}",
+            self.stream_status,
+            methods=["GET"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/streams/{stream_id}",
+            self.cancel_stream,
+            methods=["DELETE"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/response_cache",
+            self.response_cache_stats,
+            methods=["GET"],
+            response_class=JSONResponse,
+        )
+
         self.router.add_api_route(
             "/logs",
             self.logs,
@@ -81,90 +284,780 @@ class ThinkingToolServer:
             response_class=JSONResponse,
         )
 
+        self.router.add_api_route(
+            "/code/events",
+            self.code_events,
+            methods=["GET"],
+            response_class=StreamingResponse,
+        )
+
+        self.router.add_api_route(
+            "/metrics",
+            self.metrics_text,
+            methods=["GET"],
+            response_class=Response,
+        )
+
+        self.router.add_api_route(
+            "/traces",
+            self.traces,
+            methods=["GET"],
+            response_class=JSONResponse,
+        )
+
+        self.router.add_api_route(
+            "/traces/chrome",
+            self.chrome_trace,
+            methods=["GET"],
+            response_class=JSONResponse,
+        )
+
         logger.info("ThinkingToolServer initialized")
 
+    async def startup(self) -> None:
+        # Warms the pinned models before the first request needs them.
+        self.llm_mang.start()
+
+    async def shutdown(self) -> None:
+        self.llm_mang.stop()
+
     async def list_models(self) -> JSONResponse:
-        models = self.llm_mang.local_models_available().models
+        response = await self.llm_mang.local_models_available()
+        if response.status == LLM_ManagerStatus.error:
+            return OllamaErroResponse(str(response.error))
+
         logger.info("Local models available:")
-        logger.info(models)
-        return JSONResponse(models)
+        logger.info(response.models)
+        return JSONResponse(response.models)
 
     async def pull_model(self, request: PullModelRequest) -> JSONResponse:
         stream_id = str(uuid4())
 
-        # Don't wait, start pulling the model.
-        logger.info(f"Started pulling model: '{request.model}'")
-        _ = self.llm_mang.pull(request.model)
+        # Don't wait for the stream to be requested, start pulling the model.
+        # Requests for a model already being pulled join its download.
+        logger.info(f"Pull requested for model: '{request.model}'")
+        pull = self.pulls.pull(request.model)
+        return self._register_stream(
+            StreamRequest(
+                stream_id=stream_id,
+                request={"pull": pull},
+                method=self._pull_chunks,
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+        )
 
-        # # Setup stream callback.
-        self.last_response_stream = StreamRequest(
-            text=f"Attempting to download model: '{request.model}'",
-            stream_id=stream_id,
-            request={"request": request},
-            method=self._pull_stream,
+    async def update_settings(self, request: ServerConfigRequest) -> JSONResponse:
+        model_settings = request.config.model_settings
+        response = await self.llm_mang.update(model_settings)
+        if response.status == LLM_ManagerStatus.error:
+            return OllamaErroResponse(str(response.error))
+        if response.status != LLM_ManagerStatus.ready:
+            return JSONResponse(
+                {
+                    "message": f"Model not available: '{model_settings.model}'",
+                    "models": response.models,
+                },
+                status_code=404,
+            )
+
+        return JSONResponse(request.config.model_dump())
+
+    async def think(
+        self,
+        request: ThinkingRequest,
+        stream: bool = False,
+        wire: WireFormat = WireFormat.full,
+    ) -> StreamingResponse:
+        # With `stream=true` the thought is streamed in this response,
+        # otherwise a `stream_url` is returned for `/stream_response`.
+        # Cached and in-flight thoughts are shared without taking a scheduler
+        # slot.
+        shared = await self._is_shared(request)
+        prompt = await self._budget_prompt(
+            [Message(role="user", content=m) for m in request.messages]
         )
 
-        return JSONResponse({"stream_url": f"/stream_response?stream_id={stream_id}"})
+        if stream:
+            if shared:
+                return StreamingResponse(
+                    self._think_stream(request, prompt=prompt, wire=wire),
+                    media_type=NDJSON_MEDIA_TYPE,
+                    headers=prompt.headers(),
+                )
 
-    async def update_settings(self, request: ServerConfigRequest) -> JSONResponse:
-        response = self.llm_mang.update(request.config)
-        if response.message == "Model updated":
-            return JSONResponse(request.config.model_dump())
+            try:
+                ticket = await self._acquire_slot(request.priority)
+            except SchedulerSaturated as e:
+                return self._saturated_response(e)
 
-        return JSONResponse(status_code=404, content=response.model_dump())
+            return StreamingResponse(
+                self._think_stream(request, ticket=ticket, prompt=prompt, wire=wire),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers=prompt.headers(),
+                background=BackgroundTask(ticket.release),
+            )
 
-    async def think(self, request: ThinkingRequest) -> StreamingResponse:
         stream_id = str(uuid4())
-        self.last_response_stream = StreamRequest(
-            stream_id=stream_id,
-            request={"request": request},
-            method=self._think_stream,
+        return self._register_stream(
+            StreamRequest(
+                stream_id=stream_id,
+                request={"request": request, "prompt": prompt},
+                method=self._think_chunks,
+                media_type=NDJSON_MEDIA_TYPE,
+                priority=None if shared else request.priority,
+            ),
+            budget=prompt.report,
+        )
+
+    async def think_batch(self, request: ThinkingBatchRequest) -> StreamingResponse:
+        # Results are streamed as they finish, tagged with their request's
+        # index.  Each request takes a scheduler slot while it generates.
+        max_requests = self.config.batch.max_requests
+        if len(request.requests) > max_requests:
+            return JSONResponse(
+                {"message": f"Batch is larger than {max_requests} requests"},
+                status_code=413,
+            )
+
+        return StreamingResponse(
+            ndjson_stream(self._batch_results(request.requests)),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    async def create_session(self) -> JSONResponse:
+        try:
+            session = self.sessions.create()
+        except SessionStoreFull as e:
+            logger.error(e)
+            return JSONResponse({"message": str(e)}, status_code=503)
+        return JSONResponse(SessionResponse(**session.status()).model_dump())
+
+    async def get_session(self, session_id: str) -> JSONResponse:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return self._no_session_response(session_id)
+
+        return JSONResponse(
+            {
+                **session.status(),
+                "messages": [m.model_dump(exclude_none=True) for m in session.messages],
+            }
+        )
+
+    async def delete_session(self, session_id: str) -> JSONResponse:
+        session = self.sessions.delete(session_id)
+        if session is None:
+            return self._no_session_response(session_id)
+
+        return JSONResponse(SessionResponse(**session.status()).model_dump())
+
+    async def append_session(
+        self, session_id: str, request: SessionMessagesRequest
+    ) -> JSONResponse:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return self._no_session_response(session_id)
+
+        session.append(request.role, request.messages)
+        return JSONResponse(SessionResponse(**session.status()).model_dump())
+
+    async def think_in_session(
+        self,
+        session_id: str,
+        request: SessionThinkingRequest,
+        wire: WireFormat = WireFormat.full,
+    ) -> StreamingResponse:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return self._no_session_response(session_id)
+
+        if session.busy:
+            return JSONResponse(
+                {"message": f"Session '{session_id}' is already thinking"},
+                status_code=409,
+            )
+
+        # Claimed before waiting for a slot, so no other turn slips in.
+        session.busy = True
+        try:
+            ticket = await self._acquire_slot(request.priority)
+        except SchedulerSaturated as e:
+            session.busy = False
+            return self._saturated_response(e)
+        except BaseException:
+            session.busy = False
+            raise
+
+        session.append("user", request.messages)
+        try:
+            prompt = await self._budget_prompt(session.messages)
+        except BaseException:
+            self._end_session_turn(session, ticket)
+            raise
+        return StreamingResponse(
+            ndjson_stream(
+                self._session_chunks(session, ticket, prompt),
+                wire,
+                self.config.stream_coalescing,
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=prompt.headers(),
+            background=BackgroundTask(self._end_session_turn, session, ticket),
+        )
+
+    async def stream_response(
+        self, stream_id: str, wire: WireFormat = WireFormat.full
+    ) -> StreamingResponse:
+        with span("stream lookup", stream_id=stream_id):
+            entry = self.streams.claim(stream_id)
+        if entry is None:
+            return JSONResponse(
+                {"message": "No stream available with the given ID"},
+                status_code=404,
+            )
+
+        kwargs = dict(entry.request.request)
+        background = None
+        if entry.request.priority is not None:
+            try:
+                kwargs["ticket"] = await self._acquire_slot(entry.request.priority)
+            except SchedulerSaturated as e:
+                # Kept pending, so the client can retry after `Retry-After`.
+                self.streams.unclaim(stream_id)
+                return self._saturated_response(e)
+            except BaseException:
+                self.streams.unclaim(stream_id)
+                raise
+            background = BackgroundTask(kwargs["ticket"].release)
+
+        # Served through a broadcast which is cancelled as soon as the client
+        # disconnects, or on `DELETE /streams/{stream_id}`.
+        entry.broadcast = Broadcast(
+            self._with_stream_id(stream_id, entry.request.method(**kwargs)),
+            on_done=lambda _: self.streams.finish(stream_id),
+            idle_timeout=0,
+        )
+        chunks = (chunk async for _, chunk in entry.broadcast.subscribe())
+        return StreamingResponse(
+            ndjson_stream(chunks, wire, self.config.stream_coalescing),
+            media_type=entry.request.media_type,
+            background=background,
+        )
+
+    async def stream_events(
+        self, stream_id: str, last_event_id: str | None = Header(default=None)
+    ) -> StreamingResponse:
+        broadcast = self._broadcast_stream(stream_id)
+        if broadcast is None:
+            return JSONResponse(
+                {"message": "No stream available with the given ID"},
+                status_code=404,
+            )
+
+        return StreamingResponse(
+            sse_stream(
+                broadcast,
+                start=resume_index(last_event_id),
+                heartbeat=self.config.streams.heartbeat_interval,
+            ),
+            media_type=SSE_MEDIA_TYPE,
+            headers=SSE_HEADERS,
         )
-        return JSONResponse({"stream_url": f"/stream_response?stream_id={stream_id}"})
 
-    async def stream_response(self, stream_id: str) -> StreamingResponse:
-        print(stream_id)
-        print(self.last_response_stream)
-        if not self.last_response_stream:
+    async def stream_ws(
+        self, websocket: WebSocket, stream_id: str, last_event_id: int | None = None
+    ) -> None:
+        await websocket.accept()
+        broadcast = self._broadcast_stream(stream_id)
+        if broadcast is None:
+            await websocket.close(
+                code=4404, reason="No stream available with the given ID"
+            )
+            return
+
+        await websocket_stream(
+            websocket,
+            broadcast,
+            start=resume_index(last_event_id),
+            heartbeat=self.config.streams.heartbeat_interval,
+        )
+
+    async def response_cache_stats(self) -> JSONResponse:
+        return JSONResponse(self.response_cache.stats())
+
+    async def stream_status(self, stream_id: str) -> JSONResponse:
+        entry = self.streams.get(stream_id)
+        if entry is None:
             return JSONResponse(
                 {"message": "No stream available with the given ID"},
                 status_code=404,
             )
 
-        if self.last_response_stream.stream_id != stream_id:
+        return JSONResponse(entry.status())
+
+    async def streams_status(self) -> JSONResponse:
+        return JSONResponse(
+            {
+                "streams": self.streams.stats(),
+                "generations": self.generation_stats.status(),
+            }
+        )
+
+    async def cancel_stream(self, stream_id: str) -> JSONResponse:
+        entry = self.streams.get(stream_id)
+        if entry is None:
             return JSONResponse(
                 {"message": "No stream available with the given ID"},
                 status_code=404,
             )
-        stream = self.last_response_stream.method(**self.last_response_stream.request)
-        response = StreamingResponse(
-            stream,
-            media_type=self.last_response_stream.media_type,
+
+        if entry.state == StreamState.pending:
+            # Never started, so the whole generation is saved.
+            self.streams.remove(stream_id)
+            self.generation_stats.cancel()
+            return JSONResponse({**entry.status(), "cancelled": True})
+        if entry.broadcast is not None and entry.broadcast.cancel():
+            logger.info(f"Stream cancelled: '{stream_id}'")
+            return JSONResponse(entry.status())
+
+        return JSONResponse({"message": "Stream has already finished"}, status_code=409)
+
+    async def metrics_text(self) -> Response:
+        # Gauges of state held elsewhere are read when scraped.
+        self.metrics.streams.clear()
+        for state, count in self.streams.stats().items():
+            self.metrics.streams.set(count, state=state)
+        scheduler = self.scheduler.stats()
+        self.metrics.scheduler_queued.set(scheduler["queued"])
+        self.metrics.scheduler_active.clear()
+        for model, lane in scheduler["models"].items():
+            self.metrics.scheduler_active.set(lane["active"], model=model)
+
+        return Response(self.metrics.render(), media_type=METRICS_MEDIA_TYPE)
+
+    async def traces(
+        self, trace_id: str | None = None, limit: int | None = None
+    ) -> JSONResponse:
+        if limit is None:
+            limit = min(DEFAULT_TRACE_QUERY_LIMIT, self.config.tracing.max_spans)
+        spans = self.tracer.export_json(trace_id)
+        return JSONResponse(spans[-limit:] if limit > 0 else [])
+
+    async def chrome_trace(self, trace_id: str | None = None) -> JSONResponse:
+        # Opens in chrome://tracing or Perfetto.
+        filename = f"trace-{trace_id}.json" if trace_id else "trace.json"
+        return JSONResponse(
+            self.tracer.export_chrome(trace_id),
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
 
-        self.last_response_stream = None
+    async def _acquire_slot(self, priority: RequestPriority) -> Ticket:
+        with span("scheduler wait", priority=priority.value) as attributes:
+            model = self.llm_mang.config.model
+            ticket = await self.scheduler.acquire(model, priority)
+            attributes["queued_for"] = ticket.queued_for
+        self.metrics.queue_wait.observe(ticket.queued_for)
+        return ticket
 
-        return response
+    def _saturated_response(self, e: SchedulerSaturated) -> JSONResponse:
+        logger.warning(e)
+        self.metrics.rejected.inc()
+        return JSONResponse(
+            {"message": str(e)},
+            status_code=e.status_code,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    def _register_stream(
+        self, stream_request: StreamRequest, budget: BudgetReport | None = None
+    ) -> JSONResponse:
+        try:
+            self.streams.register(stream_request)
+        except StreamRegistryFull as e:
+            logger.error(e)
+            return JSONResponse({"message": str(e)}, status_code=503)
+
+        stream_id = stream_request.stream_id
+        content = {"stream_url": f"/stream_response?stream_id={stream_id}"}
+        if budget is not None:
+            content["budget"] = budget.model_dump()
+        return JSONResponse(content)
+
+    def _broadcast_stream(self, stream_id: str) -> Broadcast | None:
+        """
+        Starts a stream as a broadcast so SSE and WebSocket clients can
+        reconnect and resume from the last event they saw.  Streams served
+        by `/stream_response` can be joined, but are cancelled as soon as
+        their client goes away.
+        """
+        with span("stream lookup", stream_id=stream_id):
+            entry = self.streams.get(stream_id)
+            if entry is not None and entry.broadcast is None:
+                if self.streams.claim(stream_id) is None:
+                    return None
+        if entry is None:
+            return None
+
+        if entry.broadcast is None:
+            entry.broadcast = Broadcast(
+                self._with_stream_id(
+                    stream_id, entry.request.method(**entry.request.request)
+                ),
+                on_done=lambda _: self.streams.finish(stream_id),
+                idle_timeout=self.config.streams.resume_timeout,
+            ).start()
+
+        return entry.broadcast
+
+    async def _with_stream_id(
+        self, stream_id: str, stream: AsyncGenerator
+    ) -> AsyncGenerator:
+        # Streams are served from their own task, so the ID stays with it.
+        current_stream_id.set(stream_id)
+        async for chunk in stream:
+            yield chunk
 
     async def _think_stream(
-        self, request: ThinkingRequest
-    ) -> AsyncGenerator[str, None]:
-        async for chunk in self.llm_mang.generate(request.messages):
-            logger.info(chunk.model_dump_json())
-            yield chunk.model_dump_json()
-
-    async def _pull_stream(
-        self, request: PullModelRequest
-    ) -> AsyncGenerator[str, None]:
-        async for chunk in await self.llm_mang.pull_status(request.model):
-            data = chunk.model_dump()
-            yield json.dumps(data) + "\n"
-
-    async def logs(self) -> JSONResponse:
-        logs = self.self_awareness.all_log_files()
-        return JSONResponse(logs)
-
-    async def code(self, filename: str = None) -> JSONResponse:
+        self,
+        request: ThinkingRequest,
+        ticket: Ticket | None = None,
+        prompt: BudgetedPrompt | None = None,
+        wire: WireFormat = WireFormat.full,
+    ) -> AsyncGenerator[str | bytes, None]:
+        chunks = self._think_chunks(request, ticket, prompt)
+        async for data in ndjson_stream(chunks, wire, self.config.stream_coalescing):
+            yield data
+
+    async def _think_chunks(
+        self,
+        request: ThinkingRequest,
+        ticket: Ticket | None = None,
+        prompt: BudgetedPrompt | None = None,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        key = await self._request_key(request)
+        if key is not None and self.response_cache.enabled:
+            cached = await self.response_cache.get(key)
+            if cached is not None:
+                if ticket is not None:
+                    ticket.release()
+                for chunk in cached:
+                    yield chunk
+                return
+
+        if key is None or not self.config.coalesce_requests:
+            async for chunk in self._generate(request, key, ticket, prompt):
+                yield chunk
+            return
+
+        # Identical requests share one generation.  The first one starts it,
+        # later ones replay what it has produced so far and follow the tail.
+        broadcast = self._in_flight.get(key)
+        if broadcast is None:
+            broadcast = Broadcast(
+                self._generate(request, key, ticket, prompt),
+                on_done=lambda done: self._forget_in_flight(key, done),
+                # Generating goes on for as long as anyone is reading.
+                idle_timeout=0,
+            )
+            self._in_flight[key] = broadcast
+        elif ticket is not None:
+            ticket.release()
+
+        async for _, chunk in broadcast.subscribe():
+            yield chunk
+
+    async def _batch_results(
+        self, requests: list[ThinkingRequest]
+    ) -> AsyncGenerator[BatchResult, None]:
+        slots = asyncio.Semaphore(self.config.batch.max_parallel)
+        tasks = [
+            asyncio.create_task(self._batch_result(index, request, slots))
+            for index, request in enumerate(requests)
+        ]
+        try:
+            for result in asyncio.as_completed(tasks):
+                yield await result
+        finally:
+            # Nothing left to generate for once the client has gone.
+            for task in tasks:
+                task.cancel()
+
+    async def _batch_result(
+        self, index: int, request: ThinkingRequest, slots: asyncio.Semaphore
+    ) -> BatchResult:
+        async with slots:
+            try:
+                chunks = [chunk async for chunk in self._think_chunks(request)]
+            except Exception as e:
+                logger.error(f"Batch request {index} failed: {e}")
+                return BatchResult(index=index, error=str(e))
+
+        if not chunks:
+            # The manager already logged why.
+            return BatchResult(index=index, error="The model returned no response")
+        return BatchResult(index=index, response=_join_chunks(chunks))
+
+    async def _generate(
+        self,
+        request: ThinkingRequest,
+        key: str | None,
+        ticket: Ticket | None,
+        prompt: BudgetedPrompt | None = None,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        # Callers which can still answer 429/503 acquire the slot up front,
+        # everyone else waits for it here.
+        if ticket is None:
+            ticket = await self._acquire_slot(request.priority)
+
+        try:
+            if prompt is None:
+                prompt = await self._budget_prompt(
+                    [Message(role="user", content=m) for m in request.messages]
+                )
+            started = monotonic()
+            response = await self.llm_mang.chat(prompt.messages)
+            if response.status == LLM_ManagerStatus.error:
+                return
+
+            chunks = [] if self.response_cache.enabled else None
+            async for chunk in self._log_chunks(response.stream, started):
+                if chunks is not None:
+                    chunks.append(chunk)
+                yield chunk
+
+            # Only complete thoughts are cached.
+            if chunks and chunks[-1].done:
+                await self.response_cache.put(key, chunks)
+        finally:
+            ticket.release()
+
+    async def _log_chunks(
+        self, stream: AsyncIterator[ChatResponse], started: float | None = None
+    ) -> AsyncGenerator[ChatResponse, None]:
+        # Chunks are only serialised when their level is enabled, the
+        # generation as a whole is summarised and measured once it ends.
+        # `started` is when the chat was sent, before the first chunk.
+        level = logging.getLevelName(self.config.chunk_log_level.upper())
+        log_chunks = isinstance(level, int) and logger.isEnabledFor(level)
+        if started is None:
+            started = monotonic()
+        first_at = None
+        count, chars, last = 0, 0, None
+        cancelled = False
+        self.metrics.generating.inc()
+        try:
+            async for chunk in stream:
+                if first_at is None:
+                    first_at = monotonic()
+                if log_chunks:
+                    logger.log(level, chunk.model_dump_json())
+                count += 1
+                chars += len(chunk.message.content or "")
+                last = chunk
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            if last is None or not last.done:
+                # Each chunk carries about one token.
+                self.generation_stats.cancel(count)
+                cancelled = True
+            raise
+        finally:
+            ended = monotonic()
+            self.metrics.generating.dec()
+            self.metrics.observe_generation(
+                started, first_at, ended, count, last, cancelled=cancelled
+            )
+            if first_at is not None:
+                # Spans are timed by the wall clock.
+                now = time()
+                record_span(
+                    "completion",
+                    now - (ended - first_at),
+                    now,
+                    chunks=count,
+                    eval_count=last.eval_count,
+                    done=last.done,
+                    cancelled=cancelled,
+                )
+            if last is not None and last.done:
+                self.generation_stats.complete(last.eval_count or count)
+            logger.info(
+                f"Generation {'done' if last and last.done else 'stopped'}: "
+                f"model='{last.model if last else None}', chunks={count}, "
+                f"chars={chars}, eval_count={last.eval_count if last else None}, "
+                f"seconds={ended - started:.3f}"
+            )
+
+    async def _budget_prompt(self, messages: list[Message]) -> BudgetedPrompt:
+        """
+        Fits the messages into the context window of the configured model,
+        falling back to the default window when its details are unavailable.
+        """
+        details = await self.llm_mang.model_details()
+        messages, report = self.context_budget.fit(messages, details)
+        return BudgetedPrompt(messages=messages, report=report)
+
+    def _forget_in_flight(self, key: str, broadcast: Broadcast) -> None:
+        if self._in_flight.get(key) is broadcast:
+            del self._in_flight[key]
+
+    async def _request_key(self, request: ThinkingRequest) -> str | None:
+        """
+        Identifies requests which produce the same thought, for caching and
+        coalescing.  `None` when neither is enabled.
+        """
+        if not (self.response_cache.enabled or self.config.coalesce_requests):
+            return None
+
+        model = self.llm_mang.config.model
+        return ResponseCache.key(
+            model,
+            await self.llm_mang.model_digest(model),
+            request.messages,
+            self.llm_mang.chat_options,
+        )
+
+    async def _is_shared(self, request: ThinkingRequest) -> bool:
+        key = await self._request_key(request)
+        if key is None:
+            return False
+        return key in self._in_flight or (
+            self.response_cache.enabled and key in self.response_cache
+        )
+
+    async def _session_chunks(
+        self, session: Session, ticket: Ticket, prompt: BudgetedPrompt
+    ) -> AsyncGenerator[ChatResponse, None]:
+        # The history is sent unchanged while it fits and the model kept
+        # loaded, so Ollama reuses its cached prompt prefix and only evaluates
+        # the new turns.  The stored history itself is never trimmed.
+        try:
+            started = monotonic()
+            response = await self.llm_mang.chat(
+                prompt.messages,
+                keep_alive=self.config.sessions.keep_alive,
+            )
+            if response.status == LLM_ManagerStatus.error:
+                return
+
+            content = []
+            async for chunk in self._log_chunks(response.stream, started):
+                content.append(chunk.message.content or "")
+                yield chunk
+
+            session.append("assistant", ["".join(content)])
+        finally:
+            self._end_session_turn(session, ticket)
+
+    def _end_session_turn(self, session: Session, ticket: Ticket) -> None:
+        session.busy = False
+        ticket.release()
+
+    def _no_session_response(self, session_id: str) -> JSONResponse:
+        return JSONResponse(
+            {"message": f"No session found with ID: '{session_id}'"},
+            status_code=404,
+        )
+
+    async def _pull_chunks(
+        self, pull: Broadcast
+    ) -> AsyncGenerator[ProgressResponse, None]:
+        async for chunk in progress(pull):
+            yield chunk
+
+    async def pulls_status(self) -> JSONResponse:
+        return JSONResponse(self.pulls.status())
+
+    async def pull_progress(self, model: str, start: int = 0) -> StreamingResponse:
+        # Rejoins a running pull, e.g. after the `/stream_response` of the
+        # request which started it was dropped.  Follows this pull only, so
+        # it never starts another download once it finished.
+        pull = self.pulls.get(model)
+        if pull is None:
+            return JSONResponse(
+                {"message": "No pull running for the given model"},
+                status_code=404,
+            )
+
+        return StreamingResponse(
+            ndjson_stream(progress(pull, start)),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    async def logs(
+        self,
+        offset: int | None = None,
+        length: int | None = None,
+        tail: int | None = None,
+        follow: bool = False,
+        level: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        stream_id: str | None = None,
+        limit: int | None = None,
+    ) -> JSONResponse:
+        # Without parameters the whole file is returned, as before.  `tail`
+        # and `offset` return a `LogRange`, `follow` then streams new lines.
+        # Filters, or just a `limit`, query the structured log store instead.
+        if any(f is not None for f in (level, since, until, stream_id, limit)):
+            return await self._query_logs(
+                level, since, until, stream_id, limit or DEFAULT_LOG_QUERY_LIMIT
+            )
+
+        if tail is not None:
+            logs = self.self_awareness.log_tail(tail)
+        elif offset is not None or length is not None:
+            logs = self.self_awareness.log_range(offset or 0, length)
+        elif follow:
+            logs = None
+        else:
+            return JSONResponse(self.self_awareness.all_log_files())
+
+        if follow:
+            return StreamingResponse(
+                ndjson_stream(self._follow_logs(logs)),
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+
+        return JSONResponse(logs.model_dump())
+
+    async def _query_logs(
+        self,
+        level: str | None,
+        since: str | None,
+        until: str | None,
+        stream_id: str | None,
+        limit: int,
+    ) -> JSONResponse:
+        if self.log_store is None:
+            return JSONResponse(
+                {"message": "The structured log store is disabled"},
+                status_code=409,
+            )
+
+        try:
+            since, until = _parse_time(since), _parse_time(until)
+        except ValueError as e:
+            return JSONResponse({"message": str(e)}, status_code=400)
+
+        records = await asyncio.to_thread(
+            self.log_store.query, level, since, until, stream_id, limit
+        )
+        return JSONResponse([r.model_dump() for r in records])
+
+    async def _follow_logs(
+        self, first: LogRange | None
+    ) -> AsyncGenerator[LogRange, None]:
+        if first is not None:
+            yield first
+        offset = first.next_offset if first is not None else None
+        heartbeat = self.config.streams.heartbeat_interval
+        async for logs in self.self_awareness.follow_logs(offset, heartbeat):
+            yield logs
+
+    async def code(
+        self, filename: str = None, if_none_match: str | None = Header(default=None)
+    ) -> JSONResponse:
         if filename:
             code = self.self_awareness.code_file(filename)
             if code is None:
@@ -172,8 +1065,45 @@ class ThinkingToolServer:
                     {"message": f"No code file found with name: '{filename}'"},
                     status_code=404,
                 )
+        else:
+            code = self.self_awareness.all_code_files()
 
-            return JSONResponse(code.model_dump())
+        etag = self.self_awareness.etag(filename)
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
 
-        code = self.self_awareness.all_code_files()
-        return JSONResponse([c.model_dump() for c in code])
+        content = code.model_dump() if filename else [c.model_dump() for c in code]
+        return JSONResponse(content, headers={"ETag": etag})
+
+    async def code_events(self) -> StreamingResponse:
+        if not self.self_awareness.watching:
+            return JSONResponse(
+                {"message": "Code watching is disabled"},
+                status_code=409,
+            )
+
+        return StreamingResponse(
+            self._code_events(),
+            media_type=SSE_MEDIA_TYPE,
+            headers=SSE_HEADERS,
+        )
+
+    async def _code_events(self) -> AsyncGenerator[str, None]:
+        # Changes arrive on the watcher thread and are handed to the loop.
+        loop = asyncio.get_running_loop()
+        changes: asyncio.Queue[CodeChange] = asyncio.Queue()
+        unsubscribe = self.self_awareness.subscribe(
+            lambda change: loop.call_soon_threadsafe(changes.put_nowait, change)
+        )
+        try:
+            while True:
+                try:
+                    change = await asyncio.wait_for(
+                        changes.get(), self.config.streams.heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: change\ndata: {change.model_dump_json()}\n\n"
+        finally:
+            unsubscribe()
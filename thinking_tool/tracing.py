@@ -0,0 +1,238 @@
+import logging
+import os
+import re
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from time import time
+from typing import Any, Callable, Iterable, Iterator
+from uuid import uuid4
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from thinking_tool.models.config import TracingConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+TRACE_HEADER = "X-Trace-Id"
+_TRACE_ID = re.compile(r"^[0-9A-Za-z_-]{1,64}$")
+
+
+def new_trace_id() -> str:
+    return uuid4().hex
+
+
+def _new_span_id() -> str:
+    return uuid4().hex[:16]
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    name: str
+    # Seconds since the epoch.
+    start: float
+    end: float
+    parent_id: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class _Active:
+    tracer: "Tracer"
+    trace_id: str
+    span_id: str | None = None
+
+
+# Trace of the current task, `None` when it isn't traced.
+_active: ContextVar[_Active | None] = ContextVar("active_trace", default=None)
+
+
+def current_trace_id() -> str | None:
+    active = _active.get()
+    return active.trace_id if active else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+    """
+    Records the enclosed block as a span of the current trace, and as the
+    parent of spans started inside it.  Does nothing outside a trace.  The
+    yielded dict takes attributes known only once the block ran.
+    """
+    active = _active.get()
+    if active is None:
+        yield attributes
+        return
+
+    span_id = _new_span_id()
+    token = _active.set(_Active(active.tracer, active.trace_id, span_id))
+    start = time()
+    try:
+        yield attributes
+    except BaseException as e:
+        attributes["error"] = type(e).__name__
+        raise
+    finally:
+        _active.reset(token)
+        active.tracer.add(
+            Span(
+                trace_id=active.trace_id,
+                span_id=span_id,
+                name=name,
+                start=start,
+                end=time(),
+                parent_id=active.span_id,
+                attributes=attributes,
+            )
+        )
+
+
+def record_span(name: str, start: float, end: float, **attributes: Any) -> None:
+    """Records a span of the current trace measured by the caller."""
+    active = _active.get()
+    if active is not None:
+        active.tracer.add(
+            Span(
+                trace_id=active.trace_id,
+                span_id=_new_span_id(),
+                name=name,
+                start=start,
+                end=end,
+                parent_id=active.span_id,
+                attributes=attributes,
+            )
+        )
+
+
+class Tracer:
+    """
+    Keeps the most recent `max_spans` spans in memory, to be read back as
+    JSON or as a Chrome trace file (chrome://tracing, Perfetto).  Nothing
+    is sent anywhere.
+    """
+
+    def __init__(self, config: TracingConfig = None) -> None:
+        self.config = config if config else TracingConfig()
+        self._spans: deque[Span] = deque(maxlen=self.config.max_spans)
+        # Sync endpoints run in worker threads.
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(
+        self, trace_id: str | None = None, limit: int | None = None
+    ) -> list[Span]:
+        """Spans of `trace_id`, or of every trace, oldest first."""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        if limit is not None:
+            spans = spans[-limit:] if limit > 0 else []
+        return sorted(spans, key=lambda s: s.start)
+
+    def export_json(self, trace_id: str | None = None) -> list[dict]:
+        return [{**asdict(s), "duration": s.duration} for s in self.spans(trace_id)]
+
+    def export_chrome(self, trace_id: str | None = None) -> dict:
+        """
+        The spans in the Chrome trace event format, with one row per trace.
+        """
+        threads: dict[str, int] = {}
+        events = []
+        for s in self.spans(trace_id):
+            tid = threads.setdefault(s.trace_id, len(threads) + 1)
+            events.append(
+                {
+                    "name": s.name,
+                    "cat": "thinking_tool",
+                    "ph": "X",
+                    "ts": s.start * 1e6,
+                    "dur": s.duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {
+                        "trace_id": s.trace_id,
+                        "span_id": s.span_id,
+                        "parent_id": s.parent_id,
+                        **s.attributes,
+                    },
+                }
+            )
+        for trace, tid in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {"name": f"trace {trace}"},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def route_class(
+        self, base: type[APIRoute] = APIRoute, exclude: Iterable[str] = ()
+    ) -> type[APIRoute]:
+        """
+        A route class which traces every request under the client's
+        `X-Trace-Id`, or a new one, and returns the ID in the same header.
+        The trace stays with the request's task, so the streamed body and
+        the tasks it starts are traced too.  Routes in `exclude` aren't
+        traced.
+        """
+        exclude = set(exclude)
+        tracer = self
+
+        class TracedRoute(base):
+            def get_route_handler(self) -> Callable:
+                handler = super().get_route_handler()
+                route = self.path
+                if route in exclude:
+                    return handler
+
+                async def traced(request: Request) -> Response:
+                    if not tracer.config.enabled:
+                        return await handler(request)
+
+                    trace_id = request.headers.get(TRACE_HEADER, "")
+                    if not _TRACE_ID.match(trace_id):
+                        trace_id = new_trace_id()
+                    # Set for the rest of the task, rather than reset once
+                    # the handler returns.  Later spans are children of the
+                    # handshake, even those which outlive it.
+                    span_id = _new_span_id()
+                    _active.set(_Active(tracer, trace_id, span_id))
+                    attributes = {"route": route, "method": request.method}
+                    start = time()
+                    try:
+                        response = await handler(request)
+                        attributes["status"] = response.status_code
+                    finally:
+                        tracer.add(
+                            Span(
+                                trace_id=trace_id,
+                                span_id=span_id,
+                                name="handshake",
+                                start=start,
+                                end=time(),
+                                attributes=attributes,
+                            )
+                        )
+                    response.headers[TRACE_HEADER] = trace_id
+                    return response
+
+                return traced
+
+        return TracedRoute
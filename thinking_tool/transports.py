@@ -0,0 +1,162 @@
+import json
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator
+
+from fastapi import WebSocket, WebSocketDisconnect
+from ollama import ChatResponse
+from pydantic import BaseModel
+
+from thinking_tool.broadcast import Broadcast
+from thinking_tool.coalescer import coalesce
+from thinking_tool.models.config import StreamCoalescingConfig
+from thinking_tool.models.request import WireFormat
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stops nginx and friends from buffering the event stream.
+    "X-Accel-Buffering": "no",
+}
+
+
+def encode_chunk(chunk: Any) -> str:
+    if isinstance(chunk, BaseModel):
+        return chunk.model_dump_json()
+    return json.dumps(chunk)
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def encode_lean(chunk: Any) -> bytes:
+    """
+    Encodes a chat chunk as `{"content", "done"}`, plus `thinking` when
+    present.  The last chunk also carries the model and the generation
+    stats.  Anything else is encoded in full.
+    """
+    if not isinstance(chunk, ChatResponse):
+        return encode_chunk(chunk).encode()
+
+    message = chunk.message
+    # Older ollama clients have no `thinking` field.
+    thinking = getattr(message, "thinking", None)
+    if not chunk.done and not message.tool_calls:
+        # One record per token, built without an intermediate dict.
+        record = b'{"content":' + dumps(message.content or "")
+        if thinking:
+            record += b',"thinking":' + dumps(thinking)
+        return record + b',"done":false}'
+
+    record = chunk.model_dump(mode="json", exclude={"message"}, exclude_none=True)
+    record["content"] = message.content or ""
+    if thinking:
+        record["thinking"] = thinking
+    if message.tool_calls:
+        record["tool_calls"] = [c.model_dump(mode="json") for c in message.tool_calls]
+    return dumps(record)
+
+
+def resume_index(last_event_id: str | int | None) -> int:
+    """
+    Returns the index of the first chunk to send to a client which last saw
+    `last_event_id`.
+    """
+    try:
+        return int(last_event_id) + 1
+    except (TypeError, ValueError):
+        return 0
+
+
+def error_record(error: BaseException) -> dict:
+    return {"error": str(error)}
+
+
+async def _with_error_record(chunks: AsyncIterator[Any]) -> AsyncGenerator[Any, None]:
+    # A failed stream ends with an error record, as Ollama's own streams do,
+    # rather than being cut short.
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        logger.error(f"Stream failed: {e}")
+        yield error_record(e)
+
+
+def ndjson_line(chunk: Any) -> str:
+    return encode_chunk(chunk) + "\n"
+
+
+def lean_ndjson_line(chunk: Any) -> bytes:
+    return encode_lean(chunk) + b"\n"
+
+
+async def ndjson_stream(
+    chunks: AsyncIterator[Any],
+    wire: WireFormat = WireFormat.full,
+    coalescing: StreamCoalescingConfig | None = None,
+) -> AsyncGenerator[str | bytes, None]:
+    encode = lean_ndjson_line if wire == WireFormat.lean else ndjson_line
+    chunks = _with_error_record(chunks)
+    if coalescing is not None and coalescing.flush_interval > 0:
+        async for data in coalesce(chunks, encode, coalescing):
+            yield data
+        return
+
+    async for chunk in chunks:
+        yield encode(chunk)
+
+
+async def sse_stream(
+    broadcast: Broadcast, start: int = 0, heartbeat: float | None = None
+) -> AsyncGenerator[str, None]:
+    # Event IDs are chunk indices, so a reconnecting EventSource resumes via
+    # its `Last-Event-ID` header.
+    try:
+        async for index, chunk in broadcast.subscribe(start, heartbeat):
+            if chunk is None:
+                yield ": ping\n\n"
+                continue
+            yield f"id: {index}\nevent: chunk\ndata: {encode_chunk(chunk)}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+
+    yield "event: end\ndata: {}\n\n"
+
+
+async def websocket_stream(
+    websocket: WebSocket,
+    broadcast: Broadcast,
+    start: int = 0,
+    heartbeat: float | None = None,
+) -> None:
+    try:
+        try:
+            async for index, chunk in broadcast.subscribe(start, heartbeat):
+                if chunk is None:
+                    await websocket.send_text('{"event":"ping"}')
+                    continue
+                await websocket.send_text(
+                    f'{{"id":{index},"event":"chunk","data":{encode_chunk(chunk)}}}'
+                )
+        except WebSocketDisconnect:
+            raise
+        except Exception as e:
+            message = json.dumps({"message": str(e)})
+            await websocket.send_text(f'{{"event":"error","data":{message}}}')
+
+        await websocket.send_text('{"event":"end"}')
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("WebSocket client disconnected")
@@ -0,0 +1,170 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+import logging
+
+from thinking_tool.backend_pool import (
+    BACKEND_ERRORS,
+    OllamaBackend,
+    OllamaBackendPool,
+)
+from thinking_tool.models.config import OllamaConfig
+
+logger = logging.getLogger(__name__ + "." + __file__)
+
+# Keep-alive which holds a model until it is unloaded explicitly.
+KEEP_FOREVER = -1
+# Keep-alive which unloads a model straight away.
+UNLOAD = 0
+
+
+class WarmPool:
+    """
+    Keeps models loaded on the Ollama hosts, so switching to one doesn't
+    pay for a cold load on the first chat.
+
+    A model is warmed with an empty generate, which loads it without
+    generating anything.  Pinned models are held with no expiry, and a
+    periodic `ps()` reloads any that went away, e.g. after Ollama restarted.
+    Other models use the configured keep-alive; once a host holds more than
+    `max_warm_models` of them, the least recently used are unloaded.  Models
+    this pool never used, e.g. loaded by other Ollama clients, are left alone.
+    """
+
+    def __init__(self, pool: OllamaBackendPool, config: OllamaConfig) -> None:
+        self.pool = pool
+        self.config = config
+        # Model names, least recently used first.
+        self._used: OrderedDict[str, float] = OrderedDict()
+        self._warming: dict[tuple[str, str], asyncio.Task] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pinned(self) -> set[str]:
+        return set(self.config.pinned_models)
+
+    def keep_alive(self, model: str) -> str | int:
+        return KEEP_FOREVER if model in self.pinned else self.config.keep_alive
+
+    def touch(self, model: str) -> None:
+        self._used[model] = monotonic()
+        self._used.move_to_end(model)
+
+    def start(self) -> None:
+        """
+        Starts the periodic refresh, if it isn't running already.  Must be
+        called from the event loop.
+        """
+        if self.config.keep_alive_interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def warm(self, model: str, backend: OllamaBackend | None = None) -> bool:
+        """
+        Loads `model` on `backend`, by default the host a chat with it would
+        go to.  Concurrent calls for the same model and host share one load.
+        """
+        return await asyncio.shield(self._warm_task(model, backend))
+
+    def warm_in_background(self, model: str) -> None:
+        self.start()
+        self._warm_task(model)
+
+    async def refresh(self) -> None:
+        """
+        Re-reads which models each host has loaded, reloads pinned models
+        that are missing, and unloads idle models over the limit.
+        """
+        await self.pool.refresh()
+        for backend in self.pool.backends:
+            if not backend.healthy:
+                continue
+            for model in self.pinned - backend.loaded_models:
+                if self._is_home(model, backend):
+                    await self.warm(model, backend)
+            await self.evict(backend)
+
+    async def evict(self, backend: OllamaBackend) -> list[str]:
+        """
+        Unloads the least recently used models which aren't pinned or
+        configured, until the host holds at most `max_warm_models` of them.
+        Only models used through this pool are counted or unloaded.
+        """
+        keep = self.pinned | {self.config.model}
+        # `_used` is ordered least recently used first.
+        idle = [
+            model
+            for model in self._used
+            if model in backend.loaded_models and model not in keep
+        ]
+
+        evicted = []
+        while len(idle) > self.config.max_warm_models:
+            model = idle.pop(0)
+            try:
+                await backend.client.generate(model=model, keep_alive=UNLOAD)
+            except BACKEND_ERRORS as e:
+                logger.warning(f"Unloading '{model}' on '{backend.host}' failed: {e}")
+                self.pool.mark_failure(backend, e)
+                break
+            backend.loaded_models.discard(model)
+            evicted.append(model)
+            logger.info(f"Unloaded idle model '{model}' on '{backend.host}'")
+        return evicted
+
+    def status(self) -> dict:
+        return {
+            "pinned": sorted(self.pinned),
+            "recently_used": list(reversed(self._used)),
+            "warming": sorted(model for _, model in self._warming),
+        }
+
+    def _is_home(self, model: str, backend: OllamaBackend) -> bool:
+        # A pinned model is held on one host, the one chats would pick.
+        return self.pool.candidates(model)[0] is backend
+
+    def _warm_task(
+        self, model: str, backend: OllamaBackend | None = None
+    ) -> asyncio.Task:
+        backend = backend or self.pool.candidates(model)[0]
+        key = (backend.host, model)
+        task = self._warming.get(key)
+        if task is None:
+            task = asyncio.create_task(self._warm(model, backend))
+            self._warming[key] = task
+            task.add_done_callback(lambda _: self._warming.pop(key, None))
+        return task
+
+    async def _warm(self, model: str, backend: OllamaBackend) -> bool:
+        started = monotonic()
+        try:
+            await backend.client.generate(
+                model=model, keep_alive=self.keep_alive(model)
+            )
+        except BACKEND_ERRORS as e:
+            logger.warning(f"Warming '{model}' on '{backend.host}' failed: {e}")
+            self.pool.mark_failure(backend, e)
+            return False
+
+        self.pool.mark_success(backend, model)
+        self.touch(model)
+        logger.info(
+            f"Warmed '{model}' on '{backend.host}' "
+            f"in {monotonic() - started:.3f} seconds"
+        )
+        await self.evict(backend)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Warm pool refresh failed: {e}")
+            await asyncio.sleep(self.config.keep_alive_interval)